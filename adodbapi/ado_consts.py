@@ -23,6 +23,13 @@ adOpenKeyset        = 1
 adOpenStatic        = 3
 adOpenUnspecified   = -1
 
+# LockTypeEnum
+adLockBatchOptimistic = 4
+adLockOptimistic      = 3
+adLockPessimistic     = 2
+adLockReadOnly        = 1
+adLockUnspecified     = -1
+
 # CommandTypeEnum
 adCmdText = 1
 adCmdStoredProc = 4
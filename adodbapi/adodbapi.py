@@ -35,11 +35,14 @@ import sys
 import copy
 import decimal
 import os
+import re
+import time
 import weakref
 
 from . import process_connect_string
 from . import ado_consts as adc
 from . import apibase as api
+from . import tracing
 
 try:
     verbose = int(os.environ['ADODBAPI_VERBOSE'])
@@ -91,6 +94,13 @@ def make_COM_connecter():
         raise api.InterfaceError ("Windows COM Error: Dispatch('ADODB.Connection') failed.")
     return c
 
+def make_COM_recordset():
+    "a new ADODB.Recordset object, for Connection.bulk_insert()"
+    try:
+        return Dispatch('ADODB.Recordset')
+    except:
+        raise api.InterfaceError("Windows COM Error: Dispatch('ADODB.Recordset') failed.")
+
 def connect(*args, **kwargs): # --> a db-api connection object
     """Connect to a database.
 
@@ -99,13 +109,15 @@ def connect(*args, **kwargs): # --> a db-api connection object
          * http://www.connectionstrings.com
          * http://www.asp101.com/articles/john/connstring/default.asp
     :timeout -- A command timeout value, in seconds (default 30 seconds)
+    :connection_maker -- a function returning an ADODB.Connection object (default: Dispatch a new one)
     """
     co = Connection() # make an empty connection object
 
+    connection_maker = kwargs.pop('connection_maker', make_COM_connecter)
     kwargs = process_connect_string.process(args, kwargs, True)
 
     try:  # connect to the database, using the connection information in kwargs
-       co.connect(kwargs)
+       co.connect(kwargs, connection_maker)
        return co
     except (Exception) as e:
         message =  'Error opening connection to "%s"' % co.connection_string
@@ -131,6 +143,35 @@ defaultCursorLocation = adc.adUseClient   # changed from adUseServer as of v 2.3
 
 dateconverter = api.pythonDateTimeConverter() # default
 
+#  how .fetchxxx() returns rows: 'sqlrow' -- SQLrows/SQLrow objects, which read values from the ADO data lazily,
+#  'compact' -- lists of CompactRow (a namedtuple made for each result shape), or 'tuple' -- lists of plain tuples.
+defaultRowFormat = 'sqlrow'
+
+#  each Connection remembers how to bind the parameters of this many (operation, paramstyle, types) combinations
+defaultPlanCacheSize = 256
+
+#  each Connection remembers the column information (names, types, sizes...) of the results of this many
+#  SELECT statements, so that running one again does not read every Field of the recordset through COM
+defaultColumnInfoCacheSize = 256
+
+#  Connection.bulk_insert() sends this many rows to the database with each ADO UpdateBatch()
+defaultBulkBatchSize = 1000
+
+#  each Cursor keeps this many ADO Commands built by execute(), keyed by the statement and its parameter types,
+#  so that executing one again changes only the parameter values (and a prepare()d plan is kept). 0 turns it off.
+defaultCommandCacheSize = 32
+
+#  a Connection may keep the results of its SELECT statements (see Connection.result_cache).
+#  It is off (0 bytes) unless set here, or by the "result_cache_bytes" connection keyword.
+defaultResultCacheBytes = 0
+defaultResultCacheTTL = 60.0  # seconds a cached result may be used. (or the "result_cache_ttl" connection keyword)
+
+#  Cursor.iter_batches() (and "for row in cursor") tunes the size of each GetRows() call
+#  so that a batch holds about this many bytes of data, within these limits on the number of rows.
+defaultBatchBytes = 1024 * 1024
+minBatchRows = 16
+maxBatchRows = 10000
+
 def format_parameters(ADOparameters, show_value=False):
     """Format a collection of ADO Command Parameters.
 
@@ -210,6 +251,17 @@ def _configure_parameter(p, value, adotype, settings_known):
         p.Value = value
 
 
+def _same_types(recordset, columns):
+    "True if the ADO Fields of recordset have the types of the cached column information"
+    return all(getIndexedValue(recordset.Fields, i).Type == column[1] for i, column in enumerate(columns))
+
+
+def _reusable(adotypes):
+    "can an ADO Command built for parameters of these types be executed again with new values?"
+    # binary values are appended in chunks, and Nulls change the type, so they cannot be re-used
+    return not any(t in api.adoBinaryTypes or t == adc.adEmpty for t in adotypes)
+
+
 # # # # # ----- the Class that defines a connection ----- # # # # # 
 class Connection(object):
     # include connection attributes as class attributes required by api definition.
@@ -235,6 +287,7 @@ class Connection(object):
     def __init__(self): # now define the instance attributes
         self.connector = None
         self.paramstyle = api.paramstyle
+        self.row_format = defaultRowFormat
         self.supportsTransactions = False
         self.connection_string = ''
         self.cursors = weakref.WeakValueDictionary()
@@ -243,8 +296,18 @@ class Connection(object):
         self.errorhandler = None # use the standard error handler for this instance
         self.transaction_level = 0 # 0 == Not in a transaction, at the top level
         self._autocommit = False
+        self.plan_cache = api.LRUCache(defaultPlanCacheSize)  # parameter binding plans for Cursor.execute()
+        self.column_info_cache = api.LRUCache(defaultColumnInfoCacheSize)  # see Cursor.build_column_info()
+        self.result_cache = None  # an api.ResultCache, if the results of SELECT statements are to be kept
+        self._uncommitted = False  # the open transaction has changed tables -- its SELECT results are not cached
+        self._tracers = ()  # see .add_tracer()
 
-    def connect(self, kwargs, connection_maker=make_COM_connecter):
+    def connect(self, kwargs, connection_maker=make_COM_connecter, dbms_properties=None):
+        """open the ADO connection described by kwargs.
+
+        dbms_properties -- (supportsTransactions, dbms_name, dbms_version) remembered from an earlier
+            connection to the same database, so that the provider need not be asked for them again.
+        """
         if verbose > 9:
             print('kwargs=', repr(kwargs))
         try:
@@ -266,16 +329,9 @@ class Connection(object):
         except api.Error:
             self._raiseConnectionError(api.DatabaseError, 'ADO error trying to Open=%s' % self.connection_string)
 
-        try:                                                        # Stefan Fuchs; support WINCCOLEDBProvider
-            if getIndexedValue(self.connector.Properties,'Transaction DDL').Value != 0:
-                self.supportsTransactions=True
-        except pywintypes.com_error:
-            pass                                                    # Stefan Fuchs
-        self.dbms_name = getIndexedValue(self.connector.Properties,'DBMS Name').Value
-        try:                                                        # Stefan Fuchs
-            self.dbms_version = getIndexedValue(self.connector.Properties,'DBMS Version').Value
-        except pywintypes.com_error:
-            pass                                                    # Stefan Fuchs
+        if dbms_properties is None:
+            dbms_properties = self.get_dbms_properties()
+        self.supportsTransactions, self.dbms_name, self.dbms_version = dbms_properties
         self.connector.CursorLocation = defaultCursorLocation #v2.1 Rose
         if self.supportsTransactions:
             self.connector.IsolationLevel=defaultIsolationLevel
@@ -286,10 +342,34 @@ class Connection(object):
             self._autocommit = True
         if 'paramstyle' in kwargs:
             self.paramstyle = kwargs['paramstyle'] # let setattr do the error checking
+        if 'row_format' in kwargs:
+            self.row_format = kwargs['row_format']
+        cache_bytes = kwargs.get('result_cache_bytes', defaultResultCacheBytes)
+        if cache_bytes:
+            self.result_cache = api.ResultCache(int(cache_bytes),
+                                                float(kwargs.get('result_cache_ttl', defaultResultCacheTTL)))
+        if kwargs.get('collect_stats', False):
+            self.add_tracer(tracing.StatsCollector())
         self.messages=[]
         if verbose:
             print('adodbapi New connection at %X' % id(self))
 
+    def get_dbms_properties(self):
+        "ask the provider --> (supportsTransactions, dbms_name, dbms_version)"
+        supportsTransactions = False
+        dbms_version = ''
+        try:                                                        # Stefan Fuchs; support WINCCOLEDBProvider
+            if getIndexedValue(self.connector.Properties,'Transaction DDL').Value != 0:
+                supportsTransactions=True
+        except pywintypes.com_error:
+            pass                                                    # Stefan Fuchs
+        dbms_name = getIndexedValue(self.connector.Properties,'DBMS Name').Value
+        try:                                                        # Stefan Fuchs
+            dbms_version = getIndexedValue(self.connector.Properties,'DBMS Version').Value
+        except pywintypes.com_error:
+            pass                                                    # Stefan Fuchs
+        return supportsTransactions, dbms_name, dbms_version
+
     def _raiseConnectionError(self, errorclass, errorvalue):
         eh = self.errorhandler
         if eh is None:
@@ -341,6 +421,7 @@ class Connection(object):
 
         try:
             self.transaction_level = self.connector.CommitTrans()
+            self._uncommitted = False
             if verbose > 1:
                 print('commit done on connection at %X' % id(self))
             if not (self._autocommit or (self.connector.Attributes & adc.adXactAbortRetaining)):
@@ -368,6 +449,8 @@ class Connection(object):
         """
         self.messages=[]
         if self.transaction_level:  # trying to roll back with no open transaction causes an error
+            self.invalidate_cache()  # results read during the transaction may show changes now undone
+            self._uncommitted = False
             try:
                 self.transaction_level = self.connector.RollbackTrans()
                 if verbose > 1:
@@ -392,6 +475,10 @@ class Connection(object):
             if value not in api.accepted_paramstyles:
                 self._raiseConnectionError(api.NotSupportedError,
                         'paramstyle="%s" not in:%s' % (value, repr(api.accepted_paramstyles)))
+        elif name == 'row_format':
+            if value not in api.accepted_row_formats:
+                self._raiseConnectionError(api.NotSupportedError,
+                        'row_format="%s" not in:%s' % (value, repr(api.accepted_row_formats)))
         elif name == 'variantConversions':
             value = copy.copy(value)  # make a new copy -- no changes in the default, please
         object.__setattr__(self, name, value)
@@ -407,6 +494,37 @@ class Connection(object):
         else:
             raise AttributeError('no such attribute in ADO connection object as="%s"' % item)
 
+    def invalidate_cache(self, *tables):
+        """forget the cached results which read any of these tables -- or all cached results, if none are given.
+
+        Use it when some other program has changed a table. (Any execute() on this connection of a statement
+        which is not a SELECT forgets all cached results.)"""
+        if self.result_cache is not None:
+            self.result_cache.invalidate(*tables)
+
+    def _written(self, *tables):
+        "a statement which may change these tables (or any table, if none are given) is being run"
+        self.invalidate_cache(*tables)
+        if not self._autocommit:
+            self._uncommitted = True  # until commit() or rollback()
+
+    def add_tracer(self, tracer):
+        """call tracer's methods (see adodbapi.tracing.Tracer) as this connection's cursors
+        run statements, fetch rows, and convert them"""
+        self._tracers = self._tracers + (tracer,)
+
+    def remove_tracer(self, tracer):
+        self._tracers = tuple(t for t in self._tracers if t is not tracer)
+
+    def stats(self):
+        """--> a snapshot of the statistics gathered by this connection's tracing.StatsCollector:
+        a dictionary of {normalized statement: dictionary of its statistics}. Empty if none is collecting.
+        (Use the "collect_stats=True" connection keyword, or .add_tracer(tracing.StatsCollector()).)"""
+        for tracer in self._tracers:
+            if isinstance(tracer, tracing.StatsCollector):
+                return tracer.snapshot()
+        return {}
+
     def cursor(self):
         "Return a new Cursor Object using the connection."
         self.messages = []
@@ -480,7 +598,75 @@ class Connection(object):
             schema.MoveNext()
         del schema
         return tables
-    
+
+    def bulk_insert(self, table, columns, rows, batch_size=None, progress=None, recordset_maker=make_COM_recordset):
+        """insert rows into table, batch_size rows at a time, using an ADO batch update --> the number of rows.
+
+        table -- the name of the table, as it is written in SQL
+        columns -- the names of the columns to fill, as they are written in SQL
+        rows -- any iterable (such as a generator) of sequences of values in the order of columns,
+            or of mappings of {column name: value}. Only one batch is held in memory at a time.
+        batch_size -- rows sent with each UpdateBatch() (default defaultBulkBatchSize)
+        progress -- a function called as progress(rows_inserted) after each batch
+        recordset_maker -- a function returning an ADODB.Recordset object (used for testing)
+        The rows are added to an empty client-side Recordset, opened with adLockBatchOptimistic,
+        and sent to the database by its UpdateBatch() method. (They are part of the present transaction,
+        if autocommit is off.)
+        """
+        if self.connector is None:
+            self._raiseConnectionError(api.InterfaceError, 'bulk_insert() on a closed connection')
+        batch_size = batch_size or defaultBulkBatchSize
+        columns = list(columns)
+        self._written(*api.referencedTables('INTO ' + table))
+        source = 'SELECT %s FROM %s WHERE 1=0' % (', '.join(columns), table)  # no rows, just the columns
+        ordinals = list(range(len(columns)))
+        inserted = 0
+        pending = 0
+        rs = None
+        try:
+            for row in rows:
+                if rs is None:
+                    rs = recordset_maker()
+                    rs.CursorLocation = adc.adUseClient
+                    rs.Open(source, self.connector, adc.adOpenStatic, adc.adLockBatchOptimistic, adc.adCmdText)
+                if isinstance(row, Mapping):
+                    row = [row[name] for name in columns]
+                rs.AddNew(ordinals, [dateconverter.COMDate(value) if type(value) in dateconverter.types
+                                     else value for value in row])
+                pending += 1
+                if pending >= batch_size:
+                    inserted += self._update_batch(rs, table, pending)
+                    pending = 0
+                    rs = None  # start the next batch with an empty recordset, so that memory use stays bounded
+                    if progress is not None:
+                        progress(inserted)
+            if pending:
+                inserted += self._update_batch(rs, table, pending)
+                rs = None
+                if progress is not None:
+                    progress(inserted)
+        finally:
+            if rs is not None and rs.State != adc.adStateClosed:
+                try:
+                    rs.CancelBatch()  # throw away the rows not sent
+                    rs.Close()
+                except Exception:
+                    pass
+        return inserted
+
+    def _update_batch(self, rs, table, count):
+        "send the rows added to rs to the database, and close it --> count"
+        try:
+            rs.UpdateBatch()
+        except Exception as e:
+            self._raiseConnectionError(self._suggest_error_class(),
+                                       'bulk_insert() of %d rows into %s failed: %s' % (count, table, e))
+        rs.Close()
+        return count
+
+# finds the parenthesized group of an "INSERT ... VALUES (...)" statement, so that it can be repeated
+_multiRowValuesPattern = re.compile(r'\bVALUES\s*(\(.*\))\s*;?\s*$', re.IGNORECASE | re.DOTALL)
+
 # # # # # ----- the Class that defines a cursor ----- # # # # #
 class Cursor(object):
 ## ** api required attributes:
@@ -514,11 +700,25 @@ class Cursor(object):
         self.messages=[]
         self.connection = connection
         self.paramstyle = connection.paramstyle  # used for overriding the paramstyle
+        self.row_format = connection.row_format  # 'sqlrow', 'compact' or 'tuple'
         self._parameter_names = []
         self.recordset_is_remote = False
         self.rs = None  # the ADO recordset for this cursor
         self.converters = []  # conversion function for each column
+        self.adotypes = ()  # the ADO type of each column
+        self._columns = ()  # (name, type, DefinedSize, Precision, NumericScale, null_ok) for each column
+        self._recordset_number = 0  # which result set of the statement is being read
+        self._parameter_adotypes = ()  # the ADO types of the parameters of the statement being read
         self.columnNames = {} # names of columns {lowercase name : number,...}
+        self._rowclass = None  # the CompactRow class for this result shape
+        self._cached = None  # the api.CachedResult being read, instead of the recordset...
+        self._cached_position = 0  # ...and the next row to be read from it
+        self._prefetched = []  # the api.CachedResults of the later result sets, if they were read ahead
+        self._recordset = None  # the present ADO recordset, even if it is closed (when .rs is None)
+        self._procedure = False  # is the statement a callproc()?
+        self.returned_parameters = None  # the parameters returned when every result set had been read
+        self._trace = None  # a tracing.StatementTrace, while a statement is run for the connection's tracers
+        self.command_cache = api.LRUCache(defaultCommandCacheSize)  # (commandText, ADO types, prepared) --> Command
         self.numberOfColumns = 0
         self._description = None
         self.rowcount = -1
@@ -528,8 +728,11 @@ class Cursor(object):
         if verbose:
             print('%s New cursor at %X on conn %X' % (version, id(self), id(self.connection)))
 
-    def __iter__(self):                   # [2.1 Zamarev]
-        return iter(self.fetchone, None)  # [2.1 Zamarev]
+    def __iter__(self):
+        "Iterate over the (remaining) rows, fetching them from ADO in batches. (see .iter_batches())"
+        for batch in self.iter_batches():
+            for row in batch:
+                yield row
 
     def prepare(self, operation):
         self.command = operation
@@ -557,9 +760,22 @@ class Cursor(object):
         eh(self.connection, self, errorclass, errorvalue)
 
     def build_column_info(self, recordset):
+        """set up to read the recordset: its converters, names, and what the description will be built from.
+
+        The Fields are read through COM in a single pass. For a SELECT statement, what was read is kept in the
+        connection's column_info_cache, keyed by the statement and the ADO types of its parameters, and used
+        again when the statement returns a recordset with the same number of columns, of the same ADO types.
+        (Any CREATE, ALTER, DROP or RENAME statement, and any callproc(), empties that cache.
+        A statement longer than api.defaultQmarkMemoLimit is not kept.)
+        The description itself is made only when it is asked for."""
         self.converters = []  # convertion function for each column
+        self.adotypes = ()
+        self._columns = ()
         self.columnNames = {} # names of columns {lowercase name : number,...}
+        self._rowclass = None
         self._description = None
+        self._cached = None
+        self._recordset = recordset
 
         # if EOF and BOF are true at the same time, there are no records in the recordset
         if (recordset is None) or (recordset.State == adc.adStateClosed):
@@ -569,33 +785,55 @@ class Cursor(object):
         self.rs = recordset        #v2.1.1 bkline
         self.recordset_format = api.RS_ARRAY if api.onIronPython else api.RS_WIN_32
         self.numberOfColumns = recordset.Fields.Count
-        try:
-            varCon = self.connection.variantConversions
-        except AttributeError:
-            varCon = api.variantConversions
-        for i in range(self.numberOfColumns):
-            f = getIndexedValue(self.rs.Fields, i)
+        cache = self.connection.column_info_cache
+        key = None
+        commandText = self.commandText or ''
+        if cache.maxsize and len(commandText) <= api.defaultQmarkMemoLimit and api.isQuery(commandText):
+            key = (self.commandText, self._parameter_adotypes, self._recordset_number, self.numberOfColumns)
+            columns = cache.get(key)
+            if columns is not None and not _same_types(recordset, columns):  # the table was changed elsewhere
+                columns = None
+        else:
+            columns = None
+        if columns is None:
+            columns = []
+            for i in range(self.numberOfColumns):
+                f = getIndexedValue(recordset.Fields, i)
+                columns.append((f.Name, f.Type, f.DefinedSize, f.Precision, f.NumericScale,
+                                bool(f.Attributes & adc.adFldMayBeNull)))  #v2.1 Cole
+            columns = tuple(columns)
+            if key is not None:
+                cache[key] = columns
+        self._columns = columns
+        varCon = self._variant_conversions()
+        for i, column in enumerate(columns):
             try:
-                self.converters.append(varCon[f.Type])  # conversion function for this column
+                self.converters.append(varCon[column[1]])  # conversion function for this column
             except KeyError:
-                self._raiseCursorError(api.InternalError, 'Data column of Unknown ADO type=%s' % f.Type)
-            self.columnNames[f.Name.lower()] = i  # columnNames lookup
+                self._raiseCursorError(api.InternalError, 'Data column of Unknown ADO type=%s' % column[1])
+            self.columnNames[column[0].lower()] = i  # columnNames lookup
+        self.adotypes = tuple(column[1] for column in columns)
+
+    def _variant_conversions(self):
+        "--> the {ADO type: conversion function} mapping for new results"
+        try:
+            return self.connection.variantConversions
+        except AttributeError:
+            return api.variantConversions
 
     def _makeDescriptionFromRS(self):
         # Abort if closed or no recordset.
         if self.rs is None:
             self._description = None
             return
-        desc = []
-        for i in range(self.numberOfColumns):
-            f = getIndexedValue(self.rs.Fields, i)
-            if self.rs.EOF or self.rs.BOF:
-                display_size=None
-            else:
-                display_size=f.ActualSize #TODO: Is this the correct defintion according to the DB API 2 Spec ?
-            null_ok= bool(f.Attributes & adc.adFldMayBeNull)          #v2.1 Cole
-            desc.append((f.Name, f.Type, display_size, f.DefinedSize, f.Precision, f.NumericScale, null_ok))
-        self._description = desc
+        if self.rs.EOF or self.rs.BOF:
+            display_sizes = [None] * self.numberOfColumns
+        else:  # the only part which depends on the data, so it is read from the Fields now
+            #TODO: Is this the correct defintion according to the DB API 2 Spec ?
+            display_sizes = [getIndexedValue(self.rs.Fields, i).ActualSize for i in range(self.numberOfColumns)]
+        self._description = [(name, adotype, display_size, defined_size, precision, scale, null_ok)
+                             for (name, adotype, defined_size, precision, scale, null_ok), display_size
+                             in zip(self._columns, display_sizes)]
 
     def get_description(self):
         if not self._description:
@@ -626,6 +864,7 @@ class Cursor(object):
         if self.connection is None:
             return
         self.messages = []
+        self.command_cache.clear()
         if self.rs and self.rs.State != adc.adStateClosed: # rs exists and is open      #v2.1 Rose
             self.rs.Close()                                                         #v2.1 Rose
             self.rs = None # let go of the recordset so ADO will let it be disposed #v2.1 Rose
@@ -662,6 +901,8 @@ class Cursor(object):
     def _execute_command(self):
         # Stored procedures may have an integer return value
         self.return_value = None
+        self._recordset_number = 0
+        self._prefetched = []
         recordset = None
         count = -1 #default value
         if verbose:
@@ -675,6 +916,8 @@ class Cursor(object):
             else: #pywin32
                 recordset, count = self.cmd.Execute()
             # ----- ------------------------------- ---
+            if self._trace is not None:
+                self._trace.lap('execute')
         except (Exception) as e:
             _message = ""
             if hasattr(e, 'args'): _message += str(e.args)+"\n"
@@ -718,7 +961,7 @@ class Cursor(object):
                 retLst.append(pyObject)
         return retLst   # return the parameter list to the caller
         
-    def callproc(self, procname, parameters=None):
+    def callproc(self, procname, parameters=None, prefetch_sets=False):
         """Call a stored database procedure with the given name.
         The sequence of parameters must contain one entry for each
         argument that the sproc expects. The result of the
@@ -730,24 +973,94 @@ class Cursor(object):
         which is available through the standard .fetch*() methods.
         Extension: A "return_value" property may be set on the
         cursor if the sproc defines an integer return value.
+        Extension: prefetch_sets -- read every result set into memory now (see .execute()), so that the
+        returned parameters (and return_value), which some providers send only after the last result set,
+        are ready.
         """
         self._parameter_names = []
+        self._procedure = True
         self.commandText = procname
-        self._new_command(command_type=adc.adCmdStoredProc)
-        self._buildADOparameterList(parameters, sproc=True)
-        if verbose > 2:
-            print('Calling Stored Proc with Params=', format_parameters(self.cmd.Parameters, True))
-        self._execute_command()
+        self._parameter_adotypes = ()
+        self.connection._written()  # the procedure may change anything
+        self.connection.column_info_cache.clear()  # including the columns of a table
+        self._start_trace()
+        try:
+            self._new_command(command_type=adc.adCmdStoredProc)
+            self._lap('command')
+            self._buildADOparameterList(parameters, sproc=True)
+            self._lap('parameters')
+            if verbose > 2:
+                print('Calling Stored Proc with Params=', format_parameters(self.cmd.Parameters, True))
+            self._execute_command()
+        except BaseException as e:
+            self._end_trace(e)
+            raise
+        self._end_trace('describe')
+        if prefetch_sets:
+            return self._prefetch_sets()
         return self.get_returned_parameters()
 
+    def _start_trace(self):
+        "if the connection has tracers, start timing the statement in self.commandText for them"
+        tracers = self.connection._tracers if self.connection is not None else ()
+        self._trace = tracing.StatementTrace(self, tracers, self.commandText) if tracers else None
+
+    def _lap(self, phase):
+        if self._trace is not None:
+            self._trace.lap(phase)
+
+    def _end_trace(self, last_phase):
+        "finish timing the statement. last_phase -- the phase just ended, or the exception which ended it"
+        trace, self._trace = self._trace, None
+        if trace is not None:
+            if isinstance(last_phase, BaseException):
+                trace.end(last_phase)
+            else:
+                trace.lap(last_phase)
+                trace.end()
+
     def _reformat_operation(self, operation, parameters):
         if self.paramstyle in ('format', 'pyformat'): # convert %s to ?
             operation, self._parameter_names = api.changeFormatToQmark(operation)
         elif self.paramstyle == 'named' or (self.paramstyle == 'dynamic' and isinstance(parameters, Mapping)):
             operation, self._parameter_names = api.changeNamedToQmark(operation) # convert :name to ?
+        elif self.paramstyle == 'numeric':
+            operation, self._parameter_names = api.changeNumericToQmark(operation) # convert :1 to ?
         return operation
 
-    def _buildADOparameterList(self, parameters, sproc=False):
+    def _binding_plan(self, operation, parameters):
+        """return (commandText, parameter names, ADO types) for executing "operation" using "parameters"
+
+        The plan is kept in the connection's plan_cache, keyed by the operation, paramstyle,
+        and the Python types of the parameters, so it is worked out only once.
+        (Except for operations longer than api.defaultQmarkMemoLimit, which are not kept.)"""
+        if len(operation) > api.defaultQmarkMemoLimit:
+            key = plan = None
+        else:
+            if parameters is None:
+                signature = None
+            elif isinstance(parameters, Mapping):
+                signature = tuple((key, type(value)) for key, value in parameters.items())
+            else:
+                signature = tuple(type(value) for value in parameters)
+            key = (operation, self.paramstyle, signature)
+            plan = self.connection.plan_cache.get(key)
+        if plan is None:
+            self._parameter_names = []
+            commandText = operation if (self.paramstyle == 'qmark' or not parameters) \
+                else self._reformat_operation(operation, parameters)
+            if not parameters:
+                adotypes = ()
+            elif self._parameter_names:
+                adotypes = tuple(api.pyTypeToADOType(parameters[name]) for name in self._parameter_names)
+            else:
+                adotypes = tuple(api.pyTypeToADOType(value) for value in parameters)
+            plan = (commandText, tuple(self._parameter_names), adotypes)
+            if key is not None:
+                self.connection.plan_cache[key] = plan
+        return plan
+
+    def _buildADOparameterList(self, parameters, sproc=False, adotypes=None):
         self.parameters = parameters
         if parameters is None:
             parameters = []
@@ -796,9 +1109,11 @@ class Cursor(object):
                         i += 1
             else: #-- build own parameter list
                 if self._parameter_names:  # we expect a dictionary of parameters, this is the list of expected names
-                    for parm_name in self._parameter_names:
+                    for i, parm_name in enumerate(self._parameter_names):
                         elem = parameters[parm_name]
-                        adotype = api.pyTypeToADOType(elem)
+                        adotype = adotypes[i] if adotypes else api.pyTypeToADOType(elem)
+                        if not isinstance(parm_name, StringTypes):  # 'numeric' paramstyle uses an index
+                            parm_name = 'p%i' % i
                         p = self.cmd.CreateParameter(parm_name, adotype, adc.adParamInput)
                         _configure_parameter(p, elem, adotype, parameters_known)
                         try:
@@ -814,7 +1129,7 @@ class Cursor(object):
 
                     for elem in parameters:
                         name='p%i' % i
-                        adotype = api.pyTypeToADOType(elem)
+                        adotype = adotypes[i] if adotypes else api.pyTypeToADOType(elem)
                         p=self.cmd.CreateParameter(name, adotype, adc.adParamInput) # Name, Type, Direction, Size, Value
                         _configure_parameter(p, elem, adotype, parameters_known)
                         try:
@@ -827,7 +1142,7 @@ class Cursor(object):
                 if self._ado_prepared == 'setup':
                     self._ado_prepared = True  # parameters will be "known" by ADO next loop
 
-    def execute(self, operation, parameters=None):
+    def execute(self, operation, parameters=None, prefetch_sets=False):
         """Prepare and execute a database operation (query or command).
 
             Parameters may be provided as sequence or mapping and will be bound to variables in the operation.
@@ -854,49 +1169,292 @@ class Cursor(object):
             The term "bound" refers to the process of binding an input value to a database execution buffer.
             In practical terms, this means that the input value is directly used as a value in the operation.
             The client should not be required to "escape" the value so that it can be used -- the value
-            should be equal to the actual database value. """
-        if self.command is not operation or self._ado_prepared == 'setup' or not hasattr(self, 'commandText'):
-            if self.command is not operation:
-                self._ado_prepared = False
-                self.command = operation
-            self._parameter_names = []
-            self.commandText = operation if (self.paramstyle == 'qmark' or  not parameters) \
-                else self._reformat_operation(operation, parameters)
-        self._new_command()
-        self._buildADOparameterList(parameters)
-        if verbose > 3:
-            print('Params=', format_parameters(self.cmd.Parameters, True))
-        self._execute_command()
+            should be equal to the actual database value.
+
+            Extension: prefetch_sets -- read every result set of the operation into memory now, one after
+            the other, keeping the (unconverted) values a column at a time. The fetch methods, .nextset()
+            and .iter_sets() then read them from memory. (Such results are not put in the result_cache.) """
+        self._procedure = False
+        if self.command is not operation:
+            self._ado_prepared = False
+            self.command = operation
+        self.commandText, self._parameter_names, adotypes = self._binding_plan(operation, parameters)
+        self._parameter_adotypes = adotypes
+        if api.isSchemaChange(self.commandText):
+            self.connection.column_info_cache.clear()  # the columns of any table may change
+        self._start_trace()
+        try:
+            cache = self.connection.result_cache
+            key = None
+            if cache is not None:
+                if api.isQuery(self.commandText):
+                    key = self._result_cache_key(parameters)
+                    entry = None if key is None else cache.get(key)
+                    if entry is not None and not self._same_conversions(entry):
+                        entry = None  # the conversions have been changed since it was read -- read it again
+                    if entry is not None:
+                        self.return_value = None
+                        self._prefetched = []
+                        self._use_cached_result(entry)
+                        self._end_trace('cache')
+                        return
+                else:
+                    self.connection._written()  # this statement may change any table
+            if len(self.commandText) > api.defaultQmarkMemoLimit:  # very long text is not kept
+                command_key = None
+            else:
+                command_key = (self.commandText, adotypes, bool(self._ado_prepared))
+            if command_key is None or not self._reuse_command(command_key, parameters, adotypes):
+                self._new_command()
+                self._lap('command')
+                self._buildADOparameterList(parameters, adotypes=adotypes)
+            self._lap('parameters')
+            if verbose > 3:
+                print('Params=', format_parameters(self.cmd.Parameters, True))
+            self._execute_command()
+            if command_key is not None and self.command_cache.maxsize and _reusable(adotypes):
+                self.command_cache[command_key] = self.cmd
+            if prefetch_sets:
+                self._end_trace('describe')
+                self._prefetch_sets()
+                return
+            if key is not None and not self.connection._uncommitted:
+                self._lap('describe')
+                self._cache_result(cache, key)
+                self._end_trace('cache')
+                return
+        except BaseException as e:
+            self._end_trace(e)
+            raise
+        self._end_trace('describe')
+
+    def _reuse_command(self, command_key, parameters, adotypes):
+        """if command_cache holds the ADO Command for command_key, make it self.cmd with the new parameter values.
+        --> True if it did. (The Command is taken out of the cache until it has executed without an error.)"""
+        cmd = self.command_cache.pop(command_key) if self.command_cache.maxsize else None
+        if cmd is None:
+            if self.command_cache.maxsize:
+                self.command_cache.misses += 1
+            return False
+        self.command_cache.hits += 1
+        self.messages = []
+        self.cmd = cmd
+        self.parameters = parameters
+        if self._parameter_names:
+            values = [parameters[name] for name in self._parameter_names]
+        else:
+            values = parameters or ()
+        self.cmd.CommandTimeout = self.connection.timeout
+        self._set_parameter_values(values, adotypes)
+        return True
+
+    def _set_parameter_values(self, values, adotypes):
+        "put new values into the Parameters of self.cmd, which were built for values of these ADO types"
+        for i, value in enumerate(values):
+            p = getIndexedValue(self.cmd.Parameters, i)
+            try:
+                _configure_parameter(p, value, adotypes[i], False)
+            except Exception as e:
+                _message = 'Error Converting Parameter %s: %s, %s <- %s\n' % \
+                           (p.Name, adc.ado_type_name(p.Type), p.Value, repr(value))
+                self._raiseCursorError(api.DataError, _message + '->' + repr(e.args))
+
+    def _result_cache_key(self, parameters):
+        "the result_cache key for executing self.commandText with parameters, or None if they cannot be hashed"
+        if not parameters:
+            values = ()
+        elif self._parameter_names:
+            values = tuple(parameters[name] for name in self._parameter_names)
+        else:
+            values = tuple(parameters)
+        key = (self.commandText, tuple((type(value), value) for value in values))  # 1, 1.0 and True differ
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def _same_conversions(self, entry):
+        "would the results of a cached entry be converted now as they were when it was read?"
+        varCon = self._variant_conversions()
+        return all(varCon.get(d[1]) is converter for d, converter in zip(entry.description, entry.converters))
 
-    def executemany(self, operation, seq_of_parameters):
+    def _cache_result(self, cache, key):
+        "read the whole result set into the cache, then let the fetch methods read it from there"
+        if self.rs is None:
+            return
+        entry = self._read_whole_set(self.rowcount, api.referencedTables(self.commandText))
+        cache.put(key, entry)
+        self._cached = entry
+        self._cached_position = 0
+        self.recordset_format = api.RS_WIN_32  # the layout of CachedResult.rows()
+
+    def _read_whole_set(self, rowcount=None, tags=()):
+        """read the rest of the current result set --> an api.CachedResult holding its (unconverted) columns.
+        rowcount -- for the CachedResult, if not the number of rows read"""
+        description = self.get_description()  # before the recordset is read to its end
+        rows = self._get_rows()
+        if rows is None:
+            columns, length = [() for _ in range(self.numberOfColumns)], 0
+        else:
+            ado_results, length = rows
+            columns = api.columns_from_ado_results(ado_results, length, self.numberOfColumns, self.recordset_format)
+        return api.CachedResult(columns, length, description, list(self.converters), dict(self.columnNames),
+                                length if rowcount is None else rowcount, tags)
+
+    def _prefetch_sets(self):
+        """read every result set of the statement just executed into memory (see execute()), then,
+        for a procedure, the returned parameters --> .returned_parameters"""
+        rowcount = self.rowcount
+        sets = []
+        if self.rs is not None or self._advance():
+            while True:
+                sets.append(self._read_whole_set(rowcount))
+                rowcount = None  # later sets count the rows read
+                if not self._advance():
+                    break
+        if self._procedure:
+            self.returned_parameters = self.get_returned_parameters()
+        if sets:
+            self._use_cached_result(sets[0])
+            self._prefetched = sets[1:]
+        return self.returned_parameters
+
+    def _use_cached_result(self, entry):
+        "set up to fetch a result from the cache, as though the query had just been executed"
+        self.messages = []
+        self.build_column_info(None)
+        self.numberOfColumns = len(entry.columns)
+        self.converters = list(entry.converters)  # the cursor's own copies, which it may change
+        self.adotypes = tuple(d[1] for d in entry.description)
+        self.columnNames = dict(entry.columnNames)
+        self._description = entry.description
+        self.rowcount = entry.rowcount
+        self.recordset_format = api.RS_WIN_32
+        self._cached = entry
+        self._cached_position = 0
+
+    def executemany(self, operation, seq_of_parameters, rows_per_statement=1, commit_interval=None):
         """Prepare a database operation (query or command)
         and then execute it against all parameter sequences or mappings found in the sequence seq_of_parameters.
 
             Return values are not defined.
+
+            The ADO Command and its Parameters are built once, and only the parameter values are
+            changed for each row. (The Command is rebuilt if the data types change from one row to the next.)
+            seq_of_parameters may be any iterable, including a generator.
+
+            Extensions:
+            rows_per_statement -- for an "INSERT ... VALUES (...)" operation, send this many rows
+                with each statement by repeating the "(...)" group. The database must support multi-row VALUES.
+            commit_interval -- commit() after every commit_interval rows.
+            When done, .executemany_rows, .executemany_seconds and .rows_per_second report on the run.
         """
-        self.messages = list()                
+        self.messages = list()
+        self.connection._written()  # the statements may change any table
+        if api.isSchemaChange(operation):
+            self.connection.column_info_cache.clear()  # the columns of any table may change
         total_recordcount = 0
+        start_time = time.perf_counter()
+        row_count = 0
+        uncommitted = 0
 
         self.prepare(operation)
-        for params in seq_of_parameters:
-            self.execute(self.command, params)
-            if self.rowcount == -1:
-                total_recordcount = -1
-            if total_recordcount != -1:
-                total_recordcount += self.rowcount
+        seq_of_parameters = iter(seq_of_parameters)
+        no_more = object()
+        params = next(seq_of_parameters, no_more)
+        if params is not no_more:
+            commandText, parameter_names, adotypes = self._binding_plan(operation, params)
+            packing = None
+            if rows_per_statement > 1:
+                match = _multiRowValuesPattern.search(commandText)
+                if match:
+                    packing = commandText[:match.start(1)], match.group(1), commandText[match.end(1):]
+            bound = None  # (commandText, ADO types) of the ADO Command presently built
+            pending = []
+            while params is not no_more:
+                if parameter_names:  # put the values in the order of the "?"s
+                    pending.append([params[name] for name in parameter_names])
+                else:
+                    pending.append(list(params) if params else [])
+                params = next(seq_of_parameters, no_more)
+                if packing and len(pending) < rows_per_statement and params is not no_more:
+                    continue  # keep gathering rows
+                if packing and len(pending) > 1:
+                    statement = packing[0] + ','.join([packing[1]] * len(pending)) + packing[2]
+                else:
+                    statement = commandText
+                values = [value for row in pending for value in row]
+                bound = self._execute_bound(statement, values, bound)
+                if self.rowcount == -1:
+                    total_recordcount = -1
+                if total_recordcount != -1:
+                    total_recordcount += self.rowcount
+                row_count += len(pending)
+                uncommitted += len(pending)
+                pending = []
+                if commit_interval and uncommitted >= commit_interval:
+                    self.connection.commit()
+                    uncommitted = 0
+            self._parameter_names = parameter_names
+            self.commandText = commandText
         self.rowcount = total_recordcount
-
-    def _fetch(self, limit=None):
-        """Fetch rows from the current recordset.
-
-        limit -- Number of rows to fetch, or None (default) to fetch all rows.
-        """
+        self.executemany_rows = row_count
+        self.executemany_seconds = time.perf_counter() - start_time
+        self.rows_per_second = row_count / self.executemany_seconds if self.executemany_seconds else 0.0
+
+    def _execute_bound(self, statement, values, bound):
+        """execute the qmark "statement" with the sequence of "values",
+        re-using the present ADO Command if "bound" shows that it was built for the same statement and types.
+        Returns what was bound."""
+        adotypes = tuple(api.pyTypeToADOType(value) for value in values)
+        self.parameters = values
+        self.commandText = statement
+        self._parameter_adotypes = adotypes
+        self._procedure = False
+        self._start_trace()
+        try:
+            if bound == (statement, adotypes):
+                self.messages = []
+                self._set_parameter_values(values, adotypes)  # just change the values
+            else:  # build a new Command
+                self._parameter_names = []
+                self._ado_prepared = 'setup'
+                self._new_command()
+                self._lap('command')
+                self._buildADOparameterList(values)
+                bound = (statement, adotypes) if _reusable(adotypes) else None
+            self._lap('parameters')
+            if verbose > 3:
+                print('Params=', format_parameters(self.cmd.Parameters, True))
+            self._execute_command()
+        except BaseException as e:
+            self._end_trace(e)
+            raise
+        self._end_trace('describe')
+        return bound
+
+    def _get_rows(self, limit=None):
+        """read rows from the current recordset (or cached result) --> (ado_results, number of rows),
+        or None if there are no more rows. limit -- Number of rows to read, or None (default) to read all rows."""
+        tracers = self.connection._tracers if self.connection is not None else ()
+        if tracers:
+            return tracing.traced_fetch(self, tracers, limit, self._read_rows)
+        return self._read_rows(limit)
+
+    def _read_rows(self, limit):
+        if self._cached is not None and self.connection is not None:
+            if self._cached_position >= self._cached.numberOfRows:
+                return None
+            ado_results, length = self._cached.rows(self._cached_position, limit or None)
+            self._cached_position += length
+            return ado_results, length
         if self.connection is None or self.rs is None:
             self._raiseCursorError(api.FetchFailedError, 'fetch() on closed connection or empty query set')
-            return
+            return None
 
         if self.rs.State == adc.adStateClosed or self.rs.BOF or self.rs.EOF:
-            return list()
+            return None
         if limit: # limit number of rows retrieved
             ado_results = self.rs.GetRows(limit)
         else:    # get all rows
@@ -905,8 +1463,32 @@ class Cursor(object):
             length = len(ado_results) // self.numberOfColumns # length of first dimension
         else: #pywin32
             length = len(ado_results[0]) #result of GetRows is tuples in a tuple
-        fetchObject = api.SQLrows(ado_results, length, self) # new object to hold the results of the fetch
-        return fetchObject
+        return ado_results, length
+
+    def _fetch(self, limit=None):
+        """Fetch rows from the current recordset.
+
+        limit -- Number of rows to fetch, or None (default) to fetch all rows.
+        """
+        rows = self._get_rows(limit)
+        if rows is None:
+            return list()
+        ado_results, length = rows
+        if self.row_format == 'sqlrow':
+            fetchObject = api.SQLrows(ado_results, length, self) # new object to hold the results of the fetch
+            return fetchObject
+        if self.row_format == 'tuple':
+            return self._converted(length, api.tuple_rows, ado_results, length, self)
+        if self.row_format == 'compact':
+            if self._rowclass is None:  # the first fetch from this result set
+                if self._cached is not None:
+                    names = tuple(d[0].lower() for d in self._cached.description)
+                else:
+                    names = tuple(column[0].lower() for column in self._columns)  # as read by build_column_info
+                self._rowclass = api.compactRowClass(names)
+            return self._converted(length, api.tuple_rows, ado_results, length, self, self._rowclass)
+        self._raiseCursorError(api.NotSupportedError,
+                               'row_format="%s" not in:%s' % (self.row_format, repr(api.accepted_row_formats)))
 
     def fetchone(self):
         """ Fetch the next row of a query result set, returning a single sequence,
@@ -954,6 +1536,91 @@ class Cursor(object):
         self.messages=[]                
         return self._fetch()
 
+    def _fetch_columns(self, limit=None):
+        """Fetch rows from the current recordset as a list of converted columns.
+
+        limit -- Number of rows to fetch, or None (default) to fetch all rows.
+        No SQLrow objects are built: each column's converter is applied once across the whole column.
+        """
+        rows = self._get_rows(limit)
+        if rows is None:
+            return [[] for _ in range(self.numberOfColumns)]
+        ado_results, length = rows
+        columns = api.columns_from_ado_results(ado_results, length, self.numberOfColumns, self.recordset_format)
+        return self._converted(length, list, map(api.convert_column_to_python, columns, self.converters))
+
+    def _converted(self, rows, convert, *args):
+        "--> convert(*args), which converts rows rows, timed for the connection's tracers"
+        tracers = self.connection._tracers
+        if tracers:
+            return tracing.traced_conversion(self, tracers, rows, convert, args)
+        return convert(*args)
+
+    def fetchmany_columns(self, size=None):
+        """Fetch the next set of rows of a query result, returning a list of columns (extension).
+
+        Each column is a list holding one converted Python value per row, in the order of .description.
+        An empty list is returned for each column when no more rows are available.
+        """
+        self.messages=[]
+        if size is None:
+            size = self.arraysize
+        return self._fetch_columns(size)
+
+    def fetchall_columns(self):
+        """Fetch all (remaining) rows of a query result, returning a list of columns (extension).
+
+            This is much faster than fetchall() for large result sets, since no per-row objects are built.
+            Use zip(*columns) if you want a sequence of plain row tuples.
+        """
+        self.messages=[]
+        return self._fetch_columns()
+
+    def fetch_numpy(self, size=None, chunk_rows=None):
+        """Fetch (up to size) remaining rows as a dictionary of {column name: numpy array} (extension).
+
+        Each column is typed from its ADO type: int64, bool, float64 or datetime64[us], as a numpy.ma.MaskedArray
+        if it holds any Nulls. Other columns are object arrays. The rows are read chunk_rows at a time
+        (default adodbapi.arrays.defaultChunkRows) straight into the arrays. Needs numpy.
+        """
+        from . import arrays  # numpy is imported only if this is used
+        self.messages = []
+        return arrays.fetch_numpy(self, size, chunk_rows)
+
+    def fetch_arrow(self, size=None, chunk_rows=None):
+        """Fetch (up to size) remaining rows as a pyarrow.Table (extension).
+
+        Columns are typed from their ADO types (int64, bool, float64, timestamp, decimal128, string, binary).
+        The rows are read chunk_rows at a time, and each chunk becomes a record batch. Needs pyarrow.
+        """
+        from . import arrays  # pyarrow is imported only if this is used
+        self.messages = []
+        return arrays.fetch_arrow(self, size, chunk_rows)
+
+    def iter_batches(self, size=None):
+        """Iterate over the (remaining) rows of a query result, yielding one SQLrows batch at a time (extension).
+
+        size -- the number of rows to fetch with each ADO GetRows() call.
+            If None, the size is tuned from the width of the rows already fetched, so that each batch
+            holds about defaultBatchBytes of data. Only one batch is held in memory at a time,
+            no matter how large the result set is.
+        """
+        batch_size = size or self.arraysize
+        while True:
+            self.messages = []
+            batch = self._fetch(batch_size)
+            if not batch:
+                return
+            yield batch
+            if size is None:
+                batch_size = self._tune_batch_size(batch)
+
+    def _tune_batch_size(self, batch):
+        "estimate a batch size (in rows) which will fetch about defaultBatchBytes of data"
+        sample = batch[len(batch) // 2] # a typical row
+        width = sum(sys.getsizeof(value) for value in sample) or 1
+        return max(minBatchRows, min(maxBatchRows, defaultBatchBytes // width))
+
     def nextset(self):
         """Skip to the next available recordset, discarding any remaining rows from the current recordset.
 
@@ -964,27 +1631,74 @@ class Cursor(object):
             did not produce any result set or no call was issued yet.
         """
         self.messages=[]                
+        if self.rs is None and self._cached is not None and self.connection is not None:
+            return self._advance()  # results from the cache, or read ahead by prefetch_sets
         if self.connection is None or self.rs is None:
             self._raiseCursorError(api.OperationalError, ('nextset() on closed connection or empty query set'))
             return None
+        recordset = self._next_recordset(self.rs)
+        if recordset is None:
+            return None
+        self._recordset_number += 1
+        self.build_column_info(recordset)
+        return True
 
+    def _next_recordset(self, recordset):
+        "--> ADO recordset.NextRecordset(), or None if there are no more"
         if api.onIronPython:
             try:
-                recordset = self.rs.NextRecordset()
+                recordset = recordset.NextRecordset()
             except TypeError:
                 recordset = None
             except api.Error as exc:
                 self._raiseCursorError(api.NotSupportedError, exc.args)
         else: #pywin32
             try:                                               #[begin 2.1 ekelund]
-                rsTuple=self.rs.NextRecordset()                # 
+                rsTuple=recordset.NextRecordset()              # 
             except pywintypes.com_error as exc:                  # return appropriate error
                 self._raiseCursorError(api.NotSupportedError, exc.args)#[end 2.1 ekelund]
             recordset = rsTuple[0]
-        if recordset is None:
+        return recordset
+
+    def _advance(self):
+        """make the next result set which has columns the current one --> True, or None if there are no more.
+
+        Unlike nextset(), this passes over the closed recordsets of statements which return no rows."""
+        if self.rs is None and self._cached is not None:  # results held in memory
+            if self._prefetched:
+                self._use_cached_result(self._prefetched.pop(0))
+                return True
+            self.build_column_info(None)
             return None
-        self.build_column_info(recordset)
-        return True
+        while self._recordset is not None:
+            recordset = self._next_recordset(self._recordset)
+            if recordset is None:
+                self._recordset = None
+                return None
+            self._recordset_number += 1
+            self.build_column_info(recordset)
+            if self.rs is not None:
+                return True
+        return None
+
+    def iter_sets(self, size=None):
+        """Iterate over the result sets of the last operation (extension), from the current one on,
+        yielding (description, batches) for each, where batches iterates over its rows (see .iter_batches()).
+
+        Read (or skip) each set's batches before asking for the next set. Sets without columns are passed over.
+        When a callproc()'s sets have all been read, its returned parameters are put in .returned_parameters
+        (and .return_value) -- unless callproc(prefetch_sets=True) has already done so.
+        """
+        if self.connection is None:
+            self._raiseCursorError(api.InterfaceError, None)
+        prefetched = self.rs is None and self._cached is not None
+        if self.rs is not None or self._cached is not None or self._advance():
+            while True:
+                yield self.get_description(), self.iter_batches(size)
+                if not self._advance():
+                    break
+        if self._procedure and not prefetched:
+            self.returned_parameters = self.get_returned_parameters()
 
     def setinputsizes(self,sizes):
         pass
@@ -0,0 +1,225 @@
+"""adodbapi.aio - use adodbapi from asyncio programs
+
+An ADO connection must stay on the thread which made it. So each AsyncConnection is pinned to one
+worker thread (which has called CoInitialize) and every call on it, or on its cursors, is queued to that thread.
+Many connections share a bounded set of worker threads.
+
+    import adodbapi.aio
+    async def main():
+        conn = await adodbapi.aio.connect(connection_string)  # same arguments as adodbapi.connect()
+        crsr = await conn.cursor()
+        await crsr.execute('SELECT name, price FROM cheese WHERE price > ?', [10])
+        async for row in crsr:  # rows are fetched in batches, reading ahead by no more than one batch
+            print(row.name, row.price)
+        await conn.close()
+"""
+import asyncio
+import threading
+
+from . import adodbapi as ado
+from . import apibase as api
+from .workers import Worker, WorkerPool
+
+# ------- module level defaults --------
+defaultMaxWorkers = 4  # database threads in the default WorkerPool
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+def get_default_pool():
+    "--> the WorkerPool used when connect() is not given one"
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = WorkerPool(defaultMaxWorkers)
+        return _default_pool
+
+
+async def connect(*args, **kwargs):
+    """open a connection on a worker thread --> an AsyncConnection
+
+    Takes the same arguments as adodbapi.connect(), plus:
+    :workers -- the WorkerPool to use (default: get_default_pool())
+    """
+    pool = kwargs.pop('workers', None) or get_default_pool()
+    worker = pool.acquire()
+    try:
+        connection = await asyncio.wrap_future(worker.submit(ado.connect, *args, **kwargs))
+    except:
+        pool.release(worker)
+        raise
+    return AsyncConnection(connection, worker, pool)
+
+
+class AsyncConnection(object):
+    """an adodbapi Connection whose methods are run on the worker thread where it was opened.
+
+    Attributes (like .dbms_name or .paramstyle) are read directly from the Connection.
+    Use "await conn.run(func, ...)" to run anything else on the connection's thread.
+    """
+    def __init__(self, connection, worker, pool=None):
+        self.connection = connection
+        self.worker = worker
+        self.pool = pool
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.connection, name)
+
+    def run(self, func, *args, **kwargs):
+        "run func(*args, **kwargs) on this connection's thread --> an awaitable of its result"
+        if self.connection is None:
+            raise api.InterfaceError('this AsyncConnection has been closed')
+        return asyncio.wrap_future(self.worker.submit(func, *args, **kwargs))
+
+    def _call(self, name, *args):
+        "run the Connection's method 'name' on its thread"
+        if self.connection is None:
+            raise api.InterfaceError('this AsyncConnection has been closed')
+        return self.run(getattr(self.connection, name), *args)
+
+    async def cursor(self):
+        "--> a new AsyncCursor"
+        return AsyncCursor(self, await self._call('cursor'))
+
+    async def commit(self):
+        return await self._call('commit')
+
+    async def rollback(self):
+        return await self._call('rollback')
+
+    async def set_autocommit(self, value):
+        return await self._call('__setattr__', 'autocommit', value)
+
+    async def close(self):
+        "close the connection, and free its place on the worker thread"
+        if self.connection is None:
+            return
+        try:
+            await self._call('close')
+        finally:
+            self.connection = None
+            if self.pool is not None:
+                self.pool.release(self.worker)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            await self._call('__exit__', exc_type, exc_val, exc_tb)  # commit, or roll back on errors
+        finally:
+            await self.close()
+
+
+class AsyncCursor(object):
+    """an adodbapi Cursor whose methods are run on its connection's worker thread.
+
+    Attributes (like .rowcount or .description) are read directly from the Cursor.
+    """
+    def __init__(self, connection, cursor):
+        self.connection = connection  # the AsyncConnection
+        self.cursor = cursor
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.cursor, name)
+
+    def _run(self, func, *args, **kwargs):
+        return self.connection.run(func, *args, **kwargs)
+
+    def _describe(self, method, *args):
+        "call a Cursor method, then read the description while still on the worker thread"
+        result = method(*args)
+        self.cursor.get_description()
+        return result
+
+    async def execute(self, operation, parameters=None):
+        return await self._run(self._describe, self.cursor.execute, operation, parameters)
+
+    async def executemany(self, operation, seq_of_parameters):
+        return await self._run(self.cursor.executemany, operation, seq_of_parameters)
+
+    async def callproc(self, procname, parameters=None):
+        return await self._run(self._describe, self.cursor.callproc, procname, parameters)
+
+    async def nextset(self):
+        return await self._run(self._describe, self.cursor.nextset)
+
+    async def fetchone(self):
+        return await self._run(self.cursor.fetchone)
+
+    async def fetchmany(self, size=None):
+        return await self._run(self.cursor.fetchmany, size)
+
+    async def fetchall(self):
+        return await self._run(self.cursor.fetchall)
+
+    async def close(self):
+        return await self._run(self.cursor.close)
+
+    def iter_batches(self, size=None):
+        """Iterate over the (remaining) rows, yielding one batch at a time. See Cursor.iter_batches().
+
+        The next batch is fetched on the worker thread while the caller works on this one,
+        but never more than one batch ahead, so a slow consumer holds back the fetching."""
+        return _BatchIterator(self, size)
+
+    def __aiter__(self):
+        return _RowIterator(_BatchIterator(self, None))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+# (asynchronous iterators are classes, not "async def" generators, which need Python 3.6)
+class _BatchIterator(object):
+    "the asynchronous iterator of AsyncCursor.iter_batches()"
+    def __init__(self, cursor, size):
+        self.cursor = cursor  # the AsyncCursor
+        self.size = size
+        self.batches = None  # the Cursor's iter_batches() generator, once started
+        self.pending = None  # the awaitable of the next batch
+        self.done = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.done:
+            raise StopAsyncIteration
+        if self.batches is None:
+            self.batches = await self.cursor._run(self.cursor.cursor.iter_batches, self.size)
+            self.pending = self.cursor._run(next, self.batches, None)
+        batch = await self.pending
+        if not batch:
+            self.done = True
+            self.pending = None
+            raise StopAsyncIteration
+        self.pending = self.cursor._run(next, self.batches, None)  # read ahead by one batch
+        return batch
+
+
+class _RowIterator(object):
+    "the asynchronous iterator of 'async for row in cursor'"
+    def __init__(self, batches):
+        self.batches = batches  # a _BatchIterator
+        self.batch = ()
+        self.position = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while self.position >= len(self.batch):
+            self.batch = await self.batches.__anext__()  # raises StopAsyncIteration at the end
+            self.position = 0
+        row = self.batch[self.position]
+        self.position += 1
+        return row
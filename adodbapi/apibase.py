@@ -7,9 +7,12 @@ Copyright (C) 2002 Henrik Ekelund, version 2.1 by Vernon Cole
 
 import sys
 import time
+import collections
 import datetime
 import decimal
+import functools
 import numbers
+import re
 # noinspection PyUnresolvedReferences
 from . import ado_consts as adc
 
@@ -174,6 +177,25 @@ class TimeConverter(object):  # this is a generic time converter skeleton
     def DateObjectFromCOMDate(self,comDate):
         'Returns an object of the wanted type from a ComDate'
         raise NotImplementedError   #"Abstract class"
+    def DateObjectsFromCOMDates(self, comDates):
+        'Returns a list of objects of the wanted type from a sequence of ComDates (None stays None)'
+        return [None if isinstance(comDate, NullTypes) else self.DateObjectFromCOMDate(comDate)
+                for comDate in comDates]
+    def Datetime64FromCOMDates(self, comDates):
+        'Returns a numpy datetime64[ms] array from a sequence of ComDates (None becomes NaT)'
+        try:
+            import numpy
+        except ImportError:
+            raise NotSupportedError('numpy must be installed to convert ComDates to datetime64')
+        values = numpy.array([numpy.nan if isinstance(d, NullTypes) else
+                              self.COMDate(d) if isinstance(d, datetime.datetime) else float(d)
+                              for d in comDates], dtype=numpy.float64)
+        nulls = numpy.isnan(values)
+        # ComDate is number of days since 1899-12-31, numpy epoch is 1970-1-1 = 25569 days
+        millis = numpy.round((numpy.where(nulls, 25569.0, values) - 25569.0) * 86400000.0)
+        result = millis.astype(numpy.int64).astype('datetime64[ms]')
+        result[nulls] = numpy.datetime64('NaT')
+        return result
     def Date(self,year,month,day):
         "This function constructs an object holding a date value. "
         raise NotImplementedError   #"Abstract class"
@@ -246,6 +268,45 @@ class pythonDateTimeConverter(TimeConverter): # standard since Python 2.3
             + datetime.timedelta(milliseconds=floatpart*86400000)
         # millisecondsperday=86400000 # 24*60*60*1000
         return dte
+    def DateObjectsFromCOMDates(self, comDates):
+        'Returns a list of datetime objects from a sequence of ComDates, converting a whole column in one pass'
+        days = {}  # cache of (midnight, year, month, day) by ComDate day number -- columns repeat days a lot
+        ordinal_1899_12_31 = self._ordinal_1899_12_31
+        fromordinal = datetime.datetime.fromordinal
+        newDateTime = datetime.datetime
+        result = []
+        append = result.append
+        for comDate in comDates:
+            if isinstance(comDate, NullTypes):
+                append(None)
+                continue
+            if isinstance(comDate, datetime.datetime):  # pywin32 hands us (aware) datetimes -- make non aware
+                append(newDateTime(comDate.year, comDate.month, comDate.day, comDate.hour,
+                                   comDate.minute, comDate.second, comDate.microsecond))
+                continue
+            if isinstance(comDate, DateTime):
+                comDate = comDate.ToOADate() # ironPython clr Date/Time
+            fComDate = float(comDate)
+            integerPart = int(fComDate)
+            try:
+                day = days[integerPart]
+            except KeyError:
+                midnight = fromordinal(integerPart + ordinal_1899_12_31)
+                day = days[integerPart] = (midnight, midnight.year, midnight.month, midnight.day)
+            if fComDate == integerPart:  # a plain date
+                append(day[0])  # datetimes are immutable, so the cached one can be shared
+                continue
+            milliseconds = (fComDate - integerPart) * 86400000
+            wholeMilliseconds = int(milliseconds)  # round exactly the way timedelta(milliseconds=) does
+            microseconds = wholeMilliseconds * 1000 + round((milliseconds - wholeMilliseconds) * 1000)
+            if not 0 <= microseconds < 86400000000:  # negative or rounded up to midnight: do it the slow way
+                append(self.DateObjectFromCOMDate(fComDate))
+                continue
+            seconds, microseconds = divmod(microseconds, 1000000)
+            minutes, seconds = divmod(seconds, 60)
+            hours, minutes = divmod(minutes, 60)
+            append(newDateTime(day[1], day[2], day[3], hours, minutes, seconds, microseconds))
+        return result
     def Date(self,year,month,day):
         return datetime.date(year,month,day)
     def Time(self,hour,minute,second):
@@ -286,7 +347,7 @@ apilevel='2.0' #String constant stating the supported DB API level.
 paramstyle='qmark' # the default parameter style
 
 # ------ control for an extension which may become part of DB API 3.0 ---
-accepted_paramstyles = ('qmark', 'named', 'format', 'pyformat', 'dynamic')
+accepted_paramstyles = ('qmark', 'named', 'format', 'pyformat', 'numeric', 'dynamic')
 
 #------------------------------------------------------------------------------------------
 # define similar types for generic conversion routines
@@ -369,6 +430,10 @@ def variantConvertDate(v):
     from . import dateconverter  # this function only called when adodbapi is running
     return dateconverter.DateObjectFromCOMDate(v)
 
+def variantConvertDateColumn(column):  # convert a whole column of dates at once
+    from . import dateconverter  # this function only called when adodbapi is running
+    return dateconverter.DateObjectsFromCOMDates(column)
+
 def cvtString(variant):  # use to get old action of adodbapi v1 if desired
     if onIronPython:
         try:
@@ -422,6 +487,25 @@ def convert_to_python(variant, func): # convert DB value into Python value
         return None
     return func(variant)  # call the appropriate conversion function
 
+def convert_column_to_python(column, func): # convert a whole column of DB values into Python values
+    """apply the conversion function "func" across every value in "column", returning a list.
+
+    Nulls are passed through as None, exactly as convert_to_python() would do for a single value."""
+    if func is NotImplemented or (func is identity and not onIronPython):
+        return list(column)  # nothing to convert
+    columnFunc = columnConversions.get(func)
+    if columnFunc is not None:  # there is a function which does the whole column at once
+        return columnFunc(column)
+    return [None if isinstance(v, NullTypes) else func(v) for v in column]
+
+def columns_from_ado_results(ado_results, numberOfRows, numberOfColumns, recordset_format):
+    """return the raw result of a GetRows() as a sequence of columns, whatever its layout"""
+    if recordset_format == RS_ARRAY: # two-dimensional array
+        return [[ado_results[j, i] for i in range(numberOfRows)] for j in range(numberOfColumns)]
+    elif recordset_format == RS_REMOTE: # list of rows
+        return [[row[j] for row in ado_results] for j in range(numberOfColumns)]
+    return ado_results  # pywin32 - already a tuple of column tuples
+
 class MultiMap(dict): #builds a dictionary from {(sequence,of,keys) : function}
     """A dictionary of ado.type : function -- but you can set multiple items by passing a sequence of keys"""
     #useful for defining conversion functions for groups of similar data types.
@@ -451,6 +535,202 @@ variantConversions = MultiMap( {
     adoBinaryTypes: cvtBuffer,
     adoRemainingTypes: cvtUnusual })
 
+# functions which convert a whole column at once, used in place of the single value function (the key)
+columnConversions = {variantConvertDate: variantConvertDateColumn}
+
+class LRUCache(object):
+    """A dictionary-like cache which holds at most maxsize items, discarding the least recently used.
+
+    .hits and .misses count the results of .get(), so that a programmer can decide on a good maxsize."""
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = collections.OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)  # throw away the oldest
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def pop(self, key, default=None):
+        return self._items.pop(key, default)
+
+    def clear(self):
+        self._items.clear()
+
+    def stats(self):
+        "return a dictionary of statistics about this cache"
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._items), 'maxsize': self.maxsize,
+                'hit_ratio': self.hits / lookups if lookups else 0.0}
+
+# # # # # a cache of whole query results, used when a Connection's result_cache is set # # # # #
+_name = r'(?:\[[^\]]*\]|"[^"]*"|`[^`]*`|[\w#@$]+)'
+_tableName = r'%s(?:\s*\.\s*%s)*' % (_name, _name)
+_alias = r'(?:\s+(?:as\s+)?(?!(?:join|inner|left|right|full|cross|outer|on|where|group|order|having|union|set|values)\b)\w+)?'
+_tableListPattern = re.compile(r'\b(?:from|join|update|into|table)\s+(%s%s(?:\s*,\s*%s%s)*)'
+                               % (_tableName, _alias, _tableName, _alias), re.IGNORECASE)
+_tableInListPattern = re.compile(r'(?:^|,)\s*(%s)' % _tableName)
+_selectPattern = re.compile(r'\s*(?:(?:--[^\n]*(?:\n|$)|/\*.*?\*/)\s*)*\(*\s*select\b', re.IGNORECASE | re.DOTALL)
+_intoPattern = re.compile(r'\binto\b', re.IGNORECASE)
+_batchPattern = re.compile(r';\s*\S')  # a ";" with another statement after it
+
+def isQuery(operation):
+    """is this a plain SELECT statement -- one which changes nothing, so that its result may be cached?
+    (A batch of statements is not, even if it starts with a SELECT.)"""
+    return bool(_selectPattern.match(operation)) and not _intoPattern.search(operation) \
+        and not _batchPattern.search(operation)
+
+_schemaChangePattern = re.compile(r'\s*(?:(?:--[^\n]*(?:\n|$)|/\*.*?\*/)\s*)*'
+                                  r'(?:create|alter|drop|rename|exec(?:ute)?\s+sp_rename)\b', re.IGNORECASE | re.DOTALL)
+
+def isSchemaChange(operation):
+    "is this a statement (CREATE, ALTER, DROP or RENAME) which may change the columns of a table?"
+    return bool(_schemaChangePattern.match(operation))
+
+def referencedTables(operation):
+    """return the (lower case, unqualified) names of the tables an SQL statement uses, as a frozenset
+
+    Looks for names after FROM, JOIN, UPDATE, INTO and TABLE, including comma separated lists."""
+    tables = set()
+    for tableList in _tableListPattern.findall(operation):
+        for table in _tableInListPattern.findall(tableList):
+            name = re.split(r'\s*\.\s*', table)[-1]
+            if name[:1] in '["`':
+                name = name[1:-1]
+            tables.add(name.lower())
+    return frozenset(tables)
+
+class CachedResult(object):
+    """a whole result set kept by a ResultCache -- its columns of values as ADO returned them (unconverted),
+    with what a cursor needs to read them again"""
+    __slots__ = ('columns', 'numberOfRows', 'description', 'converters', 'columnNames', 'rowcount',
+                 'nbytes', 'tags', 'expires')
+
+    def __init__(self, columns, numberOfRows, description, converters, columnNames, rowcount, tags=()):
+        self.columns = tuple(tuple(column) for column in columns)
+        self.numberOfRows = numberOfRows
+        self.description = description
+        self.converters = converters
+        self.columnNames = columnNames
+        self.rowcount = rowcount
+        self.tags = frozenset(tags)
+        self.expires = None
+        self.nbytes = sys.getsizeof(self.columns) + sum(sys.getsizeof(column) + sum(map(sys.getsizeof, column))
+                                                        for column in self.columns)
+
+    def rows(self, start, limit=None):
+        "return (ado_results, numberOfRows) for up to limit rows starting at row start, laid out like RS_WIN_32"
+        end = self.numberOfRows if limit is None else min(self.numberOfRows, start + limit)
+        if start == 0 and end == self.numberOfRows:
+            return self.columns, end
+        return tuple(column[start:end] for column in self.columns), end - start
+
+class ResultCache(object):
+    """whole query results, keyed by (qmark SQL, parameter values), limited in total size and in age.
+
+    max_bytes -- the most data to keep (as measured by sys.getsizeof); the least recently used results are
+        discarded to make room. A single result larger than this is not kept.
+    ttl -- the seconds a result may be used, after it was read from the database.
+    Each result is tagged with the names of the tables it reads, so that .invalidate('table') forgets them.
+    .stats() reports hits, misses, the hit ratio, and bytes_saved (the size of the results served from the cache).
+    """
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.nbytes = 0
+        self.hits = self.misses = self.expired = self.evicted = self.invalidated = 0
+        self.bytes_saved = 0
+        self._items = collections.OrderedDict()
+        self._tagged = collections.defaultdict(set)  # tag --> keys of the results having that tag
+
+    def get(self, key):
+        "return the CachedResult for key, or None"
+        entry = self._items.get(key)
+        if entry is not None and entry.expires <= time.monotonic():
+            self._remove(key)
+            self.expired += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        self.bytes_saved += entry.nbytes
+        return entry
+
+    def put(self, key, entry):
+        "keep a CachedResult, discarding the least recently used results to make room for it"
+        self._remove(key)
+        if entry.nbytes > self.max_bytes:
+            return
+        entry.expires = time.monotonic() + self.ttl
+        self._items[key] = entry
+        self.nbytes += entry.nbytes
+        for tag in entry.tags:
+            self._tagged[tag].add(key)
+        while self.nbytes > self.max_bytes:
+            self._remove(next(iter(self._items)))  # the least recently used
+            self.evicted += 1
+
+    def _remove(self, key):
+        entry = self._items.pop(key, None)
+        if entry is None:
+            return
+        self.nbytes -= entry.nbytes
+        for tag in entry.tags:
+            keys = self._tagged[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tagged[tag]
+
+    def invalidate(self, *tags):
+        "forget the results tagged with any of these (lower case) table names -- or every result, if none are given"
+        if tags:
+            keys = set()
+            for tag in tags:
+                keys.update(self._tagged.get(tag.lower(), ()))
+        else:
+            keys = list(self._items)
+        for key in keys:
+            self._remove(key)
+        self.invalidated += len(keys)
+
+    def clear(self):
+        self.invalidate()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def stats(self):
+        "return a dictionary of statistics about this cache"
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'bytes_saved': self.bytes_saved, 'size': len(self._items), 'bytes': self.nbytes,
+                'max_bytes': self.max_bytes, 'expired': self.expired, 'evicted': self.evicted,
+                'invalidated': self.invalidated}
+
 # # # # # classes to emulate the result of cursor.fetchxxx() as a sequence of sequences # # # # #
     # "an ENUM of how my low level records are laid out"
 RS_WIN_32, RS_ARRAY, RS_REMOTE = list(range(1,4))
@@ -466,15 +746,7 @@ class SQLrow(object): # a single database row
         except KeyError:
             raise AttributeError('Unknown column name "{}"'.format(name))
     def _getValue(self,key):  # key must be an integer
-        if self.rows.recordset_format == RS_ARRAY: # retrieve from two-dimensional array
-            v = self.rows.ado_results[key,self.index]
-        elif self.rows.recordset_format == RS_REMOTE:
-            v = self.rows.ado_results[self.index][key]
-        else:# pywin32 - retrieve from tuple of tuples
-            v = self.rows.ado_results[key][self.index]
-        if self.rows.converters is NotImplemented:
-            return v
-        return convert_to_python(v, self.rows.converters[key])
+        return self.rows._value(self.index, key)
 
     def __len__(self):
         return self.rows.numberOfColumns
@@ -530,6 +802,37 @@ class SQLrows(object):
             self.converters = []
             self.columnNames = {}
         self.numberOfRows = numberOfRows
+        # columns whose converter has a faster way to do a whole column at once (see columnConversions)...
+        if self.converters is NotImplemented:
+            self._batchColumns = frozenset()
+        else:
+            self._batchColumns = frozenset(j for j, func in enumerate(self.converters) if func in columnConversions)
+        self._converted = {}  # ...are converted when first used: column number --> list of converted values
+
+    def _value(self, i, j):
+        "the converted value in row i of column j"
+        if j in self._batchColumns:
+            column = self._converted.get(j)
+            if column is None:
+                column = self._converted[j] = convert_column_to_python(self._column(j), self.converters[j])
+            return column[i]
+        if self.recordset_format == RS_ARRAY: # retrieve from two-dimensional array
+            v = self.ado_results[j,i]
+        elif self.recordset_format == RS_REMOTE:
+            v = self.ado_results[i][j]
+        else: # pywin32 - retrieve from tuple of tuples
+            v = self.ado_results[j][i]
+        if self.converters is NotImplemented:
+            return v
+        return convert_to_python(v, self.converters[j])
+
+    def _column(self, j):
+        "the unconverted values of column j"
+        if self.recordset_format == RS_ARRAY:
+            return [self.ado_results[j, i] for i in range(self.numberOfRows)]
+        elif self.recordset_format == RS_REMOTE:
+            return [row[j] for row in self.ado_results]
+        return self.ado_results[j]
 
     def __len__(self):
         return self.numberOfRows
@@ -548,15 +851,7 @@ class SQLrows(object):
                     j = self.columnNames[j.lower()] # convert named column to numeric
                 except KeyError:
                     raise KeyError('adodbapi: no such column name as "%s"'%repr(j))
-            if self.recordset_format == RS_ARRAY: # retrieve from two-dimensional array
-                v = self.ado_results[j,i]
-            elif self.recordset_format == RS_REMOTE:
-                v = self.ado_results[i][j]
-            else: # pywin32 - retrieve from tuple of tuples
-                v = self.ado_results[j][i]
-            if self.converters is NotImplemented:
-                return v
-            return convert_to_python(v, self.converters[j])
+            return self._value(i, j)
         else:
             row = SQLrow(self, item) # new row descriptor
             return row
@@ -569,72 +864,223 @@ class SQLrows(object):
             yield row
             # # # # #
 
+# # # # # compact rows -- an alternative to SQLrows, used when a cursor's row_format is 'compact' or 'tuple' # # # # #
+accepted_row_formats = ('sqlrow', 'compact', 'tuple')
+
+class CompactRow(tuple):
+    """a row of converted values, retrieved by number, by column name, or as an attribute.
+
+    A subclass is made once for each result shape by compactRowClass(). It is a namedtuple,
+    so there is no per-row __dict__, and row.columnname (in lower case) is a slot lookup.
+    """
+    __slots__ = ()
+    columnNames = {}  # names of columns {lowercase name : number,...}
+
+    def __getitem__(self, key):
+        try:
+            return tuple.__getitem__(self, key)  # normal row[1] or row[1:3] designation
+        except TypeError:
+            pass
+        try:
+            return tuple.__getitem__(self, self.columnNames[key])  # extension row[columnName] designation
+        except KeyError:
+            pass
+        try:
+            return tuple.__getitem__(self, self.columnNames[key.lower()])
+        except (KeyError, AttributeError):
+            raise KeyError('No such key as "%s" in %s' % (repr(key), self.__repr__()))
+
+    def __getattr__(self, name):  # only reached for names not in lower case
+        try:
+            return tuple.__getitem__(self, self.columnNames[name.lower()])
+        except KeyError:
+            raise AttributeError('Unknown column name "{}"'.format(name))
+
+    def __repr__(self):  # create a human readable representation
+        taglist = sorted(list(self.columnNames.items()), key=lambda x: x[1])
+        return '<CompactRow={' + ', '.join(name + ':' + repr(tuple.__getitem__(self, i)) for name, i in taglist) + '}>'
+
+    def __str__(self):
+        return str(tuple(str(v) for v in self))
+
+@functools.lru_cache(maxsize=256)
+def compactRowClass(names):
+    """--> a CompactRow subclass for rows with these (lower case) column names, in column order.
+
+    The classes are remembered, so each result shape is only built once."""
+    base = collections.namedtuple('CompactRow', names, rename=True)  # odd or duplicate names become _1 etc.
+    columnNames = {}
+    for i, name in enumerate(names):
+        columnNames.setdefault(name, i)
+    return type('CompactRow', (CompactRow, base), {'__slots__': (), 'columnNames': columnNames})
+
+# # # # # row decoders -- a function compiled for each result shape, used by tuple_rows() # # # # #
+defaultRowDecoderCacheSize = 256
+rowDecoders = LRUCache(defaultRowDecoderCacheSize)  # (ADO types, converters) --> compiled row decoder
+
+# converters which may be replaced, in the generated code, by a direct call of a built-in function...
+_inlineConverters = {cvtInt: 'int', cvtLong: 'int', cvtUnicode: 'str', cvtBuffer: 'bytes'}
+# ...and those which retry a failed conversion with "," changed to "." -- the generated code calls the built-in,
+# and only if that fails does it decode the whole batch again using the converters themselves
+_inlineCultureConverters = {cvtFloat: 'float', cvtDecimal: 'Decimal'}
+
+def compileRowDecoder(converters, cultureAware=False):
+    """generate a function(columns, rowclass=None) --> a list of row tuples (or of rowclass),
+    applying converters[i] to each non-Null value of columns[i], with the Null checks and calls written inline.
+
+    Do not call this directly -- use rowDecoder(), which keeps the functions made."""
+    names = {'NullTypes': NullTypes, 'new': tuple.__new__, 'Decimal': decimal.Decimal,
+             'InvalidOperation': decimal.InvalidOperation, 'zip': zip}
+    prologue = []
+    values = []
+    needs_fallback = False
+    for i, func in enumerate(converters):
+        v = 'v%d' % i
+        if func is NotImplemented or (func is identity and not onIronPython):
+            values.append(v)
+            continue
+        if func in columnConversions:  # there is a faster way to do the whole column at once
+            names['column%d' % i] = columnConversions[func]
+            prologue.append('    c%d = column%d(c%d)' % (i, i, i))
+            values.append(v)
+            continue
+        if func in _inlineConverters:
+            call = _inlineConverters[func]
+        elif func in _inlineCultureConverters and not cultureAware:
+            call = _inlineCultureConverters[func]
+            needs_fallback = True
+        else:
+            call = 'f%d' % i
+            names[call] = func
+        if onIronPython:
+            values.append('None if isinstance(%s, NullTypes) else %s(%s)' % (v, call, v))
+        else:
+            values.append('None if %s is None else %s(%s)' % (v, call, v))
+    if not converters:
+        body = ['def decode(columns, rowclass=None):', '    return []']
+    else:
+        cs = ', '.join('c%d' % i for i in range(len(converters)))
+        vs = ', '.join('v%d' % i for i in range(len(converters)))
+        row = '(%s,)' % ', '.join(values)
+        loop = 'for (%s,) in zip(%s)' % (vs, cs)
+        body = ['def decode(columns, rowclass=None):',
+                '    (%s,) = columns' % cs] + prologue + [
+                '    if rowclass is None:',
+                '        return [%s %s]' % (row, loop),
+                '    return [new(rowclass, %s) %s]' % (row, loop)]
+    namespace = {}
+    exec(compile('\n'.join(body), '<adodbapi row decoder>', 'exec'), names, namespace)
+    decode = namespace['decode']
+    if not needs_fallback:
+        return decode
+    careful = compileRowDecoder(converters, cultureAware=True)
+    def decodeOrRetry(columns, rowclass=None):
+        try:
+            return decode(columns, rowclass)
+        except (ValueError, TypeError, decimal.InvalidOperation):  # a number like "1,5" -- use the real converters
+            return careful(columns, rowclass)
+    return decodeOrRetry
+
+def rowDecoder(adotypes, converters):
+    """return the compiled row decoder for a result with these ADO types and converters (see compileRowDecoder)
+
+    The functions are kept in rowDecoders, keyed by the types and the identity of the converters,
+    so a cursor whose converters have been changed gets a decoder of its own."""
+    converters = tuple(converters)
+    key = (adotypes, converters)
+    try:
+        decode = rowDecoders.get(key)
+    except TypeError:  # an unhashable converter
+        return compileRowDecoder(converters)
+    if decode is None:
+        decode = rowDecoders[key] = compileRowDecoder(converters)
+    return decode
+
+def tuple_rows(ado_results, numberOfRows, cursor, rowclass=None):
+    """Convert the result of an ADO GetRows() --> a list of plain tuples, or of rowclass (a CompactRow subclass).
+
+    The rows are made by the row decoder compiled for the cursor's ADO types and converters."""
+    columns = columns_from_ado_results(ado_results, numberOfRows, cursor.numberOfColumns, cursor.recordset_format)
+    if cursor.converters is NotImplemented:
+        if rowclass is None:
+            return list(zip(*columns))
+        return list(map(functools.partial(tuple.__new__, rowclass), zip(*columns)))
+    decode = rowDecoder(getattr(cursor, 'adotypes', None), cursor.converters)
+    return decode(columns, rowclass)
+
 
     # # # # # functions to re-format SQL requests to other paramstyle requirements # # # # # # # # # #
+# SQL text which must be passed through unchanged: 'literals', "quoted identifiers", [bracketed names],
+# -- line comments, /* block comments */, and :: (PostgreSQL type casts). An unterminated one runs to the end.
+# Splitting on it leaves the SQL code in the even numbered chunks, and the pass-through text in the odd ones.
+_sqlPassThrough = re.compile(r"""('[^']*'?|"[^"]*"?|\[[^\]]*\]?|--[^\n]*|/\*.*?(?:\*/|\Z)|::+)""", re.DOTALL)
+_paramPatterns = {
+    'named': re.compile(r':(\w+)'),
+    'numeric': re.compile(r':(\d+)'),
+    'pyformat': re.compile(r'%\(([^)\0]*)\)s'),
+    }
+_formatToken = re.compile(r'%%|%\(([^)\0]*)\)s|(%\()|%s')
+
+def _changeFormatToken(code, names):
+    "the slow path for 'format' SQL code which contains %% or a badly formed %(name)s"
+    def replace(match):
+        if match.group() == '%%':
+            return '%%'
+        if match.group(2):
+            raise ProgrammingError('Pyformat SQL has incorrect format near "%s"' % code[match.start():match.start()+40])
+        if match.group(1) is not None:
+            names.append(match.group(1))
+        return '?'
+    return _formatToken.sub(replace, code)
+
+defaultQmarkMemoLimit = 4096  # SQL text longer than this (in characters) is converted every time, not remembered
+
+def _changeToQmark(op, style):
+    """convert op to '?'mark parameters, returning (operation, tuple of parameter names).
+
+    The results are remembered, since the same SQL text is usually converted over and over --
+    except for very long text (like a many-row INSERT), which would fill the memory with one-off statements."""
+    if len(op) > defaultQmarkMemoLimit:
+        return _convertToQmark(op, style)
+    return _rememberedToQmark(op, style)
+
+def _convertToQmark(op, style):
+    """the conversion done by _changeToQmark().
+
+    The operation is tokenized in one pass, then all of its SQL code chunks are converted at once,
+    joined by a NUL character which no parameter can span."""
+    chunks = _sqlPassThrough.split(op)
+    code = '\0'.join(chunks[0::2])
+    if code.count('\0') != len(chunks) // 2:
+        raise ProgrammingError('SQL operation contains a NUL character outside of a literal')
+    names = []
+    if style == 'format':
+        if '%%' in code or code.count('%(') != code.count(')s'):
+            code = _changeFormatToken(code, names)
+        else:
+            if '%(' in code:  # ugh! pyformat!
+                pattern = _paramPatterns['pyformat']
+                names = pattern.findall(code)
+                code = pattern.sub('?', code)
+            code = code.replace('%s', '?')
+    else:
+        pattern = _paramPatterns[style]
+        names = pattern.findall(code)
+        code = pattern.sub('?', code)
+    chunks[0::2] = code.split('\0')
+    return ''.join(chunks), tuple(names)
+
+_rememberedToQmark = functools.lru_cache(maxsize=256)(_convertToQmark)
+
 def changeNamedToQmark(op):  #convert from 'named' paramstyle to ADO required '?'mark parameters
-    outOp = ''
-    outparms=[]
-    chunks = op.split("'")   #quote all literals -- odd numbered list results are literals.
-    inQuotes = False
-    for chunk in chunks:
-        if inQuotes: # this is inside a quote
-            if chunk == '': # double apostrophe to quote one apostrophe
-                outOp = outOp[:-1]  # so take one away
-            else:
-                outOp += "'"+chunk+"'" # else pass the quoted string as is.
-        else: # is SQL code -- look for a :namedParameter
-            while chunk: # some SQL string remains
-                sp = chunk.split(':',1)
-                outOp += sp[0]  # concat the part up to the :
-                s = ''
-                try:
-                    chunk = sp[1]
-                except IndexError:
-                    chunk = None
-                if chunk:  # there was a parameter - parse it out
-                    i = 0
-                    c = chunk[0]
-                    while c.isalnum() or c == '_':
-                        i += 1
-                        try:
-                            c = chunk[i]
-                        except IndexError:
-                            break
-                    s = chunk[:i]
-                    chunk = chunk[i:]
-                if s:
-                    outparms.append(s) # list the parameters in order
-                    outOp += '?'  # put in the Qmark
-        inQuotes = not inQuotes
-    return outOp, outparms
-
-def changeFormatToQmark(op):  #convert from 'format' paramstyle to ADO required '?'mark parameters
-    outOp = ''
-    outparams = []
-    chunks = op.split("'")   #quote all literals -- odd numbered list results are literals.
-    inQuotes = False
-    for chunk in chunks:
-        if inQuotes:
-            if outOp != '' and chunk=='': # he used a double apostrophe to quote one apostrophe
-                outOp = outOp[:-1]  # so take one away
-            else:
-                outOp += "'"+chunk+"'" # else pass the quoted string as is.
-        else:  # is SQL code -- look for a %s parameter
-            if '%(' in chunk:  # ugh! pyformat!
-                while chunk:  # some SQL string remains
-                    sp = chunk.split('%(', 1)
-                    outOp += sp[0]  # concat the part up to the %
-                    if len(sp) > 1:
-                        try:
-                            s, chunk = sp[1].split(')s', 1)  # find the ')s'
-                        except ValueError:
-                            raise ProgrammingError('Pyformat SQL has incorrect format near "%s"' % chunk)
-                        outparams.append(s)
-                        outOp += '?'  # put in the Qmark
-                    else:
-                        chunk = None
-            else:  # proper '%s' format
-                sp = chunk.split('%s')  # make each %s
-                outOp += "?".join(sp)   # into ?
-        inQuotes =  not inQuotes # every other chunk is a quoted string
-    return outOp, outparams
+    outOp, outparms = _changeToQmark(op, 'named')
+    return outOp, list(outparms)
+
+def changeFormatToQmark(op):  #convert from 'format' or 'pyformat' paramstyle to ADO required '?'mark parameters
+    outOp, outparms = _changeToQmark(op, 'format')
+    return outOp, list(outparms)
+
+def changeNumericToQmark(op):  #convert from 'numeric' paramstyle to ADO required '?'mark parameters
+    """returns the parameter "names" as the (zero based) index of each parameter in the sequence"""
+    outOp, outparms = _changeToQmark(op, 'numeric')
+    return outOp, [int(n) - 1 for n in outparms]
@@ -0,0 +1,158 @@
+"""adodbapi.arrays - fetch query results as NumPy arrays or an Arrow table (see Cursor.fetch_numpy/fetch_arrow)
+
+The rows are read from ADO in chunks of columns (as GetRows() returns them), and each column chunk is put
+straight into a typed array chosen from the column's ADO type. No row objects are made.
+numpy and pyarrow are imported only when these functions are used.
+"""
+from . import ado_consts as adc
+from . import apibase as api
+
+# ------- module level defaults --------
+defaultChunkRows = 10000  # rows read from ADO with each GetRows()
+
+# the kind of array for each ADO type. Anything else is kept as Python objects.
+_kinds = {}
+for _t in api.adoIntegerTypes + api.adoLongTypes + api.adoRowIdTypes:
+    _kinds[_t] = 'int'
+_kinds[adc.adBoolean] = 'bool'
+for _t in api.adoApproximateNumericTypes:
+    _kinds[_t] = 'float'
+for _t in (adc.adDBTimeStamp, adc.adDate, adc.adDBDate):
+    _kinds[_t] = 'datetime'
+for _t in api.adoExactNumericTypes:
+    _kinds[_t] = 'decimal'
+for _t in api.adoStringTypes:
+    _kinds[_t] = 'string'
+for _t in api.adoBinaryTypes:
+    _kinds[_t] = 'binary'
+
+
+def column_kind(adotype):
+    "the kind of array ('int', 'bool', 'float', 'datetime', 'decimal', 'string', 'binary' or 'object') for an ADO type"
+    return _kinds.get(adotype, 'object')
+
+
+def iter_column_chunks(cursor, size=None, chunk_rows=None):
+    """read up to size rows (all of them, if None) from a cursor --> an iterator of lists of converted columns"""
+    chunk_rows = chunk_rows or defaultChunkRows
+    remaining = size
+    while remaining is None or remaining > 0:
+        limit = chunk_rows if remaining is None else min(chunk_rows, remaining)
+        columns = cursor._fetch_columns(limit)
+        if not columns or not columns[0]:
+            return
+        if remaining is not None:
+            remaining -= len(columns[0])
+        yield columns
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError('Cursor.fetch_numpy() needs numpy: %s' % e)
+    return numpy
+
+
+def _numpy_chunk(numpy, kind, values):
+    "one column chunk --> (array, mask or None)"
+    nulls = [i for i, v in enumerate(values) if v is None]
+    if kind in ('int', 'bool', 'float', 'datetime'):
+        dtype = {'int': numpy.int64, 'bool': numpy.bool_, 'float': numpy.float64, 'datetime': 'datetime64[us]'}[kind]
+        if nulls:
+            filler = {'int': 0, 'bool': False, 'float': 0.0, 'datetime': None}[kind]
+            values = [filler if v is None else v for v in values]
+        try:
+            data = numpy.array(values, dtype=dtype)  # a Null datetime becomes NaT
+        except (TypeError, ValueError, OverflowError):  # not what the ADO type promised (a custom converter?)
+            data = None
+        if data is not None:
+            mask = None
+            if nulls:
+                mask = numpy.zeros(len(values), dtype=numpy.bool_)
+                mask[nulls] = True
+            return data, mask
+    data = numpy.empty(len(values), dtype=object)
+    data[:] = values
+    return data, None
+
+
+def _as_values(numpy, data, mask):
+    "a chunk made by _numpy_chunk() --> a list of Python values, with None for the masked Nulls"
+    values = data.tolist()
+    if mask is not None:
+        for i in numpy.flatnonzero(mask):
+            values[i] = None
+    return values
+
+
+def fetch_numpy(cursor, size=None, chunk_rows=None):
+    """read (up to size) rows from cursor --> a dictionary of {column name: numpy array}, in column order.
+
+    int, bool, float and datetime columns become int64, bool, float64 and datetime64[us] arrays --
+    a numpy.ma.MaskedArray, masking the Nulls, if there are any. Other columns (decimal, string, binary...)
+    become object arrays, holding None for Null."""
+    numpy = _numpy()
+    description = cursor.description or []
+    kinds = [column_kind(d[1]) for d in description]
+    chunks = [[] for _ in kinds]
+    for columns in iter_column_chunks(cursor, size, chunk_rows):
+        for i, values in enumerate(columns):
+            chunks[i].append(_numpy_chunk(numpy, kinds[i], values))
+    result = {}
+    for d, kind, parts in zip(description, kinds, chunks):
+        if len({p[0].dtype for p in parts}) > 1:  # some chunk could not be typed -- so make them all objects
+            parts = [_numpy_chunk(numpy, 'object', _as_values(numpy, *p)) for p in parts]
+        if not parts:
+            parts = [_numpy_chunk(numpy, kind, [])]
+        data = numpy.concatenate([p[0] for p in parts])
+        if any(p[1] is not None for p in parts):
+            mask = numpy.concatenate([numpy.zeros(len(p[0]), dtype=numpy.bool_) if p[1] is None else p[1]
+                                      for p in parts])
+            data = numpy.ma.MaskedArray(data, mask=mask)
+        result[d[0]] = data
+    return result
+
+
+def _arrow_type(pa, kind, description):
+    if kind == 'decimal':
+        precision, scale = description[4], description[5]
+        if precision and 0 < precision <= 38 and 0 <= (scale or 0) <= precision:
+            return pa.decimal128(precision, scale or 0)
+        return None  # let pyarrow choose
+    return {'int': pa.int64(), 'bool': pa.bool_(), 'float': pa.float64(), 'datetime': pa.timestamp('us'),
+            'string': pa.string(), 'binary': pa.binary()}.get(kind)
+
+
+def fetch_arrow(cursor, size=None, chunk_rows=None):
+    """read (up to size) rows from cursor --> a pyarrow.Table, with one record batch for each chunk read.
+
+    Columns are typed from their ADO types (int64, bool, float64, timestamp[us], decimal128, string, binary)
+    and Nulls are Arrow nulls."""
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError('Cursor.fetch_arrow() needs pyarrow: %s' % e)
+    description = cursor.description or []
+    names = [d[0] for d in description]
+    types = [_arrow_type(pa, column_kind(d[1]), d) for d in description]
+    batches = []
+    for columns in iter_column_chunks(cursor, size, chunk_rows):
+        arrays = []
+        for i, values in enumerate(columns):
+            try:
+                arrays.append(pa.array(values, type=types[i]))
+            except (pa.ArrowException, TypeError, ValueError, OverflowError):  # not what the ADO type promised
+                types[i] = None
+                arrays.append(pa.array(values))
+        batches.append(pa.record_batch(arrays, names=names))
+    if not batches:
+        return pa.table([pa.array([], type=t or pa.null()) for t in types], names=names)
+    schema = batches[-1].schema
+    if any(b.schema != schema for b in batches):  # a column's type changed part way -- let pyarrow reconcile them
+        tables = [pa.Table.from_batches([b]) for b in batches]
+        try:
+            return pa.concat_tables(tables, promote_options='default')
+        except TypeError:  # pyarrow older than 14.0
+            return pa.concat_tables(tables, promote=True)
+    return pa.Table.from_batches(batches, schema=schema)
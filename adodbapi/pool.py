@@ -0,0 +1,323 @@
+"""adodbapi.pool - keep open adodbapi Connections ready for re-use
+
+Opening an ADO connection is expensive. A pool keeps the connections it has opened, and lends them out again.
+
+    import adodbapi.pool
+    conn = adodbapi.pool.connect(connection_string, timeout=30)  # borrow a connection (same arguments as adodbapi.connect)
+    crsr = conn.cursor()
+    ...
+    conn.close()  # give the connection back to its pool
+
+There is one pool for each distinct connection string (after keyword arguments and macros are processed)
+and set of connection options (autocommit, paramstyle, timeout, ...).
+"""
+import threading
+import time
+from collections import deque
+
+from . import adodbapi as ado
+from . import ado_consts as adc
+from . import apibase as api
+from . import process_connect_string
+
+# ------- module level defaults for new pools --------
+defaultMinSize = 0  # connections kept open even when idle
+defaultMaxSize = 10  # connections open at once (idle plus borrowed)
+defaultIdleTimeout = 300.0  # seconds an idle connection is kept, when more than min_size are open
+defaultWaitTimeout = 30.0  # seconds to wait for a connection when max_size are all borrowed
+
+_pool_options = ('min_size', 'max_size', 'idle_timeout', 'wait_timeout', 'ping_sql', 'connection_maker')
+# connect() keywords which change how a connection behaves -- pools are kept apart by these, as well as the connection string
+_connection_options = ('autocommit', 'paramstyle', 'row_format', 'timeout', 'mode',
+                       'result_cache_bytes', 'result_cache_ttl', 'collect_stats')
+# Connection attributes a borrower may change, which are put back when it is returned
+_connection_settings = ('paramstyle', 'row_format', 'timeout', 'errorhandler', 'result_cache', '_tracers')
+
+
+class PooledConnection(object):
+    """a Connection borrowed from a pool -- use it like an adodbapi Connection.
+
+    .close() (or the end of a "with" block) gives the connection back to its pool instead of closing it.
+    """
+    def __init__(self, pool, connection):
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_connection', connection)
+
+    def __getattr__(self, name):
+        connection = self.__dict__['_connection']
+        if connection is None:
+            raise api.InterfaceError('this pooled connection has been returned to its pool')
+        return getattr(connection, name)
+
+    def __setattr__(self, name, value):
+        connection = self.__dict__['_connection']
+        if connection is None:
+            raise api.InterfaceError('this pooled connection has been returned to its pool')
+        setattr(connection, name, value)
+
+    def close(self):
+        "give the connection back to its pool"
+        connection = self._connection
+        if connection is not None:
+            object.__setattr__(self, '_connection', None)
+            self._pool.release(connection)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self._connection.__exit__(exc_type, exc_val, exc_tb)  # commit, or roll back on errors
+        finally:
+            self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except:
+            pass
+
+
+class ConnectionPool(object):
+    """a thread-safe pool of Connections, all opened using the same (processed) keyword arguments.
+
+    min_size -- connections kept open even when idle (opened when the pool is made)
+    max_size -- connections open at once; .connect() waits for one to be returned when all are borrowed
+    idle_timeout -- seconds an idle connection is kept open, when more than min_size are open
+    wait_timeout -- seconds .connect() will wait for a connection before raising OperationalError
+    ping_sql -- if given, an SQL statement (like "SELECT 1") run to check each connection before it is lent
+    connection_maker -- a function returning an (unopened) ADODB.Connection object
+    """
+    def __init__(self, kwargs, min_size=None, max_size=None, idle_timeout=None, wait_timeout=None,
+                 ping_sql=None, connection_maker=ado.make_COM_connecter):
+        self.kwargs = kwargs
+        try:
+            self.connection_string = kwargs['connection_string'] % kwargs
+        except (KeyError, TypeError, ValueError) as e:
+            raise api.ProgrammingError('Python string format error in connection string->%s' % e)
+        self.min_size = defaultMinSize if min_size is None else min_size
+        self.max_size = defaultMaxSize if max_size is None else max_size
+        self.idle_timeout = defaultIdleTimeout if idle_timeout is None else idle_timeout
+        self.wait_timeout = defaultWaitTimeout if wait_timeout is None else wait_timeout
+        self.ping_sql = ping_sql
+        self.connection_maker = connection_maker
+        self.dbms_properties = None  # (supportsTransactions, dbms_name, dbms_version) read from the first connection
+        self.closed = False
+        self._lock = threading.Condition()
+        self._idle = deque()  # of (connection, time it was returned) -- the most recently returned is at the right
+        self._size = 0  # connections open, idle or borrowed, or being opened
+        self._defaults = {}  # id(connection) --> (autocommit, {setting: value}) as originally connected
+        self.created = self.reused = self.discarded = self.waits = 0
+        self.fill()
+
+    def __repr__(self):
+        return '<%s for "%s" %d open, %d idle>' % (self.__class__.__name__, self.connection_string,
+                                                   self._size, len(self._idle))
+
+    def _open(self):
+        "open a new Connection, without asking the provider for properties we already know"
+        co = ado.Connection()
+        try:
+            co.connect(dict(self.kwargs), self.connection_maker, self.dbms_properties)
+        except Exception as e:
+            raise api.OperationalError(e, 'Error opening connection to "%s"' % co.connection_string)
+        if self.dbms_properties is None:
+            self.dbms_properties = (co.supportsTransactions, co.dbms_name, co.dbms_version)
+        self._defaults[id(co)] = (co._autocommit, dict((name, getattr(co, name)) for name in _connection_settings))
+        self.created += 1
+        return co
+
+    def fill(self):
+        "open connections until at least min_size are open"
+        while True:
+            with self._lock:
+                if self.closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                co = self._open()
+            except:
+                self._forget(None)
+                raise
+            with self._lock:
+                self._idle.append((co, time.monotonic()))
+                self._lock.notify()
+
+    def connect(self):
+        "borrow a connection --> a PooledConnection"
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            co = None
+            self.prune()
+            with self._lock:
+                while not self._idle and self._size >= self.max_size:
+                    if self.closed:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise api.OperationalError('all %d connections to "%s" are in use' %
+                                                   (self.max_size, self.connection_string))
+                    self.waits += 1
+                    self._lock.wait(remaining)
+                if self.closed:
+                    raise api.InterfaceError('this connection pool has been closed')
+                if self._idle:
+                    co = self._idle.pop()[0]  # the most recently used is the most likely to be alive
+                else:
+                    self._size += 1  # reserve a place for the connection we are about to open
+            if co is None:
+                try:
+                    co = self._open()
+                except:
+                    self._forget(None)
+                    raise
+                return PooledConnection(self, co)
+            if self._validate(co):
+                with self._lock:
+                    self.reused += 1
+                return PooledConnection(self, co)
+            self._discard(co)  # it was dead -- try again
+
+    def _validate(self, co):
+        "is the connection still usable? (the cheap check, then the ping_sql, if any)"
+        try:
+            if co.connector is None or co.connector.State == adc.adStateClosed:
+                return False
+            if self.ping_sql:
+                result_cache = co.result_cache
+                co.result_cache = None  # the ping must reach the database, not be answered from memory
+                crsr = co.cursor()
+                try:
+                    crsr.execute(self.ping_sql)
+                finally:
+                    crsr.close()
+                    co.result_cache = result_cache
+        except Exception:
+            return False
+        return True
+
+    def release(self, co):
+        "take back a borrowed connection, returning it to the state in which it was first connected"
+        try:
+            self._reset(co)
+        except Exception:
+            self._discard(co)
+            return
+        with self._lock:
+            if not self.closed:
+                self._idle.append((co, time.monotonic()))
+                self._lock.notify()
+                co = None
+        if co is not None:  # the pool was closed while it was borrowed
+            self._discard(co)
+
+    def _reset(self, co):
+        "roll back, and restore autocommit, paramstyle, row_format, timeout, etc. to their original settings"
+        for crsr in list(co.cursors.values()):
+            crsr.close(dont_tell_me=True)
+        co.cursors.clear()
+        autocommit, settings = self._defaults[id(co)]
+        if co.supportsTransactions:
+            if co._autocommit != autocommit:
+                co.autocommit = autocommit  # this rolls back any open transaction
+                if not autocommit and not co.transaction_level:
+                    co.transaction_level = co.connector.BeginTrans()
+            else:
+                co._rollback()
+        for name, value in settings.items():
+            setattr(co, name, value)
+        co.messages = []
+
+    def _discard(self, co):
+        "close a connection which will not be used again"
+        self._forget(co)
+        try:
+            co.close()
+        except Exception:
+            pass
+
+    def _forget(self, co):
+        with self._lock:
+            self._size -= 1
+            self._defaults.pop(id(co), None)
+            if co is not None:
+                self.discarded += 1
+            self._lock.notify()
+
+    def _expired_idle(self):
+        "(call holding the lock) take connections which have been idle too long out of the pool --> list of them"
+        expired = []
+        limit = time.monotonic() - self.idle_timeout
+        while self._idle and self._idle[0][1] <= limit and self._size - len(expired) > self.min_size:
+            expired.append(self._idle.popleft()[0])  # the oldest are at the left
+        return expired
+
+    def prune(self):
+        "close connections which have been idle longer than idle_timeout"
+        with self._lock:
+            expired = self._expired_idle()
+        for co in expired:
+            self._discard(co)
+
+    def close(self):
+        "close the idle connections now, and borrowed connections when they are returned"
+        with self._lock:
+            self.closed = True
+            idle = [co for co, when in self._idle]
+            self._idle.clear()
+            self._lock.notify_all()
+        for co in idle:
+            self._discard(co)
+
+    def stats(self):
+        "--> a dictionary describing the pool's use"
+        with self._lock:
+            return {'open': self._size, 'idle': len(self._idle), 'borrowed': self._size - len(self._idle),
+                    'created': self.created, 'reused': self.reused, 'discarded': self.discarded,
+                    'waits': self.waits}
+
+
+# # # # # ----- one pool for each connection string ----- # # # # #
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(*args, **kwargs):
+    """--> the ConnectionPool for these connect() arguments, making it if needed.
+
+    Takes the same arguments as adodbapi.connect(), plus the ConnectionPool keyword arguments
+    (min_size, max_size, idle_timeout, wait_timeout, ping_sql, connection_maker),
+    which are used only when the pool is first made.
+    Connections made with different autocommit, paramstyle, row_format, timeout, mode
+    or result cache keywords are kept in different pools.
+    """
+    options = dict((name, kwargs.pop(name)) for name in _pool_options if name in kwargs)
+    kwargs = process_connect_string.process(args, kwargs, True)
+    try:
+        key = (kwargs['connection_string'] % kwargs,) + tuple(kwargs.get(name) for name in _connection_options)
+    except (KeyError, TypeError, ValueError) as e:
+        raise api.ProgrammingError('Python string format error in connection string->%s' % e)
+    with _pools_lock:
+        pool = _pools.get(key)
+    if pool is not None and not pool.closed:
+        return pool
+    new_pool = ConnectionPool(kwargs, **options)  # opening its min_size connections may be slow -- not holding the lock
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.closed:  # (unless another thread has made one meanwhile)
+            pool = _pools[key] = new_pool
+            new_pool = None
+    if new_pool is not None:
+        new_pool.close()
+    return pool
+
+def connect(*args, **kwargs): # --> a PooledConnection
+    """borrow a connection from the pool for this connection string. See adodbapi.connect() and get_pool()"""
+    return get_pool(*args, **kwargs).connect()
+
+def close_all():
+    "close every pool"
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,98 @@
+"""adodbapi.readahead - fetch the next batch of rows in the background, while the caller works on this one
+
+Used by adodbapi.remote, where each fetch is a network round trip. The size of each batch adapts to the
+measured round trip time and row size: large enough that the fixed cost of a round trip is a small part
+of each fetch, but not so large that a batch holds more than defaultBatchBytes.
+"""
+import queue
+import sys
+import threading
+import time
+
+# ------- module level defaults --------
+defaultBatchBytes = 1024 * 1024  # most data to hold in one batch
+minBatchRows = 16
+maxBatchRows = 10000
+defaultOverheadRatio = 10  # aim for each fetch to take this many times the bare round trip time
+defaultDepth = 1  # batches fetched ahead of the one being used
+
+
+class ReadAhead(object):
+    """fetch batches of rows on a background thread, no more than 'depth' batches ahead of the caller.
+
+    fetch -- a function(size) --> a list of up to size rows (empty when there are no more), run on the thread
+    finish -- (optional) a function run on the thread when it is done, to release anything fetch() used
+    size -- the size of the first batch
+    """
+    def __init__(self, fetch, finish=None, size=minBatchRows, depth=None):
+        self.fetch = fetch
+        self.finish = finish
+        self.size = size
+        self.round_trip = None  # the shortest fetch time seen, in seconds
+        self.fetches = 0
+        self._batches = queue.Queue(maxsize=defaultDepth if depth is None else depth)
+        self._stopping = threading.Event()
+        self._exhausted = False
+        self._thread = threading.Thread(target=self._run, name='adodbapi read-ahead', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            while not self._stopping.is_set():
+                start = time.perf_counter()
+                try:
+                    batch = self.fetch(self.size)
+                except Exception as e:
+                    self._put(e)
+                    return
+                self.fetches += 1
+                self._put(batch)
+                if not batch:
+                    return
+                self._tune(len(batch), time.perf_counter() - start, batch[len(batch) // 2])
+        finally:
+            if self.finish is not None:
+                try:
+                    self.finish()
+                except Exception:
+                    pass
+
+    def _put(self, item):
+        "hand an item to the caller, waiting while the caller is 'depth' batches behind"
+        while not self._stopping.is_set():
+            try:
+                self._batches.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _tune(self, rows, seconds, sample):
+        "choose the size of the next batch from how long this one took"
+        if self.round_trip is None or seconds < self.round_trip:
+            self.round_trip = seconds
+        wanted = self.round_trip * defaultOverheadRatio
+        if seconds > 0:
+            size = int(rows * wanted / seconds)
+        else:
+            size = rows * 4
+        size = max(self.size // 2, min(self.size * 4, size))  # change gradually
+        width = sum(sys.getsizeof(value) for value in sample) or 1
+        self.size = max(minBatchRows, min(maxBatchRows, defaultBatchBytes // width, size))
+
+    def next_batch(self):
+        "--> the next batch of rows, or an empty list when there are no more"
+        if self._exhausted:
+            return []
+        item = self._batches.get()
+        if isinstance(item, Exception):
+            self._exhausted = True
+            raise item
+        if not item:
+            self._exhausted = True
+        return item
+
+    def close(self):
+        "stop fetching, and wait for a fetch in progress to finish (so that the connection may be used again)"
+        self._stopping.set()
+        self._thread.join()
+        self._exhausted = True
@@ -33,6 +33,7 @@ version = 'adodbapi.remote v' + __version__
 import os
 import sys
 import array
+import functools
 import time
 import datetime
 
@@ -46,6 +47,8 @@ except ImportError:
 import adodbapi
 import adodbapi.apibase as api
 import adodbapi.process_connect_string
+import adodbapi.readahead
+import adodbapi.wireformat
 from adodbapi.apibase import ProgrammingError
 
 _BaseException = api._BaseException
@@ -62,6 +65,14 @@ except:
 if verbose:
     print(version)
 
+# how query results are sent from the server: 'columnar' (see adodbapi.wireformat) if the server can, or 'pickle'.
+# May be overridden by the "wire_format" connection keyword.
+defaultWireFormat = 'columnar'
+
+# if True, cursors fetch their next batch of rows in the background while the program uses this one
+# (see adodbapi.readahead). May be overridden by the "read_ahead" connection keyword, or Cursor.read_ahead.
+defaultReadAhead = False
+
 # --- define objects to smooth out Python3 <-> Python 2.x differences
 unicodeType = str  #this line will be altered by 2to3.py to '= str'
 longType = int        #this line will be altered by 2to3.py to '= int'
@@ -188,6 +199,8 @@ class Connection(object):
         self.paramstyle = api.paramstyle
         self.timeout = 30
         self.cursors = {}
+        self.wire_format = 'pickle'  # the format actually in use
+        self.read_ahead = defaultReadAhead
 
     def connect(self, kwargs, connection_maker):
         self.kwargs = kwargs
@@ -204,9 +217,24 @@ class Connection(object):
         self.supportsTransactions = self.getIndexedValue('supportsTransactions')
         self.paramstyle = self.getIndexedValue('paramstyle')
         self.timeout = self.getIndexedValue('timeout')
+        self.wire_format = self._negotiate_wire_format(kwargs.get('wire_format', defaultWireFormat))
+        self.read_ahead = bool(kwargs.get('read_ahead', defaultReadAhead))
         if verbose:
             print('adodbapi.remote New connection at %X' % id(self))
 
+    def _negotiate_wire_format(self, wanted):
+        "--> the best wire format both ends can use. Older servers only send pickled rows."
+        if wanted != 'columnar':
+            return 'pickle'
+        try:
+            offered = self.proxy.get_wire_formats()
+        except Exception:  # an older server, which does not know the method
+            return 'pickle'
+        for fmt in adodbapi.wireformat.FORMATS:
+            if fmt in offered:
+                return fmt
+        return 'pickle'
+
     def _raiseConnectionError(self, errorclass, errorvalue):
         eh = self.errorhandler
         if eh is None:
@@ -311,6 +339,10 @@ class Connection(object):
     def get_table_names(self):
         return self.proxy.get_table_names()
 
+    def get_server_stats(self):
+        "--> a dictionary describing this connection's use of the server (calls, errors, wait and busy seconds)"
+        return self.proxy.get_stats()
+
 def fixpickle(x):
     """pickle barfs on buffer(x) so we pass as array.array(x) then restore to original form for .execute()"""
     if x is None:
@@ -337,8 +369,18 @@ def fixpickle(x):
             newargs.append(arg)
     return newargs
 
+def _fetch_rows(proxy, cid, wire_format, size):
+    "fetch up to size rows from the remote cursor --> a list of row tuples"
+    if wire_format == 'pickle':
+        return proxy.crsr_fetchmany(cid, size) or []
+    return adodbapi.wireformat.decode_rows(proxy.crsr_fetchmany_columnar(cid, size))
+
 class Cursor(object):
     def __init__(self, connection):
+        self._reader = None  # the ReadAhead fetching rows in the background, when .read_ahead is True
+        self._batch = []  # rows read ahead, and not yet used...
+        self._position = 0  # ... starting here
+        self.read_ahead = connection.read_ahead
         self.command = None
         self.errorhandler = None ## was: connection.errorhandler
         self.connection = connection
@@ -351,7 +393,37 @@ class Cursor(object):
         if verbose:
             print('%s New cursor at %X on conn %X' % (version, id(self), id(self.connection)))
 
+    def _stop_reading_ahead(self):
+        "forget any rows read ahead. The remote cursor is ready for the next command when this returns."
+        reader = self._reader
+        if reader is not None:
+            self._reader = None
+            reader.close()
+        self._batch = []
+        self._position = 0
+
+    def _read_ahead(self, size):
+        "--> a list of up to size rows (all of them, if size is None) from the read-ahead buffer"
+        if self._reader is None:
+            # fetch using a second Pyro connection, so that this cursor's own proxy is free to be used meanwhile
+            proxy = Pyro4.Proxy(self.proxy._pyroUri)
+            proxy._pyroTimeout = self.proxy._pyroTimeout
+            fetch = functools.partial(_fetch_rows, proxy, self.id, self.connection.wire_format)
+            self._reader = adodbapi.readahead.ReadAhead(fetch, proxy._pyroRelease)
+        rows = []
+        while size is None or len(rows) < size:
+            if self._position >= len(self._batch):
+                self._batch = self._reader.next_batch()
+                self._position = 0
+                if not self._batch:
+                    break
+            end = len(self._batch) if size is None else self._position + size - len(rows)
+            rows.extend(self._batch[self._position:end])
+            self._position += len(self._batch[self._position:end])
+        return rows
+
     def prepare(self, operation):
+        self._stop_reading_ahead()
         self.command = operation
         try: del self.description
         except AttributeError: pass
@@ -421,6 +493,7 @@ class Cursor(object):
     def execute(self, operation, parameters=None):
         if self.connection is None:
             self._raiseCursorError(ProgrammingError, 'Attempted operation on closed cursor')
+        self._stop_reading_ahead()
         self.command = operation
         try: del self.description
         except AttributeError: pass
@@ -436,6 +509,7 @@ class Cursor(object):
     def executemany(self, operation, seq_of_parameters):
         if self.connection is None:
             self._raiseCursorError(ProgrammingError, 'Attempted operation on closed cursor')
+        self._stop_reading_ahead()
         self.command = operation
         try: del self.description
         except AttributeError: pass
@@ -447,6 +521,7 @@ class Cursor(object):
         self.proxy.crsr_executemany(self.id, operation, sq)
 
     def nextset(self):
+        self._stop_reading_ahead()
         try: del self.description
         except AttributeError: pass
         try: del self.columnNames
@@ -458,6 +533,7 @@ class Cursor(object):
     def callproc(self, procname, parameters=None):
         if self.connection is None:
             self._raiseCursorError(ProgrammingError, 'Attempted operation on closed cursor')
+        self._stop_reading_ahead()
         self.command = procname
         try: del self.description
         except AttributeError: pass
@@ -470,7 +546,11 @@ class Cursor(object):
 
     def fetchone(self):
         try:
-            f1 = self.proxy.crsr_fetchone(self.id)
+            if self.read_ahead or self._reader is not None:  # once started, read ahead until the next command
+                rows = self._read_ahead(1)
+                f1 = rows[0] if rows else None
+            else:
+                f1 = self.proxy.crsr_fetchone(self.id)
         except _BaseException as e:
             self._raiseCursorError(api.DatabaseError, e)
         else:
@@ -481,7 +561,12 @@ class Cursor(object):
 
     def fetchmany(self, size=None):
         try:
-            self.rs = self.proxy.crsr_fetchmany(self.id, size)
+            if self.read_ahead or self._reader is not None:
+                self.rs = self._read_ahead(self.arraysize if size is None else size)
+            elif self.connection.wire_format == 'pickle':
+                self.rs = self.proxy.crsr_fetchmany(self.id, size)
+            else:
+                self.rs = adodbapi.wireformat.decode_rows(self.proxy.crsr_fetchmany_columnar(self.id, size))
             if not self.rs:
                 return []
             r = api.SQLrows(self.rs, len(self.rs), self)
@@ -491,7 +576,12 @@ class Cursor(object):
 
     def fetchall(self):
         try:
-            self.rs = self.proxy.crsr_fetchall(self.id)
+            if self.read_ahead or self._reader is not None:
+                self.rs = self._read_ahead(None)
+            elif self.connection.wire_format == 'pickle':
+                self.rs = self.proxy.crsr_fetchall(self.id)
+            else:
+                self.rs = adodbapi.wireformat.decode_rows(self.proxy.crsr_fetchall_columnar(self.id))
             if not self.rs:
                 return []
             return api.SQLrows(self.rs, len(self.rs), self)
@@ -502,6 +592,7 @@ class Cursor(object):
         if self.connection is None:
             return
         self.connection._i_am_closing(self)  # take me off the connection's cursors list
+        self._stop_reading_ahead()
         try:
             self.proxy.crsr_close(self.id)
         except: pass
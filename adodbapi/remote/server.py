@@ -47,6 +47,9 @@ except ImportError:
 import adodbapi.apibase as api
 import adodbapi
 import adodbapi.process_connect_string
+import adodbapi.serving
+import adodbapi.wireformat
+from adodbapi.serving import pinned
 
 makeByteBuffer = bytes
 _BaseException = Exception
@@ -59,6 +62,9 @@ try:
     pyro_port = os.environ['PYRO_PORT']
 except:
     pyro_port = PYRO_PORT
+workers = adodbapi.serving.defaultWorkers  # 0: one thread serves everyone, in turn (Pyro "multiplex")
+max_connections = adodbapi.serving.defaultMaxConnections
+max_queue = adodbapi.serving.defaultMaxQueue
 
 for arg in sys.argv[1:]:
     if arg.lower().startswith('host'):
@@ -73,6 +79,24 @@ for arg in sys.argv[1:]:
         except _BaseException:
             raise TypeError('Must supply numeric value for argument="%s"' % arg)
 
+    if arg.lower().startswith('workers'):  # threaded mode: each connection is pinned to one of n COM threads
+        try:
+            workers = int(arg.split('=')[1])
+        except _BaseException:
+            raise TypeError('Must supply numeric value for argument="%s"' % arg)
+
+    if arg.lower().startswith('max_connections'):
+        try:
+            max_connections = int(arg.split('=')[1])
+        except _BaseException:
+            raise TypeError('Must supply numeric value for argument="%s"' % arg)
+
+    if arg.lower().startswith('max_queue'):
+        try:
+            max_queue = int(arg.split('=')[1])
+        except _BaseException:
+            raise TypeError('Must supply numeric value for argument="%s"' % arg)
+
     if arg.lower().startswith('timeout'):
         try:
             PYRO_COMMTIMEOUT = int(arg.split('=')[1])
@@ -93,17 +117,25 @@ print(version)
 Pyro4.config.DETAILED_TRACEBACK = True
 Pyro4.config.COMMTIMEOUT = PYRO_COMMTIMEOUT
 Pyro4.config.AUTOPROXY = False
-Pyro4.config.SERVERTYPE = 'multiplex'
+if workers:
+    Pyro4.config.SERVERTYPE = 'thread'  # Pyro threads receive calls, and hand them to the connection's worker
+    Pyro4.config.THREADPOOL_SIZE = max(Pyro4.config.THREADPOOL_SIZE, 3 * max_connections)
+else:
+    Pyro4.config.SERVERTYPE = 'multiplex'
 Pyro4.config.PREFER_IP_VERSION = 0  # allow system to prefer IPv6
 Pyro4.config.SERIALIZERS_ACCEPTED = set(['serpent', 'pickle'])  # change when Py2.5 retired
 
-connection_list = []
 CONNECTION_TIMEOUT = datetime.timedelta(minutes=30)
 CONNECTION_REMEMBER = datetime.timedelta(hours=3)
 if '--debug' in sys.argv:
     CONNECTION_TIMEOUT = datetime.timedelta(minutes=10)
     CONNECTION_REMEMBER = datetime.timedelta(minutes=20)
-HEARTBEAT_INTERVAL = CONNECTION_TIMEOUT / 10
+HEARTBEAT_INTERVAL = datetime.timedelta(seconds=1)  # looking for expired connections is cheap
+
+# the open connections, with their worker threads, admission limits and statistics
+connection_list = adodbapi.serving.ConnectionRegistry(workers, max_connections, max_queue,
+                                                      CONNECTION_TIMEOUT.total_seconds(),
+                                                      CONNECTION_REMEMBER.total_seconds())
 
 KEEP_RUNNING = True  # global value which will kill server when set to False
 
@@ -131,16 +163,20 @@ def unfixpickle(x):
 
 
 class ServerConnection(object):
-    def __init__(self):
+    """one client's connection. Its methods marked @pinned run on its worker thread (see adodbapi.serving)"""
+    def __init__(self, registry):
+        self.registry = registry
         self.server_connection = None
         self.cursors = {}
-        self.last_used = datetime.datetime.now()
         self.timed_out = False
+        self.worker = None
+        self.stats = None
 
     def _check_timeout(self):
         if self.timed_out:
             raise api.OperationalError('Remote Connection Timed Out')
 
+    @pinned
     def build_cursor(self):
         "Return a new Cursor Object using the connection."
         self._check_timeout()
@@ -148,17 +184,26 @@ class ServerConnection(object):
         self.cursors[lc.id] = lc
         return lc.id
 
-    def close(self, remember=False):
-        global connection_list
+    @pinned
+    def close(self):
         for c in list(self.cursors.values())[:]:
             c.close()
         self.server_connection.close()
         self._pyroDaemon.unregister(self)
-        if not remember:
-            connection_list.remove(self)
+        self.registry.remove(self)
 
     def connect(self, kwargs):
-        global connection_list
+        try:
+            self.registry.admit(self, self._pyroId)
+        except api.Error as e:
+            return e  # the server is full
+        result = self._connect(kwargs)
+        if result is not True:
+            self.registry.remove(self)
+        return result
+
+    @pinned
+    def _connect(self, kwargs):
         kw = adodbapi.process_connect_string.process([], kwargs, True)
 
         if verbose:
@@ -169,26 +214,29 @@ class ServerConnection(object):
             if verbose:
                 print("result = %s", repr(conn))
             self.server_connection = conn
-            connection_list.append(self)
             return True
         except api.Error as e:
             return e
 
+    @pinned
     def commit(self):
         try:
             self.server_connection.commit()
         except api.Error as e:
             return str(e)
 
+    @pinned
     def rollback(self):
         try:
             self.server_connection.rollback()
         except api.Error as e:
             return str(e)
 
+    @pinned
     def get_table_names(self):
         return self.server_connection.get_table_names()
 
+    @pinned
     def get_attribute_for_remote(self, item):
         self._check_timeout()
         if item == 'autocommit':
@@ -198,12 +246,14 @@ class ServerConnection(object):
             return getattr(self.server_connection, item)
         raise AttributeError('No provision for remote access to attribute="%s"' % item)
 
+    @pinned
     def send_attribute_to_host(self, name, value): # to change autocommit or paramstyle on host
         self._check_timeout()
         self.server_connection.__setattr__(name, value)
 
 # # # # # #  following are cursor methods called by the remote (using the connection) with a cursor id "cid" # # #
 
+    @pinned
     def crsr_execute(self, cid, operation, parameters=None):
         self._check_timeout()
         fp = unfixpickle(parameters)
@@ -214,20 +264,24 @@ class ServerConnection(object):
             except: errorclass = api.Error
             return errorclass, str(e) # the error class should have been stored by the standard error handler
 
+    @pinned
     def crsr_prepare(self, cid, operation):
         self._check_timeout()
         self.cursors[cid].prepare(operation)
 
+    @pinned
     def crsr_executemany(self, cid, operation, seq_of_parameters):
         self._check_timeout()
         sq = [unfixpickle(x) for x in seq_of_parameters]
         self.cursors[cid].executemany(operation, sq)
 
+    @pinned
     def crsr_callproc(self, cid, procname, parameters=None):
         self._check_timeout()
         fp = unfixpickle(parameters)
         return self.cursors[cid].callproc(procname, fp)
 
+    @pinned
     def crsr_fetchone(self, cid):
         self._check_timeout()
         r = self.cursors[cid].fetchone()
@@ -235,6 +289,7 @@ class ServerConnection(object):
             return None
         return r[:]
 
+    @pinned
     def crsr_fetchmany(self, cid, size=None):
         self._check_timeout()
         rows = []
@@ -243,6 +298,7 @@ class ServerConnection(object):
             rows.append(r)
         return rows
 
+    @pinned
     def crsr_fetchall(self, cid):
         self._check_timeout()
         rows = []
@@ -250,34 +306,63 @@ class ServerConnection(object):
             rows.append(row[:])   #[item for item in row])
         return rows
 
+    def get_stats(self):
+        "--> a dictionary describing this connection's use of the server"
+        return self.stats.as_dict() if self.stats else {}
+
+    def get_wire_formats(self):
+        "the result formats, other than pickled rows, which this server can send"
+        return adodbapi.wireformat.FORMATS
+
+    @pinned
+    def crsr_fetchmany_columnar(self, cid, size=None, chunk_rows=None):
+        self._check_timeout()
+        columns = self.cursors[cid].fetchmany_columns(size)
+        return adodbapi.wireformat.encode_columns(columns, chunk_rows)
+
+    @pinned
+    def crsr_fetchall_columnar(self, cid, chunk_rows=None):
+        self._check_timeout()
+        columns = self.cursors[cid].fetchall_columns()
+        return adodbapi.wireformat.encode_columns(columns, chunk_rows)
+
+    @pinned
     def crsr_get_rowcount(self, cid):
         return self.cursors[cid].rowcount
 
+    @pinned
     def crsr_get_description(self, cid):
         return self.cursors[cid].description
 
+    @pinned
     def crsr_get_columnNames(self, cid):
         return self.cursors[cid].columnNames
 
+    @pinned
     def crsr_nextset(self, cid):
         r = self.cursors[cid].nextset()
         return r
 
+    @pinned
     def crsr_close(self, cid):
         try:
             self.cursors[cid].close()
         except: pass
         del self.cursors[cid]
 
+    @pinned
     def crsr_set_arraysize(self, cid, value):
         self.cursors[cid].arraysize = value
 
+    @pinned
     def crsr_set_conversion(self, cid, index, value):
         self.cursors[cid].conversion[index] = value
 
+    @pinned
     def crsr_set_paramstyle(self, cid, value):
         self.cursors[cid].paramstyle = value
 
+    @pinned
     def crsr_get_attribute_for_remote(self, cid, item):
         if verbose > 3:
             print('remote %s asking for=%s' % (cid, item))
@@ -296,10 +381,14 @@ class ServerConnection(object):
 
 class ConnectionDispatcher(object):
     def make_connection(self):
-        new_connection = ServerConnection()
+        new_connection = ServerConnection(connection_list)
         pyro_uri = self._pyroDaemon.register(new_connection)
         return pyro_uri
 
+    def get_stats(self):
+        "--> a dictionary describing the server's use (see adodbapi.serving.ConnectionRegistry.stats)"
+        return connection_list.stats()
+
 
 class Heartbeat_Timer(object):
     def __init__(self, interval, work_function, tick_result_function):
@@ -316,19 +405,7 @@ class Heartbeat_Timer(object):
         return self.tick_result_function()
 
 def heartbeat_timer_work():
-        global connection_list
-        now = datetime.datetime.now()
-        for conn in connection_list[:]:  # step through a copy of the list
-            if now - conn.last_used > CONNECTION_TIMEOUT:
-                try:
-                    if not conn.timed_out:
-                        conn.timed_out = True
-                        conn.close(remember=True)
-                    else:
-                        if now - conn.last_used > CONNECTION_REMEMBER:
-                            connection_list.remove(conn)
-                except:
-                    pass
+    connection_list.expire()  # close connections unused for longer than CONNECTION_TIMEOUT
 
 def still_running():
     return KEEP_RUNNING
@@ -365,6 +442,8 @@ def serve():
     daemon = Pyro4.Daemon(host=pyro_host, port=int(pyro_port))
     uri = daemon.register(ConnectionDispatcher(), service_name)
     print("%s server running on uri=%s" % (service_name, uri))
+    if workers:
+        print("(threaded: %d worker threads, up to %d connections)" % (workers, max_connections))
     print("(call using HOST=nnn and PORT=nnn to change interface addresses)")
     print("(use ^C or <Ctrl-Break> to interrupt...)")
 
@@ -376,8 +455,4 @@ def serve():
 
 if __name__ == '__main__':
     serve()
-    for conn in connection_list:  # clean up when done
-        try:
-            conn.server_connection.close()
-        except:
-            pass
+    connection_list.close_all()  # clean up when done
@@ -0,0 +1,194 @@
+"""adodbapi.serving - connection management for the adodbapi.remote server (adodbapi/remote/server.py)
+
+A ConnectionRegistry keeps track of the server's connections:
+    admission control -- no more than max_connections at once, and (in threaded mode) no more than
+        max_queue calls waiting for each worker thread,
+    pinning -- in threaded mode, each connection lives on one Worker thread (in its own COM apartment,
+        see adodbapi.workers) and all of its calls are run there. A slow query holds up only the connections
+        pinned to its worker, not every client of the server,
+    expiry -- a connection unused for longer than timeout is closed. Connections are kept in order of last use,
+        so finding the expired ones takes time in proportion to how many have expired, not how many are open,
+    statistics -- calls, errors, and time spent waiting and working, for each connection.
+It does not need Pyro4.
+"""
+import collections
+import functools
+import threading
+import time
+
+from . import apibase as api
+from . import workers as wk
+
+# ------- module level defaults --------
+defaultWorkers = 0  # worker threads. 0 means run calls on the thread which received them (Pyro "multiplex" mode)
+defaultMaxConnections = 100  # connections open at once
+defaultMaxQueue = 10  # calls waiting for one worker, before more are refused
+defaultTimeout = 30 * 60.0  # seconds a connection may be unused before it is closed
+defaultRemember = 3 * 60 * 60.0  # seconds a timed-out connection is remembered (for the statistics)
+
+
+class ConnectionStats(object):
+    """how one connection has used the server"""
+    __slots__ = ('name', 'opened', 'last_used', 'calls', 'errors', 'rejected', 'wait_seconds', 'busy_seconds')
+
+    def __init__(self, name):
+        self.name = name
+        self.opened = self.last_used = time.monotonic()
+        self.calls = self.errors = self.rejected = 0
+        self.wait_seconds = self.busy_seconds = 0.0
+
+    def as_dict(self):
+        d = dict((name, getattr(self, name)) for name in self.__slots__)
+        d['idle_seconds'] = time.monotonic() - self.last_used
+        del d['opened'], d['last_used']
+        return d
+
+
+def pinned(method):
+    "decorate a server connection method, so that it is run on the connection's worker, and counted"
+    @functools.wraps(method)
+    def call(self, *args, **kwargs):
+        return self.registry.call(self, method, self, *args, **kwargs)
+    return call
+
+
+class ConnectionRegistry(object):
+    """the open connections of a server. See the module docstring.
+
+    The connections must have .timed_out, .worker and .stats attributes (which this class sets)
+    and a .close() method, called (on its worker) when the connection times out.
+    """
+    def __init__(self, workers=None, max_connections=None, max_queue=None, timeout=None, remember=None):
+        workers = defaultWorkers if workers is None else workers
+        self.pool = wk.WorkerPool(workers) if workers else None
+        self.max_connections = defaultMaxConnections if max_connections is None else max_connections
+        self.max_queue = defaultMaxQueue if max_queue is None else max_queue
+        self.timeout = defaultTimeout if timeout is None else timeout
+        self.remember = defaultRemember if remember is None else remember
+        self._lock = threading.Lock()
+        self._active = collections.OrderedDict()  # connection --> None, the least recently used first
+        self._expired = collections.OrderedDict()  # timed-out connection --> when, the oldest first
+        self.admitted = self.refused = 0
+
+    def __len__(self):
+        return len(self._active)
+
+    def __iter__(self):  # the open connections
+        with self._lock:
+            return iter(list(self._active))
+
+    def admit(self, conn, name=None):
+        "take on a new connection, and choose its worker. Raises OperationalError if the server is full."
+        with self._lock:
+            if len(self._active) >= self.max_connections:
+                self.refused += 1
+                raise api.OperationalError('the server already has its limit of %d connections' %
+                                           self.max_connections)
+            self._active[conn] = None
+            self.admitted += 1
+        conn.timed_out = False
+        conn.stats = ConnectionStats(name)
+        conn.worker = self.pool.acquire() if self.pool else None
+
+    def remove(self, conn):
+        "forget a closed connection, and free its place on its worker"
+        with self._lock:
+            self._active.pop(conn, None)
+            worker = getattr(conn, 'worker', None)
+            conn.worker = None  # later calls (which will only find it closed) run where they are received
+        if worker is not None:
+            self.pool.release(worker)
+
+    def _touch(self, conn):
+        with self._lock:
+            if conn in self._active:
+                self._active.move_to_end(conn)
+        conn.stats.last_used = time.monotonic()
+
+    def _run(self, conn, queued, func, args, kwargs):
+        "run one call for conn, counting it"
+        stats = conn.stats
+        started = time.perf_counter()
+        stats.calls += 1
+        stats.wait_seconds += started - queued
+        try:
+            return func(*args, **kwargs)
+        except BaseException:
+            stats.errors += 1
+            raise
+        finally:
+            stats.busy_seconds += time.perf_counter() - started
+            self._touch(conn)
+
+    def call(self, conn, func, *args, **kwargs):
+        """run func(*args, **kwargs) for conn on its worker, and wait for the result.
+
+        Raises OperationalError, without running it, if max_queue calls are already waiting for the worker."""
+        stats = getattr(conn, 'stats', None)
+        if stats is None:  # not admitted (yet)
+            return func(*args, **kwargs)
+        self._touch(conn)  # a long query does not make its connection look idle
+        worker = conn.worker
+        queued = time.perf_counter()
+        if worker is None or worker is threading.current_thread():
+            return self._run(conn, queued, func, args, kwargs)
+        if worker.calls.qsize() >= self.max_queue:
+            stats.rejected += 1
+            raise api.OperationalError('the server is busy: %d calls are waiting for this connection\'s worker'
+                                       % self.max_queue)
+        return worker.submit(self._run, conn, queued, func, args, kwargs).result()
+
+    def expire(self):
+        """close the connections which have been unused longer than timeout --> a list of them.
+
+        Timed-out connections are remembered (in the statistics) for a further 'remember' seconds."""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            while self._active:
+                conn = next(iter(self._active))  # the least recently used
+                if now - conn.stats.last_used <= self.timeout:
+                    break
+                del self._active[conn]
+                conn.timed_out = True
+                self._expired[conn] = now
+                expired.append(conn)
+            while self._expired:
+                conn, when = next(iter(self._expired.items()))
+                if now - when <= self.remember:
+                    break
+                del self._expired[conn]
+        for conn in expired:
+            worker = conn.worker
+            if worker is None:
+                self._close(conn)
+            else:
+                worker.submit(self._close, conn)  # do not wait: the worker may be busy
+        return expired
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        "close every connection, and stop the workers"
+        for conn in self:
+            try:
+                self.call(conn, conn.close)
+            except Exception:
+                pass
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def stats(self):
+        "--> a dictionary describing the server's use, with a list of dictionaries for its connections"
+        with self._lock:
+            active = list(self._active)
+            expired = list(self._expired)
+        return {'connections': len(active), 'timed_out': len(expired),
+                'admitted': self.admitted, 'refused': self.refused,
+                'workers': len(self.pool.workers) if self.pool else 0,
+                'per_connection': [dict(conn.stats.as_dict(), timed_out=conn.timed_out)
+                                   for conn in active + expired]}
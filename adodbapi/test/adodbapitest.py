@@ -520,6 +520,21 @@ class CommonDBTests(unittest.TestCase):
         assert len(rs)==0 
         self.helpRollbackTblTemp()
 
+    def testFetchColumns(self):
+        if self.remote:  # not available on remote
+            return
+        crsr=self.getCursor()
+        self.helpCreateAndPopulateTableTemp(crsr)
+        crsr.execute("SELECT fldData FROM xx_%s ORDER BY fldData" % config.tmp)
+        cols=crsr.fetchmany_columns(4)
+        assert len(cols)==1
+        self.assertEqual(cols[0], [0, 1, 2, 3])
+        cols=crsr.fetchall_columns()
+        self.assertEqual(cols[0], [4, 5, 6, 7, 8])
+        cols=crsr.fetchall_columns()
+        self.assertEqual(cols, [[]])
+        self.helpRollbackTblTemp()
+
     def testErrorConnect(self):
         conn = self.getConnection()
         kw = {}
@@ -1207,6 +1222,11 @@ class TimeConverterInterfaceTest(unittest.TestCase):
     def testICOMDate(self):
         assert hasattr(self.tc,'COMDate')
 
+    def testIDateObjectsFromCOMDates(self):
+        comDates = [37435.7604282, None, 34653.0, 37747.593946759262]
+        expected = [None if d is None else self.tc.DateObjectFromCOMDate(d) for d in comDates]
+        self.assertEqual(self.tc.DateObjectsFromCOMDates(comDates), expected)
+
     def testExactDate(self):
         d=self.tc.Date(1994,11,15)
         comDate=self.tc.COMDate(d)
@@ -1315,6 +1335,18 @@ class TestPythonDateTimeConverter(TimeConverterInterfaceTest):
         c1 = self.tc.DateObjectFromCOMDate(self.tc.COMDate(tx))
         assert t1 < c1 < t2, c1
 
+    def testDateObjectsFromCOMDates(self):
+        comDates = [random.uniform(-700.0, 80000.0) for i in range(1000)]
+        comDates += [0.0, -1.25, 34653.0, 34653.999999999, 37435.7604282, None]
+        cmds = self.tc.DateObjectsFromCOMDates(comDates)
+        for comDate, cmd in zip(comDates, cmds):
+            if comDate is None:
+                assert cmd is None
+            else:  # must agree, to the microsecond, with the one-at-a-time conversion
+                self.assertEqual(cmd, self.tc.DateObjectFromCOMDate(comDate))
+        tx = datetime.datetime(2002,6,28,18,14,1,900000)
+        self.assertEqual(self.tc.DateObjectsFromCOMDates([tx]), [tx])
+
     def testDate(self):
         t1=datetime.date(2002,6,28)
         t2=datetime.date(2002,6,30)
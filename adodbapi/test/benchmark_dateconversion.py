@@ -0,0 +1,34 @@
+"""benchmark_dateconversion.py -- compare one-at-a-time and whole-column conversion of ComDates
+
+run using:  python benchmark_dateconversion.py [number_of_rows]
+"""
+import random
+import sys
+import timeit
+
+import setuptestframework
+
+pth = setuptestframework.find_ado_path()  # use the adodbapi module in which this file appears
+if pth not in sys.path:
+    sys.path.insert(1, pth)
+import adodbapi.apibase as api
+
+try:
+    rows = int(sys.argv[1])
+except (IndexError, ValueError):
+    rows = 500000
+
+tc = api.pythonDateTimeConverter()
+timestamps = [random.uniform(36526.0, 47482.0) for i in range(rows)]  # 2000-01-01 to 2029-12-31
+dates = [float(int(d)) for d in timestamps]
+
+for name, column in (('timestamps', timestamps), ('dates', dates)):
+    scalar = timeit.timeit(lambda: [api.convert_to_python(d, tc.DateObjectFromCOMDate) for d in column], number=1)
+    batch = timeit.timeit(lambda: tc.DateObjectsFromCOMDates(column), number=1)
+    print('%d %s: one at a time= %.3f sec, whole column= %.3f sec (%.1fx)' % (rows, name, scalar, batch, scalar / batch))
+    try:
+        datetime64 = timeit.timeit(lambda: tc.Datetime64FromCOMDates(column), number=1)
+    except api.NotSupportedError:
+        print('   (numpy is not installed -- datetime64 conversion not measured)')
+    else:
+        print('   numpy datetime64[ms]= %.3f sec (%.1fx)' % (datetime64, scalar / datetime64))
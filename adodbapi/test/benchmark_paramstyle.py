@@ -0,0 +1,36 @@
+"""benchmark_paramstyle.py -- compare the older and the single-pass paramstyle conversion of large operations
+
+run using:  python benchmark_paramstyle.py [number_of_rows]
+"""
+import sys
+import timeit
+
+import setuptestframework
+
+pth = setuptestframework.find_ado_path()  # use the adodbapi module in which this file appears
+if pth not in sys.path:
+    sys.path.insert(1, pth)
+import adodbapi.apibase as api
+from test_adodbapi_paramstyle import oldChangeNamedToQmark, oldChangeFormatToQmark
+
+try:
+    rows = int(sys.argv[1])
+except (IndexError, ValueError):
+    rows = 20000
+
+cases = (
+    ('named', oldChangeNamedToQmark, api.changeNamedToQmark, "(:id%d, 'it''s', :name%d, :when%d)"),
+    ('format', oldChangeFormatToQmark, api.changeFormatToQmark, "(%%s, 'it''s', %%s, %%s)"),
+    ('pyformat', oldChangeFormatToQmark, api.changeFormatToQmark, "(%%(id%d)s, 'it''s', %%(name%d)s, %%(when%d)s)"),
+    )
+for name, old, new, values in cases:
+    if '%d' in values:
+        body = ','.join(values % (i, i, i) for i in range(rows))
+    else:
+        body = ','.join(values % () for i in range(rows))
+    op = 'INSERT INTO cheese (id, note, name, sold) VALUES ' + body
+    assert old(op) == new(op)
+    before = timeit.timeit(lambda: old(op), number=1)
+    after = timeit.timeit(lambda: new(op), number=1)  # (text this long is never remembered)
+    print('%s, %d rows (%.1f MB): older= %.3f sec, single pass= %.3f sec (%.1fx)' %
+          (name, rows, len(op) / 1e6, before, after, before / after))
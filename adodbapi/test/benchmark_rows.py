@@ -0,0 +1,57 @@
+"""benchmark_rows.py -- compare the memory and time used to hold fetched rows in each Cursor.row_format
+
+run using:  python benchmark_rows.py [number_of_rows]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+import setuptestframework
+
+pth = setuptestframework.find_ado_path()  # use the adodbapi module in which this file appears
+if pth not in sys.path:
+    sys.path.insert(1, pth)
+import adodbapi.apibase as api
+
+try:
+    rows = int(sys.argv[1])
+except (IndexError, ValueError):
+    rows = 1000000
+
+
+class ResultShape(object):  # the parts of a Cursor used by SQLrows and tuple_rows
+    recordset_format = api.RS_WIN_32
+    numberOfColumns = 4
+    columnNames = {'id': 0, 'name': 1, 'price': 2, 'note': 3}
+    converters = [api.identity] * 4
+
+
+ado_results = (tuple(range(rows)), tuple('name%d' % (i % 1000) for i in range(rows)),
+               tuple(float(i % 1000) for i in range(rows)), (None,) * rows)  # like pywin32 GetRows()
+shape = ResultShape()
+rowclass = api.compactRowClass(('id', 'name', 'price', 'note'))
+
+makers = (
+    ("'sqlrow' (list of SQLrow)", lambda: list(api.SQLrows(ado_results, rows, shape))),
+    ("'compact' (CompactRow)", lambda: api.tuple_rows(ado_results, rows, shape, rowclass)),
+    ("'tuple'", lambda: api.tuple_rows(ado_results, rows, shape)),
+    )
+for name, make in makers:
+    gc.collect()
+    start = time.perf_counter()
+    held = make()
+    seconds = time.perf_counter() - start
+    del held
+    gc.collect()
+    tracemalloc.start()
+    held = make()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for row in held:
+        row[1]
+    read = time.perf_counter() - start
+    print('%-28s %d rows: %6.1f MB (%5.1f bytes/row), build= %.3f sec, read row[1]= %.3f sec' %
+          (name, rows, size / 1e6, size / rows, seconds, read))
+    del held
@@ -0,0 +1,95 @@
+"""benchmark_wireformat.py -- compare pickled rows with the columnar wire format of adodbapi.remote
+
+A stand-in for the remote server runs in this process, with imitation ADO objects for its database.
+Every reply is pickled and un-pickled, as Pyro4 (with SERIALIZER='pickle') would do on the network.
+
+run using:  python benchmark_wireformat.py [number_of_rows]
+"""
+import datetime
+import pickle
+import sys
+import time
+from unittest import mock
+
+import setuptestframework
+
+pth = setuptestframework.find_ado_path()  # use the adodbapi module in which this file appears
+if pth not in sys.path:
+    sys.path.insert(1, pth)
+import adodbapi.adodbapi as ado
+import adodbapi.apibase as api
+import adodbapi.ado_consts as adc
+import adodbapi.wireformat
+
+from test_adodbapi_fakeado import FakeConnector, FakeRecordset, fake_dispatch
+
+try:
+    rows = int(sys.argv[1])
+except (IndexError, ValueError):
+    rows = 200000
+
+fields = [('id', adc.adInteger), ('name', adc.adVarWChar), ('price', adc.adDouble),
+          ('sold', adc.adDBTimeStamp), ('note', adc.adVarWChar)]
+start = datetime.datetime(2020, 1, 1)
+data = [(i, 'cheese %d' % (i % 50), i * 0.25, start + datetime.timedelta(seconds=i), None if i % 3 else 'note')
+        for i in range(rows)]
+
+
+class LoopbackServer(object):
+    """stands in for remote/server.py's ServerConnection, for one cursor"""
+    def __init__(self):
+        connector = FakeConnector({'SELECT': lambda: FakeRecordset(fields, data)})
+        self.connection = ado.Connection()
+        self.connection.connect({'connection_string': 'Provider=imitation;'}, connection_maker=lambda: connector)
+
+    def crsr_fetchall(self, sql):  # as in server.py
+        crsr = self.connection.cursor()
+        crsr.execute(sql)
+        result = []
+        for row in crsr.fetchall():
+            result.append(row[:])
+        return result
+
+    def crsr_fetchall_columnar(self, sql, chunk_rows=None):  # as in server.py
+        crsr = self.connection.cursor()
+        crsr.execute(sql)
+        return adodbapi.wireformat.encode_columns(crsr.fetchall_columns(), chunk_rows)
+
+
+class LoopbackProxy(object):
+    "pickles each reply, as Pyro4 would on the wire"
+    def __init__(self, server):
+        self.server = server
+        self.bytes_sent = 0
+
+    def __getattr__(self, name):
+        method = getattr(self.server, name)
+        def call(*args):
+            reply = pickle.dumps(method(*args), pickle.HIGHEST_PROTOCOL)
+            self.bytes_sent = len(reply)
+            return pickle.loads(reply)
+        return call
+
+
+class RemoteShape(object):  # the parts of a remote Cursor used by SQLrows
+    recordset_format = api.RS_REMOTE
+    numberOfColumns = len(fields)
+    converters = NotImplemented
+    columnNames = dict((name, i) for i, (name, adotype) in enumerate(fields))
+
+
+with mock.patch.object(ado, 'Dispatch', fake_dispatch, create=True):
+    proxy = LoopbackProxy(LoopbackServer())
+    t = time.perf_counter()
+    rs = proxy.crsr_fetchall('SELECT')
+    result = api.SQLrows(rs, len(rs), RemoteShape())
+    pickled = time.perf_counter() - t, proxy.bytes_sent
+    t = time.perf_counter()
+    rs = adodbapi.wireformat.decode_rows(proxy.crsr_fetchall_columnar('SELECT'))
+    result = api.SQLrows(rs, len(rs), RemoteShape())
+    columnar = time.perf_counter() - t, proxy.bytes_sent
+    assert rs == [tuple(row) for row in data]
+
+print('%d rows, pickled rows: %.3f sec, %.1f MB' % (rows, pickled[0], pickled[1] / 1e6))
+print('%d rows, columnar:     %.3f sec, %.1f MB  (%.1fx faster, %.1fx smaller)' %
+      (rows, columnar[0], columnar[1] / 1e6, pickled[0] / columnar[0], pickled[1] / columnar[1]))
@@ -0,0 +1,145 @@
+""" Unit tests for adodbapi.aio -- using the imitation ADO objects of test_adodbapi_fakeado """
+import asyncio
+import sys
+import threading
+import unittest
+from unittest import mock
+
+import setuptestframework
+
+pth = setuptestframework.find_ado_path()  # use the adodbapi module in which this file appears
+if pth not in sys.path:
+    sys.path.insert(1, pth)
+
+import adodbapi.adodbapi as ado
+import adodbapi.apibase as api
+import adodbapi.ado_consts as adc
+import adodbapi.aio as aio
+
+from test_adodbapi_fakeado import FakeConnector, FakeRecordset, fake_dispatch
+
+
+class ThreadNotingConnector(FakeConnector):
+    "an imitation ADODB.Connection which notes the threads that use it"
+    def __init__(self):
+        FakeConnector.__init__(self)
+        self.threads = set()
+
+    def Open(self):
+        self.threads.add(threading.get_ident())
+        FakeConnector.Open(self)
+
+    def CommitTrans(self):
+        self.threads.add(threading.get_ident())
+        return FakeConnector.CommitTrans(self)
+
+
+class AioTestCase(unittest.TestCase):
+    fields = [('id', adc.adInteger), ('name', adc.adVarWChar)]
+
+    def setUp(self):
+        patcher = mock.patch.object(ado, 'Dispatch', fake_dispatch, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.workers = aio.WorkerPool(max_workers=2)
+        self.addCleanup(self.workers.shutdown)
+        self.connectors = []
+        self.built = []
+
+    def make_connector(self):
+        connector = ThreadNotingConnector()
+        def make_recordset():
+            self.built.append(FakeRecordset(self.fields, [(i, 'n%d' % i) for i in range(100)]))
+            connector.threads.add(threading.get_ident())
+            return self.built[-1]
+        connector.results['SELECT'] = make_recordset
+        self.connectors.append(connector)
+        return connector
+
+    def run_async(self, coroutine):
+        "run coroutine to completion on a new event loop (asyncio.run() needs Python 3.7)"
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.close()
+
+    def connect(self):
+        return aio.connect('Provider=imitation;', connection_maker=self.make_connector, workers=self.workers)
+
+
+class TestAio(AioTestCase):
+    def testExecuteAndFetch(self):
+        async def go():
+            conn = await self.connect()
+            crsr = await conn.cursor()
+            await crsr.execute('SELECT')
+            self.assertEqual(crsr.description[1][0], 'name')
+            first = await crsr.fetchone()
+            some = await crsr.fetchmany(10)
+            rest = await crsr.fetchall()
+            await conn.close()
+            return first, some, rest
+        first, some, rest = self.run_async(go())
+        self.assertEqual((first.id, len(some), len(rest)), (0, 10, 89))
+
+    def testConnectionsArePinned(self):
+        async def use_one():
+            async with await self.connect() as conn:
+                for i in range(3):
+                    crsr = await conn.cursor()
+                    await crsr.execute('SELECT')
+                    await crsr.fetchall()
+                    await conn.commit()
+        async def go():
+            await asyncio.gather(*[use_one() for i in range(8)])
+        self.run_async(go())
+        self.assertEqual(len(self.connectors), 8)
+        for connector in self.connectors:
+            self.assertEqual(len(connector.threads), 1)  # each connection stayed on one thread
+            self.assertNotIn(threading.get_ident(), connector.threads)
+        self.assertLessEqual(len(set().union(*[c.threads for c in self.connectors])), 2)
+        self.assertEqual([w.connections for w in self.workers.workers], [0, 0])
+
+    def testAsyncIteration(self):
+        async def go():
+            conn = await self.connect()
+            crsr = await conn.cursor()
+            await crsr.execute('SELECT')
+            names = []
+            async for row in crsr:
+                names.append(row.name)
+            await conn.close()
+            return names
+        self.assertEqual(self.run_async(go()), ['n%d' % i for i in range(100)])
+
+    def testBackpressure(self):
+        async def go():
+            conn = await self.connect()
+            crsr = await conn.cursor()
+            await crsr.execute('SELECT')
+            seen = []
+            async for batch in crsr.iter_batches(10):
+                seen.append(len(batch))
+                await asyncio.sleep(0.01)  # a slow consumer
+                fetched = await conn.run(lambda: len(self.built[-1].getrows_sizes))
+                self.assertLessEqual(fetched, len(seen) + 1)  # no more than one batch ahead
+            await conn.close()
+            return seen
+        self.assertEqual(self.run_async(go()), [10] * 10)
+
+    def testErrorsArrive(self):
+        async def go():
+            conn = await self.connect()
+            crsr = await conn.cursor()
+            await crsr.close()
+            with self.assertRaises(api.Error):
+                await crsr.fetchall()
+            await conn.close()
+            with self.assertRaises(api.InterfaceError):
+                await conn.commit()
+        self.run_async(go())
+
+
+if __name__ == '__main__':
+    unittest.main()
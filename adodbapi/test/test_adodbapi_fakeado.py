@@ -0,0 +1,1056 @@
+""" Unit tests for adodbapi which run without a database (or Windows), using imitation ADO objects
+
+The imitation ADODB.Connection is handed to Connection.connect() using its connection_maker argument.
+"""
+import datetime
+import decimal
+import sys
+import unittest
+from unittest import mock
+
+import setuptestframework
+
+pth = setuptestframework.find_ado_path()  # use the adodbapi module in which this file appears
+if pth not in sys.path:
+    sys.path.insert(1, pth)
+
+import adodbapi
+import adodbapi.adodbapi as ado
+import adodbapi.apibase as api
+import adodbapi.tracing as tracing
+import adodbapi.ado_consts as adc
+
+
+class FakeField(object):
+    def __init__(self, name, adotype):
+        self.Name = name
+        self.Type = adotype
+        self.ActualSize = 8
+        self.DefinedSize = 8
+        self.Precision = 10
+        self.NumericScale = 0
+        self.Attributes = adc.adFldMayBeNull
+        self.Value = None
+
+
+class FakeCollection(list):  # imitates an ADO collection, which is indexed by calling it
+    @property
+    def Count(self):
+        return len(self)
+
+    def __call__(self, index):
+        return self[index]
+
+    def Append(self, item):
+        self.append(item)
+
+    def Refresh(self):
+        raise api.Error('this imitation provider cannot describe its parameters')
+
+
+class FakeRecordset(object):
+    """a recordset holding "rows", a list of tuples, described by "fields", a list of (name, adotype)"""
+    def __init__(self, fields, rows):
+        self.Fields = FakeCollection(FakeField(name, adotype) for name, adotype in fields)
+        self.rows = list(rows)
+        self.position = 0
+        self.State = adc.adStateOpen
+        self.getrows_sizes = []  # how many rows were asked for on each call to GetRows()
+
+    @property
+    def RecordCount(self):
+        if self.State == adc.adStateClosed:
+            raise api.OperationalError('Operation is not allowed when the object is closed.')
+        return len(self.rows)
+
+    @property
+    def BOF(self):
+        return not self.rows
+
+    @property
+    def EOF(self):
+        return self.position >= len(self.rows)
+
+    def GetRows(self, limit=-1):
+        self.getrows_sizes.append(limit)
+        if limit < 0:
+            limit = len(self.rows)
+        chunk = self.rows[self.position:self.position + limit]
+        self.position += len(chunk)
+        return tuple(tuple(row[i] for row in chunk) for i in range(self.Fields.Count))  # column major, like pywin32
+
+    def NextRecordset(self):
+        return None, 0
+
+    def Close(self):
+        self.State = adc.adStateClosed
+
+
+class FakeParameter(object):
+    def __init__(self, name, adotype, direction, size=0, value=None):
+        self.Name = name
+        self.Type = adotype
+        self.Direction = direction
+        self.Size = size
+        self.Value = value
+        self.Precision = 0
+        self.NumericScale = 0
+
+    def AppendChunk(self, value):
+        self.Value = value
+
+
+class FakeCommand(object):
+    created = 0  # count of Commands ever made
+
+    def __init__(self):
+        FakeCommand.created += 1
+        self.Parameters = FakeCollection()
+        self.Prepared = False
+
+    def CreateParameter(self, name, adotype, direction, size=0, value=None):
+        return FakeParameter(name, adotype, direction, size, value)
+
+    def Execute(self):
+        connector = self.ActiveConnection
+        connector.executed.append((self.CommandText, [p.Value for p in self.Parameters]))
+        try:
+            recordset = connector.results[self.CommandText]()
+        except KeyError:  # not a query, so ADO returns a closed recordset
+            recordset = FakeRecordset([], [])
+            recordset.Close()
+            return recordset, 1
+        return recordset, -1
+
+
+class FakeProperty(object):
+    def __init__(self, value):
+        self.Value = value
+
+
+class FakeConnector(object):
+    """imitation ADODB.Connection -- "results" maps SQL text to a function returning a FakeRecordset"""
+    def __init__(self, results=None):
+        self.results = results or {}
+        self.executed = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.Attributes = 0
+        self.Errors = []
+        self._properties = {'Transaction DDL': FakeProperty(1), 'DBMS Name': FakeProperty('imitation'),
+                            'DBMS Version': FakeProperty('1.0')}
+        self.Properties = self._properties.__getitem__
+        self.State = adc.adStateClosed
+        self.transactions = 0  # how many transactions were ever begun
+
+    def Open(self):
+        self.State = adc.adStateOpen
+
+    def Close(self):
+        self.State = adc.adStateClosed
+
+    def BeginTrans(self):
+        self.transactions += 1
+        return 1
+
+    def CommitTrans(self):
+        self.commits += 1
+        return 0
+
+    def RollbackTrans(self):
+        self.rollbacks += 1
+        return 0
+
+
+def fake_dispatch(progid):
+    if progid == 'ADODB.Command':
+        return FakeCommand()
+    raise ValueError('cannot imitate %s' % progid)
+
+
+class FakeADOTestCase(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(ado, 'Dispatch', fake_dispatch, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.connector = FakeConnector()
+        self.conn = ado.Connection()
+        self.conn.connect({'connection_string': 'Provider=imitation;'}, connection_maker=lambda: self.connector)
+
+    def setResult(self, sql, fields, rows):
+        "make the imitation database answer the query 'sql', returning the recordset last built"
+        built = []
+        def make_recordset():
+            built.append(FakeRecordset(fields, rows))
+            return built[-1]
+        self.connector.results[sql] = make_recordset
+        return built
+
+
+class TestIterBatches(FakeADOTestCase):
+    fields = [('id', adc.adInteger), ('name', adc.adVarWChar)]
+
+    def testIterBatchesFixedSize(self):
+        self.setResult('SELECT', self.fields, [(i, 'n%d' % i) for i in range(25)])
+        crsr = self.conn.cursor()
+        crsr.execute('SELECT')
+        self.assertEqual([len(batch) for batch in crsr.iter_batches(10)], [10, 10, 5])
+
+    def testIterBatchesIsBounded(self):
+        built = self.setResult('SELECT', self.fields, [(i, 'n%d' % i) for i in range(30000)])
+        crsr = self.conn.cursor()
+        crsr.execute('SELECT')
+        count = 0
+        for batch in crsr.iter_batches():
+            assert len(batch) <= ado.maxBatchRows
+            count += len(batch)
+        self.assertEqual(count, 30000)
+        sizes = built[-1].getrows_sizes
+        assert all(0 < n <= ado.maxBatchRows for n in sizes), sizes
+        assert len(sizes) < 30, 'batch size was not tuned upward'
+
+    def testIterateCursor(self):
+        self.setResult('SELECT', self.fields, [(i, 'n%d' % i) for i in range(100)])
+        crsr = self.conn.cursor()
+        crsr.execute('SELECT')
+        self.assertEqual([row.name for row in crsr], ['n%d' % i for i in range(100)])
+
+    def testIterateEmpty(self):
+        self.setResult('SELECT', self.fields, [])
+        crsr = self.conn.cursor()
+        crsr.execute('SELECT')
+        self.assertEqual(list(crsr), [])
+
+
+
+class TestExecuteMany(FakeADOTestCase):
+    def testCommandIsReused(self):
+        crsr = self.conn.cursor()
+        before = FakeCommand.created
+        crsr.executemany('INSERT INTO t (a, b) VALUES (?, ?)', ((i, 'x%d' % i) for i in range(50)))
+        self.assertEqual(FakeCommand.created - before, 1)
+        self.assertEqual(len(self.connector.executed), 50)
+        self.assertEqual(self.connector.executed[-1][1], [49, 'x49'])
+        self.assertEqual(crsr.rowcount, 50)
+        self.assertEqual(crsr.executemany_rows, 50)
+
+    def testCommandIsRebuiltForNewTypes(self):
+        crsr = self.conn.cursor()
+        before = FakeCommand.created
+        crsr.executemany('INSERT INTO t (a) VALUES (?)', [(1,), ('two',), ('three',)])
+        self.assertEqual(FakeCommand.created - before, 2)
+        self.assertEqual([params for sql, params in self.connector.executed], [[1], ['two'], ['three']])
+
+    def testNamedParameters(self):
+        crsr = self.conn.cursor()
+        crsr.paramstyle = 'named'
+        crsr.executemany('INSERT INTO t (a, b) VALUES (:a, :b)', [{'b': 'x', 'a': 1}, {'a': 2, 'b': 'y'}])
+        self.assertEqual(self.connector.executed,
+                         [('INSERT INTO t (a, b) VALUES (?, ?)', [1, 'x']), ('INSERT INTO t (a, b) VALUES (?, ?)', [2, 'y'])])
+
+    def testRowsPerStatement(self):
+        crsr = self.conn.cursor()
+        crsr.executemany('INSERT INTO t (a, b) VALUES (?, ?)', [(i, i) for i in range(5)],
+                         rows_per_statement=2, commit_interval=2)
+        self.assertEqual(self.connector.executed,
+                         [('INSERT INTO t (a, b) VALUES (?, ?),(?, ?)', [0, 0, 1, 1]),
+                          ('INSERT INTO t (a, b) VALUES (?, ?),(?, ?)', [2, 2, 3, 3]),
+                          ('INSERT INTO t (a, b) VALUES (?, ?)', [4, 4])])
+        self.assertEqual(self.connector.commits, 2)
+        self.assertEqual(crsr.executemany_rows, 5)
+
+
+
+class TestBindingPlanCache(FakeADOTestCase):
+    def testRepeatedExecuteHitsCache(self):
+        crsr = self.conn.cursor()
+        crsr.paramstyle = 'named'
+        for i in range(10):
+            crsr.execute('UPDATE t SET b = :b WHERE a = :a', {'a': i, 'b': 'x'})
+        crsr.execute('UPDATE t SET b = :b WHERE a = :a', {'a': 1, 'b': None})  # new types, so a new plan
+        stats = self.conn.plan_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (9, 2, 2))
+        self.assertEqual(self.connector.executed[-1], ('UPDATE t SET b = ? WHERE a = ?', [None, 1]))
+
+    def testCacheIsBounded(self):
+        self.conn.plan_cache.maxsize = 3
+        crsr = self.conn.cursor()
+        for i in range(10):
+            crsr.execute('SELECT %d' % i, [])
+        self.assertEqual(len(self.conn.plan_cache), 3)
+        crsr.execute('SELECT 9', [])
+        self.assertEqual(self.conn.plan_cache.hits, 1)
+
+    def testLongTextIsNotRemembered(self):
+        crsr = self.conn.cursor()
+        crsr.paramstyle = 'named'
+        sql = 'INSERT INTO t VALUES ' + ','.join('(:a%d)' % i for i in range(api.defaultQmarkMemoLimit))
+        parameters = dict(('a%d' % i, i) for i in range(api.defaultQmarkMemoLimit))
+        crsr.execute(sql, parameters)
+        crsr.execute(sql, parameters)
+        self.assertEqual(len(self.conn.plan_cache), 0)
+        self.assertEqual(self.connector.executed[-1][1][-1], api.defaultQmarkMemoLimit - 1)
+
+
+class TestCommandCache(FakeADOTestCase):
+    def testCommandIsReused(self):
+        crsr = self.conn.cursor()
+        crsr.paramstyle = 'named'
+        before = FakeCommand.created
+        for i in range(5):
+            crsr.execute('UPDATE t SET b = :b WHERE a = :a', {'a': i, 'b': 'x%d' % i})
+        self.assertEqual(FakeCommand.created - before, 1)
+        self.assertEqual(self.connector.executed[-1], ('UPDATE t SET b = ? WHERE a = ?', ['x4', 4]))
+        self.assertEqual(len(crsr.cmd.Parameters), 2)
+        crsr.execute('UPDATE t SET b = :b WHERE a = :a', {'a': 1.5, 'b': 'y'})  # new types, so a new Command
+        self.assertEqual(FakeCommand.created - before, 2)
+        stats = crsr.command_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (4, 2, 2))
+
+    def testPreparedCommandKeepsItsPlan(self):
+        crsr = self.conn.cursor()
+        sql = 'SELECT * FROM t WHERE a = ?'
+        crsr.prepare(sql)
+        before = FakeCommand.created
+        for i in range(3):
+            crsr.execute(sql, [i])
+            self.assertTrue(crsr.cmd.Prepared)
+        self.assertEqual(FakeCommand.created - before, 1)
+        crsr.execute(''.join(sql), [9])  # a different (unprepared) operation object
+        self.assertFalse(crsr.cmd.Prepared)
+        self.assertEqual(FakeCommand.created - before, 2)
+
+    def testNotReusedForNullsOrBinary(self):
+        crsr = self.conn.cursor()
+        before = FakeCommand.created
+        for value in (None, None, b'ab', b'cd'):
+            crsr.execute('UPDATE t SET b = ?', [value])
+        self.assertEqual(FakeCommand.created - before, 4)
+        self.assertEqual(len(crsr.command_cache), 0)
+
+    def testFailedCommandIsDropped(self):
+        crsr = self.conn.cursor()
+        crsr.execute('DELETE FROM t WHERE a = ?', [1])
+        def fail():
+            raise api.DatabaseError('deadlock')
+        self.connector.results['DELETE FROM t WHERE a = ?'] = fail
+        self.assertRaises(api.DatabaseError, crsr.execute, 'DELETE FROM t WHERE a = ?', [2])
+        self.assertEqual(len(crsr.command_cache), 0)
+        del self.connector.results['DELETE FROM t WHERE a = ?']
+        before = FakeCommand.created
+        crsr.execute('DELETE FROM t WHERE a = ?', [3])
+        self.assertEqual(FakeCommand.created - before, 1)
+
+    def testLongTextIsNotRemembered(self):
+        crsr = self.conn.cursor()
+        sql = 'INSERT INTO t VALUES ' + ','.join(['(?)'] * api.defaultQmarkMemoLimit)
+        before = FakeCommand.created
+        for i in range(2):
+            crsr.execute(sql, list(range(api.defaultQmarkMemoLimit)))
+        self.assertEqual(FakeCommand.created - before, 2)
+        self.assertEqual(len(crsr.command_cache), 0)
+
+    def testCacheCanBeTurnedOff(self):
+        crsr = self.conn.cursor()
+        crsr.command_cache.maxsize = 0
+        before = FakeCommand.created
+        for i in range(3):
+            crsr.execute('SELECT ?', [i])
+        self.assertEqual(FakeCommand.created - before, 3)
+
+
+class CountingField(FakeField):
+    reads = 0  # metadata properties read, as though through COM
+
+    def __getattribute__(self, name):
+        if name in ('Name', 'Type', 'ActualSize', 'DefinedSize', 'Precision', 'NumericScale', 'Attributes'):
+            CountingField.reads += 1
+        return object.__getattribute__(self, name)
+
+
+class TestColumnInfo(FakeADOTestCase):
+    sql = 'SELECT id, name, price FROM t'
+    fields = [('ID', adc.adInteger), ('Name', adc.adVarWChar), ('Price', adc.adDouble)]
+
+    def setUp(self):
+        FakeADOTestCase.setUp(self)
+        self.useResult(self.sql, self.fields)
+
+    def useResult(self, sql, fields, rows=((1, 'a', 1.5),)):
+        def make_recordset():
+            recordset = FakeRecordset(fields, rows)
+            recordset.Fields = FakeCollection(CountingField(name, adotype) for name, adotype in fields)
+            return recordset
+        self.connector.results[sql] = make_recordset
+
+    def reads(self, sql):
+        before = CountingField.reads
+        crsr = self.conn.cursor()
+        crsr.execute(sql)
+        return crsr, CountingField.reads - before
+
+    def testSinglePassThenCached(self):
+        crsr, reads = self.reads(self.sql)
+        self.assertEqual(reads, 3 * 6)  # each Field's name, type, sizes and attributes, once
+        before = CountingField.reads
+        self.assertEqual(crsr.description, [('ID', adc.adInteger, 8, 8, 10, 0, True),
+                                            ('Name', adc.adVarWChar, 8, 8, 10, 0, True),
+                                            ('Price', adc.adDouble, 8, 8, 10, 0, True)])
+        self.assertEqual(CountingField.reads - before, 3)  # only ActualSize, which depends on the row
+        crsr, reads = self.reads(self.sql)
+        self.assertEqual(reads, 3)  # only each Field's type, to check the column_info_cache, and no description yet
+        self.assertEqual(crsr.fetchone().name, 'a')
+        self.assertEqual(crsr.adotypes, (adc.adInteger, adc.adVarWChar, adc.adDouble))
+        self.assertEqual(self.conn.column_info_cache.stats()['hits'], 1)
+
+    def testCompactRowsUseColumnInfo(self):
+        self.reads(self.sql)
+        crsr, reads = self.reads(self.sql)
+        crsr.row_format = 'compact'
+        before = CountingField.reads
+        self.assertEqual(crsr.fetchone().price, 1.5)
+        self.assertEqual(CountingField.reads - before, 0)  # the names come from the cached column info
+
+    def testNewShapeIsReadAgain(self):
+        self.reads(self.sql)
+        self.useResult(self.sql, [('Only', adc.adInteger)], [(1,)])
+        crsr, reads = self.reads(self.sql)
+        self.assertEqual(reads, 6)
+        self.assertEqual(crsr.columnNames, {'only': 0})
+
+    def testChangedTypesAreReadAgain(self):
+        self.reads(self.sql)
+        self.useResult(self.sql, [('ID', adc.adInteger), ('Name', adc.adInteger), ('Price', adc.adDouble)],
+                       [(1, 2, 1.5)])  # as though another program altered the table
+        crsr, reads = self.reads(self.sql)
+        self.assertEqual(reads, 2 + 18)  # checked up to the first changed type, then read again
+        self.assertEqual(crsr.adotypes, (adc.adInteger, adc.adInteger, adc.adDouble))
+        self.assertEqual(crsr.fetchone()[1], 2)
+
+    def testParameterTypesAreInTheKey(self):
+        self.useResult('SELECT ?', [('value', adc.adInteger)], [(1,)])
+        crsr = self.conn.cursor()
+        crsr.execute('SELECT ?', [1])
+        crsr.execute('SELECT ?', ['abc'])
+        crsr.execute('SELECT ?', [2])
+        self.assertEqual(len(self.conn.column_info_cache), 2)
+
+    def testLongTextIsNotRemembered(self):
+        sql = 'SELECT id, name, price FROM t WHERE id IN (%s)' % ','.join(['0'] * api.defaultQmarkMemoLimit)
+        self.useResult(sql, self.fields)
+        self.reads(sql)
+        crsr, reads = self.reads(sql)
+        self.assertEqual(reads, 3 * 6)
+        self.assertEqual(len(self.conn.column_info_cache), 0)
+
+    def testCallprocAndExecutemanyEmptyCache(self):
+        self.reads(self.sql)
+        self.connector.results['rebuild'] = lambda: FakeRecordset([], [])
+        self.conn.cursor().callproc('rebuild')
+        self.assertEqual(len(self.conn.column_info_cache), 0)
+        self.reads(self.sql)
+        self.conn.cursor().executemany('ALTER TABLE t ADD notes VARCHAR(10)', [[]])
+        self.assertEqual(len(self.conn.column_info_cache), 0)
+
+    def testSchemaChangeEmptiesCache(self):
+        self.reads(self.sql)
+        self.conn.cursor().execute('ALTER TABLE t ADD notes VARCHAR(10)')
+        self.assertEqual(len(self.conn.column_info_cache), 0)
+        self.assertEqual(self.reads(self.sql)[1], 18)
+        self.assertTrue(api.isSchemaChange(' /* x */ drop table t'))
+        self.assertFalse(api.isSchemaChange('SELECT * FROM created'))
+
+    def testOnlyQueriesAreCached(self):
+        self.useResult('EXEC report', self.fields)
+        self.reads('EXEC report')
+        self.assertEqual(self.reads('EXEC report')[1], 18)  # a procedure may return any shape
+
+
+class TestResultSets(FakeADOTestCase):
+    def setUp(self):
+        FakeADOTestCase.setUp(self)
+        self.crsr = self.conn.cursor()
+        self.connector.results['report'] = self.makeSets
+        self.connector.results['SELECT 1; UPDATE t; SELECT 2'] = self.makeSets
+        self.calls = []
+
+    def makeSets(self):
+        "three result sets, with a closed recordset (as from an UPDATE) between the second and third"
+        sets = [FakeRecordset([('ID', adc.adInteger)], [(i,) for i in range(3)]),
+                FakeRecordset([('Name', adc.adVarWChar), ('Price', adc.adDouble)], [('a', 1.5)]),
+                FakeRecordset([], []),
+                FakeRecordset([('Total', adc.adInteger)], [(99,)])]
+        sets[2].Close()
+        def chain(i):
+            def next_recordset():
+                self.calls.append(i)
+                if i + 1 < len(sets):
+                    return sets[i + 1], 0
+                if self.crsr.cmd.Parameters:  # the provider sends the returned values after the last set
+                    self.crsr.cmd.Parameters[0].Value = 7
+                return None, 0
+            return next_recordset
+        for i, recordset in enumerate(sets):
+            recordset.NextRecordset = chain(i)
+        return sets[0]
+
+    def testPrefetchSets(self):
+        returned = self.crsr.callproc('report', [5], prefetch_sets=True)
+        self.assertEqual(self.calls, [0, 1, 2, 3])  # all read at once
+        self.assertEqual(returned, [5])
+        self.assertEqual(self.crsr.return_value, 7)
+        self.assertEqual(self.crsr.returned_parameters, [5])
+        self.assertEqual(self.crsr.rowcount, 3)
+        self.assertEqual([tuple(r) for r in self.crsr.fetchall()], [(0,), (1,), (2,)])
+        self.assertTrue(self.crsr.nextset())
+        self.assertEqual(self.crsr.description[1][0], 'Price')
+        self.assertEqual(self.crsr.fetchone().name, 'a')
+        self.assertEqual(self.crsr.rowcount, 1)
+        self.assertTrue(self.crsr.nextset())  # the closed recordset was passed over
+        self.assertEqual(self.crsr.fetchall_columns(), [[99]])
+        self.assertIsNone(self.crsr.nextset())
+        self.assertEqual(self.crsr.return_value, 7)
+        self.assertEqual(self.calls, [0, 1, 2, 3])
+
+    def testPrefetchOnExecute(self):
+        self.crsr.execute('SELECT 1; UPDATE t; SELECT 2', prefetch_sets=True)
+        self.assertEqual(self.calls, [0, 1, 2, 3])
+        sets = [(d[0][0], [tuple(r) for batch in batches for r in batch]) for d, batches in self.crsr.iter_sets()]
+        self.assertEqual(sets, [('ID', [(0,), (1,), (2,)]), ('Name', [('a', 1.5)]), ('Total', [(99,)])])
+        self.assertIsNone(self.crsr.returned_parameters)  # not a procedure
+
+    def testIterSetsStreams(self):
+        self.crsr.callproc('report', [5])
+        self.assertIsNone(self.crsr.return_value)  # not sent yet
+        seen = []
+        for description, batches in self.crsr.iter_sets(size=2):
+            seen.append((description[0][0], [len(batch) for batch in batches], list(self.calls)))
+        self.assertEqual(seen, [('ID', [2, 1], []), ('Name', [1], [0]), ('Total', [1], [0, 1, 2])])
+        self.assertEqual(self.crsr.returned_parameters, [5])
+        self.assertEqual(self.crsr.return_value, 7)
+
+    def testUnreadBatchesAreSkipped(self):
+        self.crsr.execute('SELECT 1; UPDATE t; SELECT 2')
+        self.assertEqual([d[0][0] for d, batches in self.crsr.iter_sets()], ['ID', 'Name', 'Total'])
+
+
+class FakeBatchRecordset(object):
+    """imitation client-side ADODB.Recordset, for bulk_insert(). Batches sent by UpdateBatch() are kept
+    in connector.batches, as lists of {column name: value}"""
+    def __init__(self, fail_on_batch=None):
+        self.State = adc.adStateClosed
+        self.fail_on_batch = fail_on_batch
+        self.pending = []
+        self.cancelled = False
+
+    def Open(self, source, connection, cursor_type, lock_type, options):
+        assert (self.CursorLocation, cursor_type, lock_type) == \
+               (adc.adUseClient, adc.adOpenStatic, adc.adLockBatchOptimistic)
+        self.connector = connection
+        self.names = source.split('SELECT ')[1].split(' FROM ')[0].split(', ')
+        self.State = adc.adStateOpen
+
+    def AddNew(self, fields, values):
+        self.pending.append(dict((self.names[i], value) for i, value in zip(fields, values)))
+
+    def UpdateBatch(self):
+        batches = self.connector.__dict__.setdefault('batches', [])
+        if len(batches) + 1 == self.fail_on_batch:
+            raise api.Error('violation of PRIMARY KEY constraint')
+        batches.append(self.pending)
+        self.pending = []
+
+    def CancelBatch(self):
+        self.cancelled = True
+        self.pending = []
+
+    def Close(self):
+        self.State = adc.adStateClosed
+
+
+class TestBulkInsert(FakeADOTestCase):
+    def setUp(self):
+        FakeADOTestCase.setUp(self)
+        self.recordsets = []
+
+    def maker(self, fail_on_batch=None):
+        def make_recordset():
+            self.recordsets.append(FakeBatchRecordset(fail_on_batch))
+            return self.recordsets[-1]
+        return make_recordset
+
+    def testBatches(self):
+        made = []
+        def rows():  # a generator: rows are made only as they are needed
+            for i in range(7):
+                made.append(i)
+                yield (i, 'n%d' % i)
+        progress = []
+        def report(count):
+            progress.append((count, len(made)))
+        count = self.conn.bulk_insert('dbo.[Cheese]', ['id', 'name'], rows(), batch_size=3, progress=report,
+                                      recordset_maker=self.maker())
+        self.assertEqual(count, 7)
+        self.assertEqual([len(batch) for batch in self.connector.batches], [3, 3, 1])
+        self.assertEqual(self.connector.batches[2], [{'id': 6, 'name': 'n6'}])
+        self.assertEqual(progress, [(3, 3), (6, 6), (7, 7)])
+        self.assertEqual(len(self.recordsets), 3)  # a new, empty, recordset for each batch
+        self.assertTrue(all(rs.State == adc.adStateClosed for rs in self.recordsets))
+
+    def testMappingsAndDates(self):
+        when = datetime.datetime(2020, 5, 17, 12)
+        self.conn.bulk_insert('t', ('id', 'sold'), [{'sold': when, 'id': 1, 'ignored': 0}],
+                              recordset_maker=self.maker())
+        self.assertEqual(self.connector.batches, [[{'id': 1, 'sold': ado.dateconverter.COMDate(when)}]])
+
+    def testNothingToInsert(self):
+        self.assertEqual(self.conn.bulk_insert('t', ['id'], iter([]), recordset_maker=self.maker()), 0)
+        self.assertEqual(self.recordsets, [])
+
+    def testFailedBatch(self):
+        self.assertRaises(api.DatabaseError, self.conn.bulk_insert, 't', ['id'], ([i] for i in range(5)),
+                          batch_size=2, recordset_maker=self.maker(fail_on_batch=2))
+        self.assertEqual(len(self.connector.batches), 1)
+        self.assertTrue(self.recordsets[1].cancelled)
+        self.assertEqual(self.recordsets[1].State, adc.adStateClosed)
+
+    def testInvalidatesResultCache(self):
+        self.conn.result_cache = api.ResultCache(100000, ttl=60)
+        entry = api.CachedResult([(1,)], 1, [], [], {}, 1, tags=('cheese',))
+        self.conn.result_cache.put(('SELECT * FROM cheese', ()), entry)
+        self.conn.bulk_insert('dbo.Cheese', ['id'], [[1]], recordset_maker=self.maker())
+        self.assertEqual(len(self.conn.result_cache), 0)
+
+
+class TestRowFormats(FakeADOTestCase):
+    fields = [('ID', adc.adInteger), ('Name', adc.adVarWChar)]
+
+    def fetchAll(self, row_format):
+        self.setResult('SELECT', self.fields, [(i, 'n%d' % i) for i in range(5)])
+        crsr = self.conn.cursor()
+        crsr.row_format = row_format
+        crsr.execute('SELECT')
+        return crsr, crsr.fetchall()
+
+    def testTupleRows(self):
+        crsr, rows = self.fetchAll('tuple')
+        self.assertEqual(rows, [(i, 'n%d' % i) for i in range(5)])
+        self.assertIs(type(rows[0]), tuple)
+
+    def testCompactRows(self):
+        crsr, rows = self.fetchAll('compact')
+        row = rows[2]
+        self.assertEqual(row, (2, 'n2'))
+        self.assertEqual((row.id, row.ID, row['name'], row['NAME'], row[1], row[-1:]), (2, 2, 'n2', 'n2', 'n2', ('n2',)))
+        self.assertFalse(hasattr(row, '__dict__'))
+        self.assertRaises(AttributeError, getattr, row, 'nonesuch')
+        self.assertRaises(KeyError, row.__getitem__, 'nonesuch')
+        self.assertIs(type(rows[4]), type(row))
+
+    def testCompactRowClassIsSharedByShape(self):
+        crsr, rows = self.fetchAll('compact')
+        crsr.execute('SELECT')
+        self.assertIs(type(crsr.fetchone()), type(rows[0]))
+
+    def testConnectionDefault(self):
+        self.conn.row_format = 'tuple'
+        crsr = self.conn.cursor()
+        self.assertEqual(crsr.row_format, 'tuple')
+        self.assertRaises(api.NotSupportedError, setattr, self.conn, 'row_format', 'bogus')
+
+    def testIterate(self):
+        self.setResult('SELECT', self.fields, [(i, 'n%d' % i) for i in range(100)])
+        crsr = self.conn.cursor()
+        crsr.row_format = 'compact'
+        crsr.execute('SELECT')
+        self.assertEqual([row.name for row in crsr], ['n%d' % i for i in range(100)])
+
+
+class TestRowDecoders(FakeADOTestCase):
+    fields = [('ID', adc.adInteger), ('Name', adc.adVarWChar), ('Price', adc.adDouble), ('Cost', adc.adNumeric)]
+
+    def execute(self, rows, row_format='tuple'):
+        self.setResult('SELECT', self.fields, rows)
+        crsr = self.conn.cursor()
+        crsr.row_format = row_format
+        crsr.execute('SELECT')
+        return crsr
+
+    def testConvertsWithNulls(self):
+        rows = self.execute([(1, 'a', 2.5, 3), (None, None, None, None)]).fetchall()
+        self.assertEqual(rows, [(1, 'a', 2.5, decimal.Decimal(3)), (None, None, None, None)])
+        self.assertIs(type(rows[0][3]), decimal.Decimal)
+
+    def testDecoderIsSharedByShape(self):
+        crsr = self.execute([(1, 'a', 2.5, 3)])
+        first = api.rowDecoder(crsr.adotypes, crsr.converters)
+        self.assertEqual(crsr.adotypes, (adc.adInteger, adc.adVarWChar, adc.adDouble, adc.adNumeric))
+        crsr = self.execute([(2, 'b', 3.5, 4)])
+        self.assertIs(api.rowDecoder(crsr.adotypes, crsr.converters), first)
+
+    def testCursorConverterIsUsed(self):
+        crsr = self.execute([(1, 'a', 2.5, 3), (2, None, 1.0, 4)])
+        crsr.converters[1] = str.upper
+        self.assertEqual([row[1] for row in crsr.fetchall()], ['A', None])
+        crsr = self.execute([(1, 'a', 2.5, 3)], 'compact')
+        self.assertEqual(crsr.fetchone().name, 'a')  # the other cursor's converter is not used
+
+    def testNumberWithCommaRetried(self):
+        rows = self.execute([(1, 'a', '2,5', '3,25')]).fetchall()  # as some European providers send them
+        self.assertEqual(rows, [(1, 'a', 2.5, decimal.Decimal('3.25'))])
+
+    def testSQLrowsConvertWholeDateColumns(self):
+        self.setResult('SELECT', [('ID', adc.adInteger), ('Sold', adc.adDBTimeStamp)],
+                       [(i, datetime.datetime(2020, 1, 1 + i)) for i in range(5)])
+        crsr = self.conn.cursor()
+        crsr.execute('SELECT')
+        dateConverter = crsr.converters[1]
+        calls = []
+        def convertColumn(column):
+            calls.append(len(column))
+            return [v.day for v in column]
+        with mock.patch.dict(api.columnConversions, {dateConverter: convertColumn}):
+            rows = crsr.fetchall()
+            self.assertEqual([row.sold for row in rows], [1, 2, 3, 4, 5])
+            self.assertEqual(rows[4, 'Sold'], 5)
+            self.assertEqual([row[0] for row in rows], list(range(5)))
+        self.assertEqual(calls, [5])  # the whole column at once, when it was first used
+
+    def testCompiledMatchesConvertToPython(self):
+        columns = ((1, None, 3), ('x', 'y', None), (None, 1.5, '2,5'))
+        converters = [api.cvtInt, api.cvtUnicode, api.cvtFloat]
+        expected = [tuple(api.convert_to_python(c[i], f) for c, f in zip(columns, converters)) for i in range(3)]
+        self.assertEqual(api.compileRowDecoder(converters)(columns), expected)
+        self.assertEqual(api.compileRowDecoder([])([]), [])
+
+
+class TestArrays(FakeADOTestCase):
+    fields = [('ID', adc.adInteger), ('Price', adc.adDouble), ('Sold', adc.adDBTimeStamp),
+              ('Cost', adc.adNumeric), ('Name', adc.adVarWChar)]
+    rows = [(i, i / 2, datetime.datetime(2020, 1, 1 + i % 28, 12), i, 'n%d' % i) for i in range(25)]
+    rows[3] = (3, None, None, None, None)
+
+    def execute(self):
+        self.setResult('SELECT', self.fields, self.rows)
+        crsr = self.conn.cursor()
+        crsr.execute('SELECT')
+        return crsr
+
+    def testFetchNumpy(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('numpy is not installed')
+        crsr = self.execute()
+        built = self.connector.results['SELECT']
+        arrays = crsr.fetch_numpy(chunk_rows=10)
+        self.assertEqual(list(arrays), ['ID', 'Price', 'Sold', 'Cost', 'Name'])
+        self.assertEqual(arrays['ID'].dtype, numpy.int64)
+        self.assertNotIsInstance(arrays['ID'], numpy.ma.MaskedArray)  # no Nulls
+        self.assertEqual(arrays['ID'].tolist(), list(range(25)))
+        self.assertEqual(arrays['Price'].dtype, numpy.float64)
+        self.assertEqual(arrays['Price'].mask.tolist(), [i == 3 for i in range(25)])
+        self.assertEqual(arrays['Price'][4], 2.0)
+        self.assertEqual(arrays['Sold'].dtype, numpy.dtype('datetime64[us]'))
+        self.assertEqual(arrays['Sold'][0], numpy.datetime64('2020-01-01T12:00'))
+        self.assertTrue(arrays['Sold'].mask[3])
+        self.assertEqual(arrays['Cost'][5], decimal.Decimal(5))
+        self.assertIsNone(arrays['Name'][3])
+        self.assertEqual(arrays['Name'].dtype, object)
+
+    def testFetchNumpyInPartsAndEmpty(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('numpy is not installed')
+        crsr = self.execute()
+        self.assertEqual(crsr.fetch_numpy(size=12, chunk_rows=5)['ID'].tolist(), list(range(12)))
+        self.assertEqual(crsr.fetchone()[0], 12)  # the rest are still there
+        self.assertEqual(len(crsr.fetch_numpy()['ID']), 12)
+        empty = crsr.fetch_numpy()
+        self.assertEqual((len(empty['ID']), empty['ID'].dtype), (0, numpy.int64))
+
+    def testCustomConverterFallsBackToObjects(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('numpy is not installed')
+        crsr = self.execute()
+        crsr.converters[0] = lambda v: 'id%d' % v
+        ids = crsr.fetch_numpy(chunk_rows=10)['ID']
+        self.assertEqual(ids.dtype, object)
+        self.assertEqual(ids[24], 'id24')
+
+    def testFetchArrow(self):
+        try:
+            import pyarrow
+        except ImportError:
+            self.skipTest('pyarrow is not installed')
+        crsr = self.execute()
+        table = crsr.fetch_arrow(chunk_rows=10)
+        self.assertEqual(table.num_rows, 25)
+        self.assertEqual(str(table.schema.field('ID').type), 'int64')
+        self.assertEqual(str(table.schema.field('Sold').type), 'timestamp[us]')
+        self.assertIsNone(table.column('Name')[3].as_py())
+
+
+class TestResultCache(FakeADOTestCase):
+    fields = [('ID', adc.adInteger), ('Name', adc.adVarWChar)]
+    sql = 'SELECT id, name FROM dbo.[Cheese] WHERE id < ?'
+
+    def setUp(self):
+        FakeADOTestCase.setUp(self)
+        self.conn.result_cache = api.ResultCache(100000, ttl=60)
+        self.setResult(self.sql, self.fields, [(i, 'n%d' % i) for i in range(5)])
+
+    def query(self, *params):
+        crsr = self.conn.cursor()
+        crsr.execute(self.sql, list(params) or [5])
+        return crsr
+
+    def testHitReturnsSameRows(self):
+        first = self.query()
+        rows = first.fetchall()
+        second = self.query()
+        self.assertEqual(len(self.connector.executed), 1)  # the second came from the cache
+        self.assertIsInstance(second.fetchmany(2), api.SQLrows)
+        second = self.query()
+        self.assertEqual([tuple(r) for r in second.fetchall()], [tuple(r) for r in rows])
+        self.assertEqual(second.description, first.description)
+        self.assertEqual(second.rowcount, 5)
+        self.assertEqual(self.query().fetchone().name, 'n0')
+        stats = self.conn.result_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (3, 1))
+        self.assertEqual(stats['bytes_saved'], 3 * stats['bytes'])
+        self.assertEqual(stats['hit_ratio'], 0.75)
+
+    def testBatchesAndFormatsFromCache(self):
+        self.query().fetchall()
+        crsr = self.query()
+        crsr.arraysize = 2
+        self.assertEqual([len(b) for b in crsr.iter_batches(2)], [2, 2, 1])
+        crsr = self.query()
+        crsr.row_format = 'compact'
+        self.assertEqual([row.id for row in crsr.fetchall()], list(range(5)))
+        self.assertEqual(self.query().fetchall_columns()[1], ['n%d' % i for i in range(5)])
+        self.assertIsNone(self.query().nextset())
+        self.assertEqual(len(self.connector.executed), 1)
+
+    def testKeyIncludesParameters(self):
+        self.query(5).fetchall()
+        self.query(3).fetchall()
+        self.query(5.0).fetchall()  # equal, but not the same type
+        self.query(3).fetchall()
+        self.assertEqual(len(self.connector.executed), 3)
+
+    def testNamedParametersUseQmarkKey(self):
+        self.query(5)
+        crsr = self.conn.cursor()
+        crsr.paramstyle = 'named'
+        crsr.execute('SELECT id, name FROM dbo.[Cheese] WHERE id < :top', {'top': 5})
+        self.assertEqual(len(self.connector.executed), 1)
+
+    def testWriteInvalidates(self):
+        self.query()
+        self.conn.cursor().execute('UPDATE milk SET fat = 0')
+        self.query()
+        self.assertEqual(len(self.connector.executed), 3)
+        self.conn.cursor().executemany('INSERT INTO milk VALUES (?)', [[1]])
+        self.query()
+        self.assertEqual(len(self.connector.executed), 5)
+
+    def testUncommittedWritesAreNotCached(self):
+        self.conn.cursor().execute('UPDATE cheese SET name = ?', ['changed'])
+        self.query()
+        self.query()  # would show the uncommitted change, so neither was kept
+        self.assertEqual(len(self.connector.executed), 3)
+        self.conn.rollback()
+        self.query()
+        self.query()
+        self.assertEqual(len(self.connector.executed), 4)
+        self.conn.cursor().execute('UPDATE cheese SET name = ?', ['changed'])
+        self.conn.commit()
+        self.query()
+        self.query()
+        self.assertEqual(len(self.connector.executed), 6)
+
+    def testRollbackInvalidates(self):
+        self.query()
+        self.conn.rollback()
+        self.query()
+        self.conn.autocommit = True  # which rolls back, too
+        self.query()
+        self.assertEqual(len(self.connector.executed), 3)
+
+    def testChangedConversionsReadAgain(self):
+        self.query().fetchall()
+        self.conn.variantConversions = api.variantConversions  # (the connection gets its own copy)
+        self.conn.variantConversions[adc.adInteger] = str
+        self.assertEqual(self.query().fetchone()[0], '0')
+        self.assertEqual(self.query().fetchone()[0], '0')
+        self.assertEqual(len(self.connector.executed), 2)
+
+    def testBatchesAreNotCached(self):
+        sql = 'SELECT 1; UPDATE t; SELECT 2'
+        self.setResult(sql, self.fields, [(1, 'a')])
+        for i in range(2):
+            crsr = self.conn.cursor()
+            crsr.execute(sql)
+            crsr.fetchall()
+        self.assertEqual(len(self.connector.executed), 2)
+        self.assertEqual(len(self.conn.result_cache), 0)
+
+    def testTableInvalidation(self):
+        self.query()
+        self.conn.invalidate_cache('milk')
+        self.query()
+        self.assertEqual(len(self.connector.executed), 1)
+        self.conn.invalidate_cache('CHEESE')
+        self.query()
+        self.assertEqual(len(self.connector.executed), 2)
+
+    def testTimeToLive(self):
+        self.conn.result_cache.ttl = 0
+        self.query()
+        self.query()
+        self.assertEqual(len(self.connector.executed), 2)
+        self.assertEqual(self.conn.result_cache.stats()['expired'], 1)
+
+    def testLeastRecentlyUsedEvictedBySize(self):
+        self.query(1)
+        size = self.conn.result_cache.nbytes
+        self.conn.result_cache.max_bytes = 2 * size
+        self.query(2)
+        self.query(1)  # now 2 is the least recently used
+        self.query(3)
+        self.assertIn((self.sql, ((int, 1),)), self.conn.result_cache)
+        self.assertNotIn((self.sql, ((int, 2),)), self.conn.result_cache)
+        self.assertLessEqual(self.conn.result_cache.nbytes, 2 * size)
+        self.assertEqual(self.conn.result_cache.stats()['evicted'], 1)
+
+    def testOffByDefault(self):
+        conn = ado.Connection()
+        conn.connect({'connection_string': 'Provider=imitation;'}, connection_maker=lambda: self.connector)
+        self.assertIsNone(conn.result_cache)
+        conn = ado.Connection()
+        conn.connect({'connection_string': 'Provider=imitation;', 'result_cache_bytes': 1000,
+                      'result_cache_ttl': 5}, connection_maker=lambda: self.connector)
+        self.assertEqual((conn.result_cache.max_bytes, conn.result_cache.ttl), (1000, 5.0))
+
+    def testReferencedTables(self):
+        self.assertEqual(api.referencedTables('SELECT * FROM a x, "c" JOIN dbo.[B] ON 1=1 WHERE d IN '
+                                              '(SELECT e FROM f)'), frozenset('abcf'))
+        self.assertTrue(api.isQuery(' /* hi */ select 1'))
+        self.assertFalse(api.isQuery('SELECT * INTO t FROM u'))
+        self.assertFalse(api.isQuery('EXEC p'))
+        self.assertTrue(api.isQuery('SELECT 1; '))
+        self.assertFalse(api.isQuery('SELECT 1; DELETE FROM t'))
+
+
+class RecordingTracer(tracing.Tracer):
+    def __init__(self):
+        self.events = []
+
+    def statement_start(self, cursor, operation):
+        self.events.append(('start', operation))
+
+    def statement_end(self, cursor, operation, timings, error):
+        self.events.append(('end', operation, sorted(timings), error))
+
+    def fetch_start(self, cursor, limit):
+        self.events.append(('fetch', limit))
+
+    def fetch_end(self, cursor, rows, nbytes, seconds):
+        self.events.append(('fetched', rows, nbytes > 0))
+
+    def conversion(self, cursor, rows, seconds):
+        self.events.append(('converted', rows))
+
+
+class TestTracing(FakeADOTestCase):
+    fields = [('ID', adc.adInteger), ('Name', adc.adVarWChar)]
+
+    def setUp(self):
+        FakeADOTestCase.setUp(self)
+        for sql in ('SELECT id, name FROM t WHERE id < ?', 'SELECT id, name FROM t WHERE id < 5',
+                    'SELECT id, name FROM t WHERE id < 10'):
+            self.setResult(sql, self.fields, [(i, 'n%d' % i) for i in range(5)])
+
+    def testHooksAreCalled(self):
+        tracer = RecordingTracer()
+        self.conn.add_tracer(tracer)
+        crsr = self.conn.cursor()
+        crsr.row_format = 'tuple'
+        crsr.execute('SELECT id, name FROM t WHERE id < ?', [5])
+        crsr.fetchmany(3)
+        crsr.fetchall()
+        crsr.fetchall()
+        sql = 'SELECT id, name FROM t WHERE id < ?'
+        self.assertEqual(tracer.events, [('start', sql),
+                                         ('end', sql, ['command', 'describe', 'execute', 'parameters', 'total'], None),
+                                         ('fetch', 3), ('fetched', 3, True), ('converted', 3),
+                                         ('fetch', None), ('fetched', 2, True), ('converted', 2),
+                                         ('fetch', None), ('fetched', 0, False)])
+        self.conn.remove_tracer(tracer)
+        crsr.execute(sql, [5])
+        self.assertEqual(len(tracer.events), 10)
+        self.assertEqual(self.conn.stats(), {})  # no StatsCollector
+
+    def testFailedStatement(self):
+        tracer = RecordingTracer()
+        self.conn.add_tracer(tracer)
+        def fail():
+            raise api.DatabaseError('no such table')
+        self.connector.results['SELECT * FROM nowhere'] = fail
+        crsr = self.conn.cursor()
+        self.assertRaises(api.DatabaseError, crsr.execute, 'SELECT * FROM nowhere')
+        self.assertEqual(tracer.events[-1][:2], ('end', 'SELECT * FROM nowhere'))
+        self.assertIsInstance(tracer.events[-1][3], api.DatabaseError)
+        self.assertIsNone(crsr._trace)
+
+    def testStatistics(self):
+        conn = ado.Connection()
+        conn.connect({'connection_string': 'Provider=imitation;', 'collect_stats': True},
+                     connection_maker=lambda: self.connector)
+        crsr = conn.cursor()
+        for sql in ('SELECT id, name FROM t WHERE id < 5', 'SELECT id, name FROM t WHERE id < 10'):
+            crsr.execute(sql)
+            crsr.fetchmany_columns(2)
+            crsr.fetchall()
+        crsr.executemany('INSERT INTO t (id) VALUES (?)', [[1], [2], [3]])
+        stats = conn.stats()
+        self.assertEqual(sorted(stats), ['INSERT INTO t (id) VALUES (?)', 'SELECT id, name FROM t WHERE id < ?'])
+        select = stats['SELECT id, name FROM t WHERE id < ?']
+        self.assertEqual((select['count'], select['errors'], select['fetches'], select['rows']), (2, 0, 4, 10))
+        self.assertEqual(select['conversions'], 2)  # the sqlrow format converts lazily
+        self.assertGreater(select['bytes'], 0)
+        self.assertEqual(sum(n for bound, n in select['histogram']), 2)
+        self.assertLessEqual(select['min_seconds'], select['p50'])
+        self.assertLessEqual(select['p50'], select['max_seconds'])
+        self.assertEqual(set(select['phases']), {'command', 'parameters', 'execute', 'describe'})
+        self.assertEqual(stats['INSERT INTO t (id) VALUES (?)']['count'], 3)
+
+    def testStatisticsAreBounded(self):
+        collector = tracing.StatsCollector(max_statements=2)
+        for n in range(5):
+            collector.statement_end(None, 'SELECT * FROM t%d' % n, {'total': 0.001 * n}, None)
+        stats = collector.snapshot()
+        self.assertEqual(sorted(stats), sorted(['SELECT * FROM t0', 'SELECT * FROM t1', tracing.OTHER]))
+        self.assertEqual(stats[tracing.OTHER]['count'], 3)
+        self.assertEqual(stats[tracing.OTHER]['max_seconds'], 0.004)
+        collector.reset()
+        self.assertEqual(collector.snapshot(), {})
+
+    def testNormalizeSQL(self):
+        n = tracing.normalize_sql
+        self.assertEqual(n("SELECT * FROM t1 WHERE id IN (1, 2,3) AND name = N'it''s'"),
+                         'SELECT * FROM t1 WHERE id IN (?, ...) AND name = ?')
+        self.assertEqual(n('SELECT * FROM t1 WHERE id IN (?,?) AND name = ?'),
+                         'SELECT * FROM t1 WHERE id IN (?, ...) AND name = ?')
+        self.assertEqual(n('INSERT INTO t VALUES (?,?),(?,?), (?, ?)'), 'INSERT INTO t VALUES (?, ...), ...')
+        self.assertEqual(n('SELECT x2, 0x1F FROM [table 2]\n  WHERE y > 1.5e3'),
+                         'SELECT x2, ? FROM [table 2] WHERE y > ?')
+
+
+if __name__ == '__main__':
+    unittest.main()
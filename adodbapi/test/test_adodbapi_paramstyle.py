@@ -0,0 +1,168 @@
+""" Unit tests for the adodbapi paramstyle conversion functions -- no database is needed
+
+The functions are compared, using randomly generated SQL, against the older implementation (kept here)
+which split the operation on apostrophes and rebuilt it by string concatenation.
+"""
+import random
+import sys
+import unittest
+
+import setuptestframework
+
+pth = setuptestframework.find_ado_path()  # use the adodbapi module in which this file appears
+if pth not in sys.path:
+    sys.path.insert(1, pth)
+
+import adodbapi.apibase as api
+
+
+# # # # # the older implementation, used as a reference # # # # #
+def oldChangeNamedToQmark(op):
+    outOp = ''
+    outparms=[]
+    chunks = op.split("'")   #quote all literals -- odd numbered list results are literals.
+    inQuotes = False
+    for chunk in chunks:
+        if inQuotes: # this is inside a quote
+            if chunk == '': # double apostrophe to quote one apostrophe
+                outOp = outOp[:-1]  # so take one away
+            else:
+                outOp += "'"+chunk+"'" # else pass the quoted string as is.
+        else: # is SQL code -- look for a :namedParameter
+            while chunk: # some SQL string remains
+                sp = chunk.split(':',1)
+                outOp += sp[0]  # concat the part up to the :
+                s = ''
+                try:
+                    chunk = sp[1]
+                except IndexError:
+                    chunk = None
+                if chunk:  # there was a parameter - parse it out
+                    i = 0
+                    c = chunk[0]
+                    while c.isalnum() or c == '_':
+                        i += 1
+                        try:
+                            c = chunk[i]
+                        except IndexError:
+                            break
+                    s = chunk[:i]
+                    chunk = chunk[i:]
+                if s:
+                    outparms.append(s) # list the parameters in order
+                    outOp += '?'  # put in the Qmark
+        inQuotes = not inQuotes
+    return outOp, outparms
+
+def oldChangeFormatToQmark(op):
+    outOp = ''
+    outparams = []
+    chunks = op.split("'")   #quote all literals -- odd numbered list results are literals.
+    inQuotes = False
+    for chunk in chunks:
+        if inQuotes:
+            if outOp != '' and chunk=='': # he used a double apostrophe to quote one apostrophe
+                outOp = outOp[:-1]  # so take one away
+            else:
+                outOp += "'"+chunk+"'" # else pass the quoted string as is.
+        else:  # is SQL code -- look for a %s parameter
+            if '%(' in chunk:  # ugh! pyformat!
+                while chunk:  # some SQL string remains
+                    sp = chunk.split('%(', 1)
+                    outOp += sp[0]  # concat the part up to the %
+                    if len(sp) > 1:
+                        try:
+                            s, chunk = sp[1].split(')s', 1)  # find the ')s'
+                        except ValueError:
+                            raise api.ProgrammingError('Pyformat SQL has incorrect format near "%s"' % chunk)
+                        outparams.append(s)
+                        outOp += '?'  # put in the Qmark
+                    else:
+                        chunk = None
+            else:  # proper '%s' format
+                sp = chunk.split('%s')  # make each %s
+                outOp += "?".join(sp)   # into ?
+        inQuotes =  not inQuotes # every other chunk is a quoted string
+    return outOp, outparams
+
+
+# # # # # random SQL, in the subset of syntax which the older implementation understood # # # # #
+_words = ['SELECT', 'a', 'b_2', 'FROM', 'tbl', 'WHERE', '=', '<>', ',', '(', ')', 'AND', '1', '+', 'x']
+
+def random_sql(parameter, length=40):
+    "build an operation from words, literals, and whatever parameter() returns"
+    parts = []
+    for i in range(length):
+        choice = random.random()
+        if choice < 0.25:
+            parts.append(parameter())
+        elif choice < 0.35:  # a literal, which may contain an escaped apostrophe or parameter look-alikes
+            parts.append("'" + random.choice(['abc', ":x", '%s', "it''s", '%(y)s', ' ']) + "'")
+        else:
+            parts.append(random.choice(_words))
+        parts.append(random.choice([' ', '', '\n']))
+    return ''.join(parts)
+
+def random_name():
+    return ':' + random.choice(['a', 'b_2', 'theName', 'x1'])
+
+def random_pyformat():
+    return '%(' + random.choice(['a', 'b_2', 'theName', 'x1']) + ')s'
+
+
+class TestParamstyleConversion(unittest.TestCase):
+    def testNamedAgreesWithOldImplementation(self):
+        for i in range(500):
+            op = random_sql(random_name)
+            self.assertEqual(api.changeNamedToQmark(op), oldChangeNamedToQmark(op), op)
+
+    def testFormatAgreesWithOldImplementation(self):
+        for i in range(500):
+            op = random_sql(lambda: '%s')
+            self.assertEqual(api.changeFormatToQmark(op), oldChangeFormatToQmark(op), op)
+
+    def testPyformatAgreesWithOldImplementation(self):
+        for i in range(500):
+            op = random_sql(random_pyformat)
+            self.assertEqual(api.changeFormatToQmark(op), oldChangeFormatToQmark(op), op)
+
+    def testNamedSkipsCommentsAndQuotedNames(self):
+        op = 'SELECT :a, "col:x", [tbl:y] -- :b\nFROM t /* :c */ WHERE d::int = :d'
+        self.assertEqual(api.changeNamedToQmark(op),
+                         ('SELECT ?, "col:x", [tbl:y] -- :b\nFROM t /* :c */ WHERE d::int = ?', ['a', 'd']))
+
+    def testFormatSkipsCommentsAndPercents(self):
+        op = "SELECT %s, 100%% -- %s\n/* %(x)s */ FROM t WHERE a = %s AND b LIKE 'x%s'"
+        self.assertEqual(api.changeFormatToQmark(op),
+                         ("SELECT ?, 100%% -- %s\n/* %(x)s */ FROM t WHERE a = ? AND b LIKE 'x%s'", []))
+
+    def testBadPyformat(self):
+        self.assertRaises(api.ProgrammingError, api.changeFormatToQmark, 'SELECT %(a FROM t')
+
+    def testLongTextIsNotRemembered(self):
+        api._rememberedToQmark.cache_clear()
+        short = 'SELECT :a FROM t'
+        long = 'INSERT INTO t VALUES ' + ','.join('(:a%d)' % i for i in range(api.defaultQmarkMemoLimit))
+        for op in (short, short, long, long):
+            api.changeNamedToQmark(op)
+        info = api._rememberedToQmark.cache_info()
+        self.assertEqual((info.hits, info.currsize), (1, 1))
+        self.assertEqual(api.changeNamedToQmark(long)[1][-1], 'a%d' % (api.defaultQmarkMemoLimit - 1))
+
+    def testNumeric(self):
+        self.assertEqual(api.changeNumericToQmark("UPDATE t SET a = :2, b = ':1' WHERE c = :1 OR d = :2"),
+                         ("UPDATE t SET a = ?, b = ':1' WHERE c = ? OR d = ?", [1, 0, 1]))
+
+    def testUnterminated(self):
+        self.assertEqual(api.changeNamedToQmark("SELECT :a, 'no end :b"), ("SELECT ?, 'no end :b", ['a']))
+        self.assertEqual(api.changeNamedToQmark("SELECT :a /* no end :b"), ("SELECT ? /* no end :b", ['a']))
+
+    def testResultsAreNotShared(self):
+        op = 'SELECT :a'
+        names = api.changeNamedToQmark(op)[1]
+        names.append('changed')
+        self.assertEqual(api.changeNamedToQmark(op), ('SELECT ?', ['a']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,222 @@
+""" Unit tests for adodbapi.pool -- using the imitation ADO objects of test_adodbapi_fakeado """
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+import setuptestframework
+
+pth = setuptestframework.find_ado_path()  # use the adodbapi module in which this file appears
+if pth not in sys.path:
+    sys.path.insert(1, pth)
+
+import adodbapi.adodbapi as ado
+import adodbapi.apibase as api
+import adodbapi.ado_consts as adc
+import adodbapi.pool as pool
+
+from test_adodbapi_fakeado import FakeConnector, FakeRecordset, fake_dispatch
+
+
+class CountingConnector(FakeConnector):
+    "an imitation ADODB.Connection which counts how often its Properties are read"
+    def __init__(self):
+        FakeConnector.__init__(self)
+        self.properties_read = 0
+        self.Properties = self.read_property
+
+    def read_property(self, name):
+        self.properties_read += 1
+        return self._properties[name]
+
+
+class PoolTestCase(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(ado, 'Dispatch', fake_dispatch, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(pool.close_all)
+        self.connectors = []
+
+    def make_connector(self):
+        self.connectors.append(CountingConnector())
+        return self.connectors[-1]
+
+    def getPool(self, **kwargs):
+        return pool.get_pool('Provider=imitation;', connection_maker=self.make_connector, **kwargs)
+
+
+class TestConnectionPool(PoolTestCase):
+    def testConnectionIsReused(self):
+        p = self.getPool()
+        conn = p.connect()
+        conn.close()
+        conn = p.connect()
+        conn.close()
+        self.assertEqual(len(self.connectors), 1)
+        stats = p.stats()
+        self.assertEqual((stats['created'], stats['reused'], stats['open'], stats['idle']), (1, 1, 1, 1))
+
+    def testPropertiesAreCached(self):
+        p = self.getPool()
+        first, second = p.connect(), p.connect()
+        self.assertEqual([c.properties_read for c in self.connectors], [3, 0])
+        self.assertEqual((second.dbms_name, second.dbms_version, second.supportsTransactions), ('imitation', '1.0', True))
+        first.close()
+        second.close()
+
+    def testPoolsAreKeyedByConnectionString(self):
+        p = pool.get_pool('Provider=imitation;Data Source=%(ds)s', ds='one', connection_maker=self.make_connector)
+        self.assertIs(pool.get_pool({'connection_string': 'Provider=imitation;Data Source=one'}), p)
+        self.assertIsNot(pool.get_pool('Provider=imitation;Data Source=%(ds)s', ds='two'), p)
+        self.assertEqual(p.connection_string, 'Provider=imitation;Data Source=one')
+
+    def testPoolsAreKeyedByConnectionOptions(self):
+        p = self.getPool()
+        self.assertIs(self.getPool(), p)
+        for options in ({'autocommit': True}, {'paramstyle': 'named'}, {'timeout': 5}, {'result_cache_bytes': 1000}):
+            other = self.getPool(**options)
+            self.assertIsNot(other, p)
+            with other.connect() as conn:
+                for name, value in options.items():
+                    self.assertEqual(conn.kwargs[name], value)
+
+    def testPoolMadeOutsideTheLock(self):
+        made = []
+        def make_connector():
+            self.assertFalse(pool._pools_lock.locked())
+            made.append(1)
+            return self.make_connector()
+        p = pool.get_pool('Provider=imitation;', min_size=1, connection_maker=make_connector)
+        self.assertEqual(len(made), 1)
+        self.assertIs(self.getPool(), p)
+
+    def testResetOnReturn(self):
+        p = self.getPool()
+        conn = p.connect()
+        conn.paramstyle = 'named'
+        conn.autocommit = True
+        crsr = conn.cursor()
+        conn.close()
+        self.assertIsNone(crsr.connection)
+        self.assertRaises(api.InterfaceError, getattr, conn, 'paramstyle')
+        conn = p.connect()
+        self.assertEqual(conn.paramstyle, 'qmark')
+        self.assertFalse(conn.autocommit)
+        self.assertTrue(conn.transaction_level)
+        conn.close()
+
+    def testSettingsRestoredOnReturn(self):
+        p = self.getPool(result_cache_bytes=1000)
+        conn = p.connect()
+        result_cache = conn.result_cache
+        conn.row_format = 'tuple'
+        conn.timeout = 5
+        conn.errorhandler = lambda *args: None
+        conn.result_cache = None
+        conn.add_tracer(object())
+        conn.close()
+        conn = p.connect()
+        self.assertEqual((conn.row_format, conn.timeout, conn.errorhandler, conn._tracers),
+                         (ado.defaultRowFormat, 30, None, ()))
+        self.assertIs(conn.result_cache, result_cache)
+        conn.close()
+
+    def testRollbackOnReturn(self):
+        p = self.getPool()
+        conn = p.connect()
+        conn.cursor().execute('INSERT INTO t VALUES (1)')
+        conn.close()
+        self.assertEqual((self.connectors[0].rollbacks, self.connectors[0].commits), (1, 0))
+
+    def testWithBlockCommits(self):
+        p = self.getPool()
+        with p.connect() as conn:
+            conn.cursor().execute('INSERT INTO t VALUES (1)')
+        self.assertEqual(self.connectors[0].commits, 1)
+        self.assertEqual(p.stats()['idle'], 1)
+
+    def testDeadConnectionIsReplaced(self):
+        p = self.getPool()
+        p.connect().close()
+        self.connectors[0].Close()
+        conn = p.connect()
+        self.assertIs(conn.connector, self.connectors[1])
+        self.assertEqual(p.stats()['discarded'], 1)
+        conn.close()
+
+    def testPing(self):
+        p = self.getPool(ping_sql='SELECT 1')
+        p.connect().close()
+        def broken():
+            raise api.DatabaseError('the network went away')
+        self.connectors[0].results['SELECT 1'] = broken
+        conn = p.connect()
+        self.assertIs(conn.connector, self.connectors[1])
+        self.assertEqual(self.connectors[0].executed, [('SELECT 1', [])])  # a new connection is not pinged
+        conn.close()
+
+    def testPingIsNotCached(self):
+        p = self.getPool(ping_sql='SELECT 1', result_cache_bytes=10000)
+        p.connect().close()
+        self.connectors[0].results['SELECT 1'] = lambda: FakeRecordset([('one', adc.adInteger)], [(1,)])
+        for i in range(2):
+            p.connect().close()
+        self.assertEqual(self.connectors[0].executed, [('SELECT 1', [])] * 2)  # the new connection is not pinged
+        self.assertEqual(len(self.connectors), 1)
+
+    def testMaxSize(self):
+        p = self.getPool(max_size=1, wait_timeout=0.05)
+        conn = p.connect()
+        self.assertRaises(api.OperationalError, p.connect)
+        conn.close()
+        p.connect().close()
+        self.assertEqual(len(self.connectors), 1)
+
+    def testMinSizeAndIdleTimeout(self):
+        p = self.getPool(min_size=1, idle_timeout=0)
+        self.assertEqual(p.stats()['open'], 1)
+        borrowed = [p.connect() for i in range(3)]
+        for conn in borrowed:
+            conn.close()
+        p.prune()
+        self.assertEqual((p.stats()['open'], p.stats()['discarded']), (1, 2))
+
+    def testThreads(self):
+        p = self.getPool(max_size=2)
+        lock = threading.Lock()
+        in_use = []
+        most = []
+        def worker():
+            for i in range(5):
+                with p.connect() as conn:
+                    with lock:
+                        in_use.append(conn)
+                        most.append(len(in_use))
+                    time.sleep(0.001)
+                    with lock:
+                        in_use.remove(conn)
+        threads = [threading.Thread(target=worker) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(most), 40)
+        self.assertLessEqual(max(most), 2)
+        self.assertLessEqual(len(self.connectors), 2)
+
+    def testClose(self):
+        p = self.getPool()
+        idle, borrowed = p.connect(), p.connect()
+        idle.close()
+        p.close()
+        self.assertEqual(self.connectors[0].State, adc.adStateClosed)
+        self.assertRaises(api.InterfaceError, p.connect)
+        borrowed.close()
+        self.assertEqual(self.connectors[1].State, adc.adStateClosed)
+        self.assertIsNot(self.getPool(), p)
+
+
+if __name__ == '__main__':
+    unittest.main()
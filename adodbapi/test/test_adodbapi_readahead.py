@@ -0,0 +1,140 @@
+""" Unit tests for adodbapi.readahead, the background fetching used by adodbapi.remote -- no database is needed
+
+The remote server is played by StandInServer, which answers fetches like adodbapi/remote/server.py does
+(rows sent in the columnar wire format), after a simulated network round trip.
+"""
+import sys
+import threading
+import time
+import unittest
+
+import setuptestframework
+
+pth = setuptestframework.find_ado_path()  # use the adodbapi module in which this file appears
+if pth not in sys.path:
+    sys.path.insert(1, pth)
+
+import adodbapi.readahead as ra
+import adodbapi.wireformat as wf
+
+
+class StandInServer(object):
+    """answers crsr_fetchmany_columnar() for one result, taking round_trip seconds (plus per_row for each row)"""
+    def __init__(self, rows, round_trip=0.0, per_row=0.0):
+        self.rows = rows
+        self.position = 0
+        self.round_trip = round_trip
+        self.per_row = per_row
+        self.sizes = []  # the size asked for by each fetch
+        self.busy = threading.Lock()  # the multiplex server handles one request at a time
+
+    def crsr_fetchmany_columnar(self, cid, size=None, chunk_rows=None):
+        with self.busy:
+            self.sizes.append(size)
+            part = self.rows[self.position:self.position + size]
+            self.position += len(part)
+            time.sleep(self.round_trip + self.per_row * len(part))
+            return wf.encode_columns([list(column) for column in zip(*part)], chunk_rows)
+
+    def fetcher(self, size):
+        return wf.decode_rows(self.crsr_fetchmany_columnar(1, size))
+
+
+def make_rows(n, width=3):
+    return [tuple(i * width + j for j in range(width)) for i in range(n)]
+
+
+def read_all(reader, pause=0.0):
+    rows = []
+    while True:
+        batch = reader.next_batch()
+        if not batch:
+            return rows
+        rows.extend(batch)
+        time.sleep(pause)  # the program working on this batch
+
+
+class TestReadAhead(unittest.TestCase):
+    def testAllRowsInOrder(self):
+        rows = make_rows(1000)
+        server = StandInServer(rows)
+        reader = ra.ReadAhead(server.fetcher)
+        self.assertEqual(read_all(reader), rows)
+        self.assertEqual(reader.next_batch(), [])  # and again, without asking the server
+        reader.close()
+        self.assertEqual(reader.fetches, len(server.sizes))
+
+    def testEmptyResult(self):
+        server = StandInServer([])
+        reader = ra.ReadAhead(server.fetcher)
+        self.assertEqual(reader.next_batch(), [])
+        reader.close()
+
+    def testFetchingOverlapsWork(self):
+        rows = make_rows(200)
+        server = StandInServer(rows, round_trip=0.02)
+        reader = ra.ReadAhead(server.fetcher, size=20)
+        reader._tune = lambda *args: None  # keep the batch size fixed: ten fetches
+        start = time.perf_counter()
+        self.assertEqual(read_all(reader, pause=0.02), rows)
+        elapsed = time.perf_counter() - start
+        reader.close()
+        # one after the other, ten fetches and ten pauses take 0.4 seconds. Overlapped, about half that.
+        self.assertLess(elapsed, 0.32)
+
+    def testBatchSizeGrowsWithRoundTrip(self):
+        server = StandInServer(make_rows(20000), round_trip=0.005, per_row=0.00001)
+        reader = ra.ReadAhead(server.fetcher)
+        self.assertEqual(len(read_all(reader)), 20000)
+        reader.close()
+        self.assertEqual(server.sizes[0], ra.minBatchRows)
+        self.assertGreater(max(server.sizes), 16 * ra.minBatchRows)
+        self.assertLessEqual(max(server.sizes), ra.maxBatchRows)
+        for before, after in zip(server.sizes, server.sizes[1:]):
+            self.assertLessEqual(after, before * 4)
+
+    def testBatchSizeLimitedByRowSize(self):
+        rows = [(i, 'x' * 10000) for i in range(300)]
+        server = StandInServer(rows, round_trip=0.005)
+        save = ra.defaultBatchBytes
+        ra.defaultBatchBytes = 200000
+        try:
+            reader = ra.ReadAhead(server.fetcher)
+            self.assertEqual(read_all(reader), rows)
+            reader.close()
+        finally:
+            ra.defaultBatchBytes = save
+        self.assertLessEqual(max(server.sizes[1:]), 20)  # about 10 kB per row
+
+    def testErrorIsRaisedInCaller(self):
+        calls = []
+        def fetch(size):
+            calls.append(size)
+            if len(calls) == 2:
+                raise ValueError('the network went away')
+            return make_rows(size)
+        reader = ra.ReadAhead(fetch)
+        self.assertEqual(len(reader.next_batch()), ra.minBatchRows)
+        self.assertRaises(ValueError, reader.next_batch)
+        self.assertEqual(reader.next_batch(), [])
+        reader.close()
+        self.assertEqual(len(calls), 2)
+
+    def testCloseStopsFetching(self):
+        finished = []
+        server = StandInServer(make_rows(100000), round_trip=0.001)
+        reader = ra.ReadAhead(server.fetcher, finish=lambda: finished.append(True), depth=2)
+        reader.next_batch()
+        time.sleep(0.05)  # the thread fills the queue, then waits
+        self.assertLessEqual(len(server.sizes), 4)  # the batch taken, two queued, one waiting to be queued
+        reader.close()
+        fetched = len(server.sizes)
+        self.assertFalse(reader._thread.is_alive())
+        self.assertEqual(finished, [True])
+        self.assertEqual(reader.next_batch(), [])
+        time.sleep(0.01)
+        self.assertEqual(len(server.sizes), fetched)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+""" Unit tests for adodbapi.serving, the connection management of the adodbapi.remote server -- no database is needed """
+import sys
+import threading
+import time
+import unittest
+
+import setuptestframework
+
+pth = setuptestframework.find_ado_path()  # use the adodbapi module in which this file appears
+if pth not in sys.path:
+    sys.path.insert(1, pth)
+
+import adodbapi.apibase as api
+import adodbapi.serving as serving
+
+
+class StandInConnection(object):
+    """plays the part of remote/server.py's ServerConnection"""
+    def __init__(self, registry, name=None):
+        self.registry = registry
+        self.closed = False
+        registry.admit(self, name)
+
+    @serving.pinned
+    def where(self):
+        return threading.current_thread()
+
+    @serving.pinned
+    def query(self, seconds):
+        time.sleep(seconds)
+        return threading.current_thread()
+
+    @serving.pinned
+    def fail(self):
+        raise api.DatabaseError('no such table')
+
+    @serving.pinned
+    def close(self):
+        self.closed = True
+        self.registry.remove(self)
+
+
+class TestConnectionRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registries = []
+
+    def tearDown(self):
+        for registry in self.registries:
+            registry.close_all()
+
+    def registry(self, **kwargs):
+        registry = serving.ConnectionRegistry(**kwargs)
+        self.registries.append(registry)
+        return registry
+
+    def testEachConnectionStaysOnItsWorker(self):
+        registry = self.registry(workers=2)
+        conns = [StandInConnection(registry) for i in range(4)]
+        threads = [conn.where() for conn in conns]
+        for i in range(3):
+            self.assertEqual([conn.where() for conn in conns], threads)
+        self.assertEqual(len(set(threads)), 2)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def testMultiplexRunsOnCallingThread(self):
+        registry = self.registry(workers=0)
+        conn = StandInConnection(registry)
+        self.assertIs(conn.where(), threading.current_thread())
+
+    def testSlowQueryDoesNotStallOtherWorkers(self):
+        registry = self.registry(workers=2)
+        slow, quick = StandInConnection(registry), StandInConnection(registry)
+        self.assertIsNot(slow.worker, quick.worker)
+        t = threading.Thread(target=slow.query, args=(0.5,))
+        t.start()
+        time.sleep(0.05)
+        start = time.perf_counter()
+        quick.query(0)
+        self.assertLess(time.perf_counter() - start, 0.25)
+        t.join()
+
+    def testMaxConnections(self):
+        registry = self.registry(max_connections=2)
+        a, b = StandInConnection(registry), StandInConnection(registry)
+        self.assertRaises(api.OperationalError, StandInConnection, registry)
+        a.close()
+        StandInConnection(registry)
+        self.assertEqual(len(registry), 2)
+        self.assertEqual(registry.stats()['refused'], 1)
+        self.assertEqual(registry.stats()['admitted'], 3)
+
+    def testQueueDepth(self):
+        registry = self.registry(workers=1, max_queue=1)
+        conn = StandInConnection(registry)
+        busy = threading.Thread(target=conn.query, args=(0.3,))
+        busy.start()
+        time.sleep(0.05)
+        waiting = threading.Thread(target=conn.query, args=(0,))  # waits its turn in the queue
+        waiting.start()
+        deadline = time.monotonic() + 1
+        while conn.worker.calls.qsize() < 1 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.assertRaises(api.OperationalError, conn.where)
+        busy.join()
+        waiting.join()
+        conn.where()  # the queue has drained
+        self.assertEqual(conn.stats.rejected, 1)
+        self.assertEqual(conn.stats.calls, 3)
+
+    def testExpiry(self):
+        registry = self.registry(timeout=0.1, remember=0.2)
+        old, used = StandInConnection(registry, 'old'), StandInConnection(registry, 'used')
+        time.sleep(0.06)
+        used.where()
+        time.sleep(0.06)
+        self.assertEqual(registry.expire(), [old])
+        self.assertTrue(old.closed and old.timed_out)
+        self.assertFalse(used.closed or used.timed_out)
+        stats = registry.stats()
+        self.assertEqual((stats['connections'], stats['timed_out']), (1, 1))
+        self.assertEqual([s['name'] for s in stats['per_connection']], ['used', 'old'])
+        time.sleep(0.25)
+        self.assertEqual(registry.expire(), [used])
+        self.assertEqual(registry.stats()['timed_out'], 1)  # 'old' has been forgotten
+
+    def testExpiredConnectionClosedOnItsWorker(self):
+        registry = self.registry(workers=1, timeout=0.01)
+        conn = StandInConnection(registry)
+        worker = conn.worker
+        time.sleep(0.02)
+        self.assertEqual(registry.expire(), [conn])
+        worker.submit(lambda: None).result()  # wait for the close queued before it
+        self.assertTrue(conn.closed)
+        self.assertEqual(worker.connections, 0)
+
+    def testStatistics(self):
+        registry = self.registry(workers=1)
+        conn = StandInConnection(registry, 'c1')
+        conn.query(0.02)
+        self.assertRaises(api.DatabaseError, conn.fail)
+        stats = conn.stats.as_dict()
+        self.assertEqual((stats['name'], stats['calls'], stats['errors'], stats['rejected']), ('c1', 2, 1, 0))
+        self.assertGreaterEqual(stats['busy_seconds'], 0.02)
+        self.assertEqual(registry.stats()['per_connection'][0]['calls'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
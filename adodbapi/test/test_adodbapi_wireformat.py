@@ -0,0 +1,68 @@
+""" Unit tests for adodbapi.wireformat, the columnar format used by adodbapi.remote -- no database is needed """
+import datetime
+import decimal
+import pickle
+import sys
+import unittest
+
+import setuptestframework
+
+pth = setuptestframework.find_ado_path()  # use the adodbapi module in which this file appears
+if pth not in sys.path:
+    sys.path.insert(1, pth)
+
+import adodbapi.wireformat as wf
+
+
+class TestWireFormat(unittest.TestCase):
+    def roundTrip(self, columns, chunk_rows=None):
+        rows = wf.decode_rows(wf.encode_columns(columns, chunk_rows))
+        self.assertEqual(rows, list(zip(*columns)))
+        for row, expected in zip(rows, zip(*columns)):  # equal is not enough: 1 == 1.0 == True
+            self.assertEqual([type(v) for v in row], [type(v) for v in expected])
+        return rows
+
+    def testTypes(self):
+        self.roundTrip([
+            [1, -2**63, 2**63 - 1],
+            [1.5, -0.0, 1e300],
+            ['a', 'é中', ''],
+            [True, False, True],
+            [b'x', b'', b'\x00\xff'],
+            [decimal.Decimal('1.10'), decimal.Decimal('-0'), decimal.Decimal('12345678901234567890.123')],
+            [datetime.datetime(2020, 1, 2, 3, 4, 5, 6), datetime.datetime(1, 1, 1), datetime.datetime(9999, 12, 31)],
+            [datetime.date(2020, 1, 2), datetime.date(1, 1, 1), datetime.date(9999, 12, 31)],
+            [datetime.time(1, 2, 3, 4), datetime.time(), datetime.time(23, 59, 59, 999999)],
+            ])
+
+    def testNulls(self):
+        column = [None if i % 3 == 0 else i for i in range(20)]
+        self.roundTrip([column, [None] * 20, ['s%d' % i if i % 2 else None for i in range(20)]])
+
+    def testFallsBackToPickle(self):
+        self.roundTrip([[1, 'mixed', 2.0], [2**64, 1, None], [datetime.timedelta(1), None, datetime.timedelta(2)]])
+
+    def testChunks(self):
+        columns = [list(range(25)), ['x%d' % (i % 4) for i in range(25)]]
+        chunks = wf.encode_columns(columns, 10)
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual([len(wf.decode_chunk(chunk)[0]) for chunk in chunks], [10, 10, 5])
+        self.roundTrip(columns, 10)
+
+    def testEmpty(self):
+        self.assertEqual(wf.encode_columns([[], []]), [])
+        self.assertEqual(wf.decode_rows([]), [])
+
+    def testSmallerThanPickle(self):
+        n = 10000
+        columns = [list(range(n)), ['category %d' % (i % 10) for i in range(n)], [i / 3.0 for i in range(n)]]
+        pickled = len(pickle.dumps(list(zip(*columns)), pickle.HIGHEST_PROTOCOL))
+        columnar = sum(len(chunk) for chunk in wf.encode_columns(columns))
+        self.assertLess(columnar, pickled / 2)
+
+    def testBadChunk(self):
+        self.assertRaises(ValueError, wf.decode_chunk, b'not a chunk at all')
+
+
+if __name__ == '__main__':
+    unittest.main()
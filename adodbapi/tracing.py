@@ -0,0 +1,240 @@
+"""adodbapi.tracing - hooks to see where the time goes inside adodbapi, and a statistics collector using them
+
+A tracer is any object with the methods of the Tracer class below. Add one to a connection with
+conn.add_tracer(tracer) and its methods are called, for every cursor of the connection, when
+    a statement starts and ends -- execute(), callproc(), and each statement sent by executemany(),
+        with the seconds spent in each phase: building the ADO Command ('command'), its Parameters
+        ('parameters'), running it ('execute'), reading the column information ('describe'), or
+        finding the result in the connection's result cache ('cache'),
+    a fetch (GetRows() call) starts and ends, with the rows read and (an estimate of) their size in bytes,
+    a batch of rows has been converted to Python values. (The default 'sqlrow' row format converts
+        each value when it is used, so only the 'tuple' and 'compact' formats, and the column fetches,
+        report conversions.)
+A connection with no tracers checks only for an empty tuple at each of those places.
+
+StatsCollector is a tracer which keeps, for each statement (normalized, so that the same statement with
+different literals or a different number of "?"s counts as one), a histogram of its latency, its rows,
+bytes, and the time spent in each phase. conn.stats() returns a snapshot of them.
+"""
+import bisect
+import re
+import sys
+import threading
+import time
+
+from . import apibase as api
+
+# ------- module level defaults --------
+defaultMaxStatements = 1000  # distinct statements a StatsCollector keeps. Later ones are counted as OTHER.
+# upper bounds (in seconds) of the latency histogram buckets. The last bucket holds anything slower.
+defaultHistogramBounds = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                          0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+OTHER = '(other statements)'  # the key for statements beyond max_statements
+
+
+class Tracer(object):
+    """the methods called on a connection's tracers. Subclass it and override the ones you want."""
+    def statement_start(self, cursor, operation):
+        "the cursor is about to run operation (the SQL, converted to qmark paramstyle, or a procedure name)"
+
+    def statement_end(self, cursor, operation, timings, error):
+        """operation has finished. timings -- a dictionary of {phase: seconds}, with 'total' for the whole
+        statement. error -- the exception raised, or None"""
+
+    def fetch_start(self, cursor, limit):
+        "the cursor is about to read up to limit rows (None for all of them)"
+
+    def fetch_end(self, cursor, rows, nbytes, seconds):
+        "the cursor has read rows rows, of about nbytes bytes, in seconds"
+
+    def conversion(self, cursor, rows, seconds):
+        "the cursor has converted rows rows to Python values in seconds"
+
+
+class StatementTrace(object):
+    """times the phases of one statement, for a cursor's tracers"""
+    __slots__ = ('cursor', 'tracers', 'operation', 'started', 'last', 'timings')
+
+    def __init__(self, cursor, tracers, operation):
+        self.cursor = cursor
+        self.tracers = tracers
+        self.operation = operation
+        self.timings = {}
+        for tracer in tracers:
+            tracer.statement_start(cursor, operation)
+        self.started = self.last = time.perf_counter()
+
+    def lap(self, phase):
+        "add the time since the last lap to phase"
+        now = time.perf_counter()
+        self.timings[phase] = self.timings.get(phase, 0.0) + now - self.last
+        self.last = now
+
+    def end(self, error=None):
+        self.timings['total'] = time.perf_counter() - self.started
+        for tracer in self.tracers:
+            tracer.statement_end(self.cursor, self.operation, self.timings, error)
+
+
+def estimate_bytes(ado_results, length, numberOfColumns, recordset_format):
+    "the size of a GetRows() result, estimated from the size of its middle row"
+    if not length or not numberOfColumns:
+        return 0
+    middle = length // 2
+    if recordset_format == api.RS_ARRAY:
+        sample = [ado_results[j, middle] for j in range(numberOfColumns)]
+    elif recordset_format == api.RS_REMOTE:
+        sample = ado_results[middle]
+    else:
+        sample = [column[middle] for column in ado_results]
+    return sum(sys.getsizeof(value) for value in sample) * length
+
+
+def traced_fetch(cursor, tracers, limit, read_rows):
+    "call read_rows(limit) (see Cursor._get_rows) for cursor, telling its tracers"
+    for tracer in tracers:
+        tracer.fetch_start(cursor, limit)
+    started = time.perf_counter()
+    rows = read_rows(limit)
+    seconds = time.perf_counter() - started
+    if rows is None:
+        length = nbytes = 0
+    else:
+        length = rows[1]
+        nbytes = estimate_bytes(rows[0], length, cursor.numberOfColumns, cursor.recordset_format)
+    for tracer in tracers:
+        tracer.fetch_end(cursor, length, nbytes, seconds)
+    return rows
+
+
+def traced_conversion(cursor, tracers, rows, convert, args):
+    "call convert(*args), converting rows rows for cursor, telling its tracers how long it took"
+    started = time.perf_counter()
+    result = convert(*args)
+    seconds = time.perf_counter() - started
+    for tracer in tracers:
+        tracer.conversion(cursor, rows, seconds)
+    return result
+
+
+# ------- normalizing statements --------
+_literalPattern = re.compile(r"""
+      (?P<name>\[[^\]]*\] | "(?:[^"]|"")*")   # a [bracketed] or "quoted" identifier, which is kept
+    | '(?:[^']|'')*'            # a 'string literal'
+    | \bN'(?:[^']|'')*'         # an N'unicode literal'
+    | \b0x[0-9a-f]+\b           # a binary literal
+    | (?<![\w.@$#])\d+(?:\.\d*)?(?:e[-+]?\d+)?\b   # a number (not part of a name)
+    """, re.IGNORECASE | re.VERBOSE)
+_spacePattern = re.compile(r'\s+')
+_commaPattern = re.compile(r'\s*,\s*')
+_valuesListPattern = re.compile(r'(\(\?(?:, \?)*\))(?:, \1)+')  # VALUES (?, ?), (?, ?), ...
+_inListPattern = re.compile(r'\( ?\?(?:, \?)+ ?\)')  # (?, ?, ...)
+
+
+def normalize_sql(operation):
+    """operation --> the statement with literals replaced by ?, lists of ?s shortened, and spaces tidied.
+
+    So "SELECT * FROM t WHERE id IN (1, 2, 3)" and "select * from t where id in (?,?)" are counted together."""
+    sql = _literalPattern.sub(lambda m: m.group('name') or '?', operation)
+    sql = _commaPattern.sub(', ', _spacePattern.sub(' ', sql).strip())
+    sql = _valuesListPattern.sub(r'\1, ...', sql)
+    return _inListPattern.sub('(?, ...)', sql)
+
+
+class StatementStats(object):
+    """the statistics of one (normalized) statement"""
+    __slots__ = ('count', 'errors', 'seconds', 'min_seconds', 'max_seconds', 'histogram', 'phases',
+                 'fetches', 'rows', 'bytes', 'fetch_seconds', 'conversions', 'convert_seconds')
+
+    def __init__(self, buckets):
+        self.count = self.errors = self.fetches = self.rows = self.bytes = self.conversions = 0
+        self.seconds = self.max_seconds = self.fetch_seconds = self.convert_seconds = 0.0
+        self.min_seconds = None
+        self.histogram = [0] * buckets
+        self.phases = {}
+
+    def percentile(self, fraction, bounds):
+        "the upper bound of the histogram bucket holding the fraction'th latency (or the slowest, if less)"
+        wanted = fraction * self.count
+        seen = 0
+        for i, n in enumerate(self.histogram):
+            seen += n
+            if n and seen >= wanted:
+                return min(bounds[i], self.max_seconds) if i < len(bounds) else self.max_seconds
+        return None
+
+    def as_dict(self, bounds):
+        d = dict((name, getattr(self, name)) for name in self.__slots__)
+        d['phases'] = dict(self.phases)
+        d['histogram'] = list(zip(bounds + (float('inf'),), self.histogram))
+        d['mean_seconds'] = self.seconds / self.count if self.count else None
+        for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+            d[name] = self.percentile(fraction, bounds)
+        return d
+
+
+class StatsCollector(Tracer):
+    """a tracer which keeps a StatementStats for each normalized statement. (see the module docstring)
+
+    .snapshot() --> {normalized statement: dictionary of its statistics}. .reset() starts again."""
+    def __init__(self, max_statements=None, bounds=None):
+        self.max_statements = defaultMaxStatements if max_statements is None else max_statements
+        self.bounds = tuple(defaultHistogramBounds if bounds is None else bounds)
+        self._lock = threading.Lock()  # snapshot() may be called from another thread
+        self._normalized = api.LRUCache(256)  # operation --> normalize_sql(operation)
+        self._statements = {}
+
+    def _stats_for(self, operation):
+        key = self._normalized.get(operation)
+        if key is None:
+            key = normalize_sql(operation or '')
+            self._normalized[operation] = key
+        stats = self._statements.get(key)
+        if stats is None:
+            if len(self._statements) >= self.max_statements:
+                key = OTHER
+                stats = self._statements.get(key)
+            if stats is None:
+                stats = self._statements[key] = StatementStats(len(self.bounds) + 1)
+        return stats
+
+    def statement_end(self, cursor, operation, timings, error):
+        seconds = timings['total']
+        with self._lock:
+            stats = self._stats_for(operation)
+            stats.count += 1
+            if error is not None:
+                stats.errors += 1
+            stats.seconds += seconds
+            if stats.min_seconds is None or seconds < stats.min_seconds:
+                stats.min_seconds = seconds
+            if seconds > stats.max_seconds:
+                stats.max_seconds = seconds
+            stats.histogram[bisect.bisect_left(self.bounds, seconds)] += 1
+            for phase, t in timings.items():
+                if phase != 'total':
+                    stats.phases[phase] = stats.phases.get(phase, 0.0) + t
+
+    def fetch_end(self, cursor, rows, nbytes, seconds):
+        with self._lock:
+            stats = self._stats_for(getattr(cursor, 'commandText', None))
+            stats.fetches += 1
+            stats.rows += rows
+            stats.bytes += nbytes
+            stats.fetch_seconds += seconds
+
+    def conversion(self, cursor, rows, seconds):
+        with self._lock:
+            stats = self._stats_for(getattr(cursor, 'commandText', None))
+            stats.conversions += 1
+            stats.convert_seconds += seconds
+
+    def snapshot(self):
+        "--> {normalized statement: dictionary of its statistics}"
+        with self._lock:
+            return dict((key, stats.as_dict(self.bounds)) for key, stats in self._statements.items())
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
@@ -0,0 +1,238 @@
+"""adodbapi.wireformat - a compact columnar format for sending query results from adodbapi.remote's server
+
+Pickling a list of row tuples is slow, and large, for big results. Instead, the server sends each chunk of
+(up to chunk_rows) rows as one bytes object, in which each column is stored as:
+    a kind code, and a null bitmap (only if the column holds any Nulls), then
+    int, float, bool, date, time and datetime columns -- a typed array (little-endian),
+    str and Decimal columns -- a dictionary of the distinct values, and an array of indexes into it,
+    bytes columns -- an array of lengths and the concatenated values,
+    anything else -- a pickled list.
+A column with mixed types (other than None) is pickled.
+"""
+import array
+import datetime
+import decimal
+import pickle
+import struct
+import sys
+
+FORMATS = ('columnar1',)  # wire formats this module can write and read, best first
+defaultChunkRows = 10000  # rows in each chunk
+
+_MAGIC = b'ADC1'
+_chunkHeader = struct.Struct('<4sIH')  # magic, number of rows, number of columns
+_columnHeader = struct.Struct('<cB')  # kind, has a null bitmap
+_length = struct.Struct('<I')
+_bigEndian = sys.byteorder == 'big'
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _pack_array(typecode, values):
+    a = array.array(typecode, values)
+    if _bigEndian:
+        a.byteswap()
+    b = a.tobytes()
+    return _length.pack(len(b)) + b
+
+def _unpack_array(typecode, buffer, offset):
+    size = _length.unpack_from(buffer, offset)[0]
+    offset += _length.size
+    a = array.array(typecode)
+    a.frombytes(buffer[offset:offset + size])
+    if _bigEndian:
+        a.byteswap()
+    return a, offset + size
+
+def _int_typecode(low, high):
+    "the narrowest array typecode holding integers from low to high"
+    for typecode, limit in (('b', 2**7), ('h', 2**15), ('i', 2**31)):
+        if -limit <= low and high < limit and array.array(typecode).itemsize * 8 == limit.bit_length():
+            return typecode
+    return 'q'
+
+def _index_typecode(n):
+    return 'B' if n <= 0x100 else 'H' if n <= 0x10000 else 'I'
+
+def _pack_strings(strings):
+    "a list of str --> bytes holding their lengths and their utf-8 text"
+    encoded = [s.encode('utf-8', 'surrogatepass') for s in strings]
+    blob = b''.join(encoded)
+    return _pack_array('I', [len(e) for e in encoded]) + _length.pack(len(blob)) + blob
+
+def _unpack_strings(buffer, offset, decode=True):
+    lengths, offset = _unpack_array('I', buffer, offset)
+    size = _length.unpack_from(buffer, offset)[0]
+    offset += _length.size
+    blob = bytes(buffer[offset:offset + size])
+    values = []
+    start = 0
+    for n in lengths:
+        values.append(blob[start:start + n])
+        start += n
+    if decode:
+        values = [v.decode('utf-8', 'surrogatepass') for v in values]
+    return values, offset + size
+
+def _pack_dictionary(values):
+    "dictionary-encode a list of strings --> bytes"
+    codes = {}
+    indexes = [codes.setdefault(v, len(codes)) for v in values]
+    return _pack_strings(list(codes)) + _pack_array(_index_typecode(len(codes)), indexes)
+
+def _unpack_dictionary(buffer, offset, convert=None):
+    words, offset = _unpack_strings(buffer, offset)
+    if convert is not None:
+        words = [convert(w) for w in words]
+    indexes, offset = _unpack_array(_index_typecode(len(words)), buffer, offset)
+    return [words[i] for i in indexes], offset
+
+
+def _microseconds(delta):
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+def _kind(values):
+    "--> the kind code for a column of non-null values"
+    types = set(map(type, values))
+    if len(types) != 1:
+        return b'o' if types else b'z'
+    t = types.pop()
+    if t is int:
+        if min(values) >= -2**63 and max(values) < 2**63:
+            return b'q'
+    elif t is float:
+        return b'd'
+    elif t is str:
+        return b's'
+    elif t is bool:
+        return b'?'
+    elif t is bytes:
+        return b'y'
+    elif t is decimal.Decimal:
+        return b'n'
+    elif t is datetime.datetime or t is datetime.time:
+        if all(v.tzinfo is None for v in values):
+            return b'D' if t is datetime.datetime else b't'
+    elif t is datetime.date:
+        return b'T'
+    return b'o'
+
+def _encode_column(column):
+    nulls = [i for i, v in enumerate(column) if v is None]
+    present = [v for v in column if v is not None] if nulls else column
+    kind = _kind(present)
+    parts = [_columnHeader.pack(kind, bool(nulls))]
+    if nulls:
+        bitmap = bytearray((len(column) + 7) // 8)
+        for i in nulls:
+            bitmap[i >> 3] |= 1 << (i & 7)
+        parts.append(bytes(bitmap))
+    if kind == b'z':
+        pass
+    elif kind == b'o':
+        blob = pickle.dumps(list(column), pickle.HIGHEST_PROTOCOL)
+        parts.append(_length.pack(len(blob)) + blob)
+    else:
+        if nulls:  # put a placeholder in the place of each Null
+            filler = {b'q': 0, b'd': 0.0, b'?': False, b's': '', b'y': b'', b'n': '0', b'D': _EPOCH,
+                      b'T': datetime.date(1970, 1, 1), b't': datetime.time()}[kind]
+            column = [filler if v is None else v for v in column]
+        if kind == b'q':  # integers are sent in the narrowest array which will hold them
+            typecode = _int_typecode(min(column), max(column))
+            parts.append(typecode.encode('ascii') + _pack_array(typecode, column))
+        elif kind == b'd':
+            parts.append(_pack_array('d', column))
+        elif kind == b'?':
+            parts.append(_pack_array('B', column))
+        elif kind == b's':
+            parts.append(_pack_dictionary(column))
+        elif kind == b'n':
+            parts.append(_pack_dictionary([str(v) for v in column]))
+        elif kind == b'y':
+            blob = b''.join(column)
+            parts.append(_pack_array('I', [len(v) for v in column]) + _length.pack(len(blob)) + blob)
+        elif kind == b'D':
+            parts.append(_pack_array('q', [_microseconds(v - _EPOCH) for v in column]))
+        elif kind == b'T':
+            parts.append(_pack_array('i', [v.toordinal() for v in column]))
+        elif kind == b't':
+            parts.append(_pack_array('q', [((v.hour * 60 + v.minute) * 60 + v.second) * 1000000 + v.microsecond
+                                           for v in column]))
+    return parts
+
+def _decode_column(buffer, offset, count):
+    kind, has_nulls = _columnHeader.unpack_from(buffer, offset)
+    offset += _columnHeader.size
+    bitmap = None
+    if has_nulls:
+        size = (count + 7) // 8
+        bitmap = buffer[offset:offset + size]
+        offset += size
+    if kind == b'z':
+        return [None] * count, offset
+    if kind == b'o':
+        size = _length.unpack_from(buffer, offset)[0]
+        offset += _length.size
+        return pickle.loads(buffer[offset:offset + size]), offset + size
+    if kind == b's':
+        values, offset = _unpack_dictionary(buffer, offset)
+    elif kind == b'n':
+        values, offset = _unpack_dictionary(buffer, offset, decimal.Decimal)
+    elif kind == b'y':
+        values, offset = _unpack_strings(buffer, offset, decode=False)
+    elif kind == b'q':
+        typecode = chr(buffer[offset])
+        values, offset = _unpack_array(typecode, buffer, offset + 1)
+        values = values.tolist()
+    else:
+        typecode = {b'd': 'd', b'?': 'B', b'D': 'q', b'T': 'i', b't': 'q'}[kind]
+        values, offset = _unpack_array(typecode, buffer, offset)
+        values = values.tolist()
+        if kind == b'?':
+            values = [bool(v) for v in values]
+        elif kind == b'D':
+            values = [_EPOCH + datetime.timedelta(microseconds=v) for v in values]
+        elif kind == b'T':
+            values = [datetime.date.fromordinal(v) for v in values]
+        elif kind == b't':
+            values = [(datetime.datetime.min + datetime.timedelta(microseconds=v)).time() for v in values]
+    if bitmap is not None:
+        for byte_number, byte in enumerate(bitmap):
+            if byte:
+                for bit in range(8):
+                    if byte & (1 << bit):
+                        values[byte_number * 8 + bit] = None
+    return values, offset
+
+
+def encode_columns(columns, chunk_rows=None):
+    """encode a list of columns (each a sequence of values, all the same length) --> a list of bytes chunks"""
+    chunk_rows = chunk_rows or defaultChunkRows
+    count = len(columns[0]) if columns else 0
+    chunks = []
+    for start in range(0, count, chunk_rows):
+        part = [column[start:start + chunk_rows] for column in columns]
+        pieces = [_chunkHeader.pack(_MAGIC, len(part[0]), len(part))]
+        for column in part:
+            pieces.extend(_encode_column(column))
+        chunks.append(b''.join(pieces))
+    return chunks
+
+def decode_chunk(chunk):
+    """decode one chunk made by encode_columns() --> a list of columns (each a list of values)"""
+    buffer = memoryview(chunk)
+    magic, count, width = _chunkHeader.unpack_from(buffer, 0)
+    if magic != _MAGIC:
+        raise ValueError('not an adodbapi columnar chunk')
+    offset = _chunkHeader.size
+    columns = []
+    for i in range(width):
+        column, offset = _decode_column(buffer, offset, count)
+        columns.append(column)
+    return columns
+
+def decode_rows(chunks):
+    """decode the chunks made by encode_columns() --> a list of row tuples"""
+    rows = []
+    for chunk in chunks:
+        rows.extend(zip(*decode_chunk(chunk)))
+    return rows
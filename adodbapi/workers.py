@@ -0,0 +1,86 @@
+"""adodbapi.workers - database threads, each in its own COM apartment, to which connections are pinned
+
+An ADO connection must stay on the thread which made it. A WorkerPool is a bounded set of Worker threads;
+each new connection is given the Worker with the fewest connections, and every call on it is queued there.
+Used by adodbapi.aio and by the adodbapi.remote server (see adodbapi.serving). This module has no asyncio code.
+"""
+import concurrent.futures
+import queue
+import threading
+
+from . import adodbapi as ado
+
+# ------- module level defaults --------
+defaultMaxWorkers = 4  # threads in a WorkerPool
+
+
+class Worker(threading.Thread):
+    """a database thread which runs queued calls, one at a time, in its own COM apartment"""
+    def __init__(self, name=None):
+        threading.Thread.__init__(self, name=name, daemon=True)
+        self.calls = queue.Queue()
+        self.connections = 0  # how many connections are pinned to this thread
+
+    def run(self):
+        if ado.onWin32:
+            import pythoncom
+            pythoncom.CoInitialize()  # once, for everything this thread will do
+        try:
+            while True:
+                call = self.calls.get()
+                if call is None:  # the signal to stop
+                    return
+                future, func, args, kwargs = call
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    result = func(*args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        finally:
+            if ado.onWin32:
+                pythoncom.CoUninitialize()
+
+    def submit(self, func, *args, **kwargs):
+        "queue func(*args, **kwargs) to be run on this thread --> a concurrent.futures.Future"
+        future = concurrent.futures.Future()
+        self.calls.put((future, func, args, kwargs))
+        return future
+
+    def stop(self):
+        "finish the calls already queued, then end the thread"
+        self.calls.put(None)
+
+
+class WorkerPool(object):
+    """a bounded set of Workers. Each new connection is pinned to the Worker with the fewest connections."""
+    def __init__(self, max_workers=None):
+        self.max_workers = defaultMaxWorkers if max_workers is None else max_workers
+        self.workers = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        "--> the Worker on which a new connection should live"
+        with self._lock:
+            if len(self.workers) < self.max_workers and all(w.connections for w in self.workers):
+                worker = Worker('adodbapi worker %d' % len(self.workers))
+                worker.start()
+                self.workers.append(worker)
+            worker = min(self.workers, key=lambda w: w.connections)
+            worker.connections += 1
+            return worker
+
+    def release(self, worker):
+        with self._lock:
+            worker.connections -= 1
+
+    def shutdown(self):
+        "stop every Worker, after the calls already queued are finished"
+        with self._lock:
+            workers, self.workers = self.workers, []
+        for worker in workers:
+            worker.stop()
+        for worker in workers:
+            worker.join()
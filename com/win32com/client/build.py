@@ -18,6 +18,7 @@ dynamically, or possibly even generate .html documentation for objects.
 
 import sys
 import string
+import copy
 from keyword import iskeyword
 
 import pythoncom
@@ -114,10 +115,21 @@ class DispatchItem(OleItem):
 		self.mapFuncs = {}
 		self.defaultDispatchName = None
 		self.hidden = 0
+		self.shared = 0 # Set when used by many dynamic objects - see Copy()
 
 		if typeinfo:
 			self.Build(typeinfo, attr, bForUser)
 
+	def Copy(self):
+		"Return an unshared copy, whose maps can be changed without changing ours."
+		ret = copy.copy(self)
+		ret.propMap = self.propMap.copy()
+		ret.propMapGet = self.propMapGet.copy()
+		ret.propMapPut = self.propMapPut.copy()
+		ret.mapFuncs = self.mapFuncs.copy()
+		ret.shared = 0
+		return ret
+
 	def _propMapPutCheck_(self,key,item):
 		ins, outs, opts = self.CountInOutOptArgs(item.desc[2])
 		if ins>1: # if a Put property takes more than 1 arg:
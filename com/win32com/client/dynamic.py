@@ -16,8 +16,10 @@ Example
 
 """
 import sys
+import threading
 import traceback
 import types
+from collections import OrderedDict
 
 import pythoncom
 import winerror
@@ -32,6 +34,15 @@ debugging_attr=0	# Debugging dynamic attribute lookups.
 
 LCID = 0x0
 
+# The most type descriptions ("olereprs") shared between dynamic objects.
+# 0 turns the sharing off.
+oleReprCacheSize = 256
+# The most compiled methods shared between dynamic objects.  0 turns it off.
+methodCacheSize = 1024
+# The most names looked up with GetIDsOfNames remembered for objects without
+# type info for them.  0 turns it off.
+dispIDCacheSize = 4096
+
 # These errors generally mean the property or method exists,
 # but can't be used in this context - eg, property instead of a method, etc.
 # Used to determine if we have a real error or not.
@@ -70,6 +81,7 @@ PyIDispatchType = pythoncom.TypeIIDs[pythoncom.IID_IDispatch]
 PyIUnknownType = pythoncom.TypeIIDs[pythoncom.IID_IUnknown]
 
 _GoodDispatchTypes=(str, IIDType)
+_NoEnumerator = object() # CDispatch._enum_ when the object has no _NewEnum.
 _defaultDispatchItem=build.DispatchItem
 
 def _GetGoodDispatch(IDispatch, clsctx = pythoncom.CLSCTX_SERVER):
@@ -142,7 +154,7 @@ def Dispatch(IDispatch, userName = None, createClass = None, typeinfo = None, Un
 				pass
 	except pythoncom.com_error:
 		typeinfo = None
-	olerepr = MakeOleRepr(IDispatch, typeinfo, lazydata)
+	olerepr = oleReprCache.GetOleRepr(IDispatch, typeinfo, lazydata)
 	return createClass(IDispatch, olerepr, userName, lazydata=lazydata)
 
 def MakeOleRepr(IDispatch, typeinfo, typecomp):
@@ -167,6 +179,235 @@ def MakeOleRepr(IDispatch, typeinfo, typecomp):
 	if olerepr is None: olerepr = build.DispatchItem()
 	return olerepr
 
+class SharedCache:
+	"""A thread-safe LRU cache of things shared by all dynamic objects.
+
+	maxSize is the most items kept - when None, the module global named by
+	sizeName is used, so it can be changed at runtime.  0 turns the cache off.
+	"""
+	sizeName = None
+
+	def __init__(self, maxSize = None):
+		self.maxSize = maxSize
+		self.lock = threading.Lock()
+		self.Clear()
+
+	def Clear(self):
+		"Forget all items, and reset the statistics."
+		with self.lock:
+			self.items = OrderedDict()
+			self.hits = self.misses = self.evictions = self.unshareable = 0
+
+	def GetStats(self):
+		"Return a dictionary of how well the cache is doing."
+		with self.lock:
+			return {'size': len(self.items), 'maxSize': self.GetMaxSize(),
+			        'hits': self.hits, 'misses': self.misses,
+			        'evictions': self.evictions, 'unshareable': self.unshareable}
+
+	def GetMaxSize(self):
+		if self.maxSize is None:
+			return globals()[self.sizeName]
+		return self.maxSize
+
+	def _Get(self, key):
+		# Returns None when not found (or key is None), counting the result.
+		with self.lock:
+			if key is None:
+				self.unshareable = self.unshareable + 1
+				return None
+			value = self.items.get(key)
+			if value is None:
+				self.misses = self.misses + 1
+			else:
+				self.items.move_to_end(key)
+				self.hits = self.hits + 1
+			return value
+
+	def _Add(self, key, value):
+		# If two threads make the same item, the last wins - both are correct.
+		maxSize = self.GetMaxSize()
+		with self.lock:
+			self.items[key] = value
+			while len(self.items) > maxSize:
+				self.items.popitem(last=False)
+				self.evictions = self.evictions + 1
+
+class OleReprCache(SharedCache):
+	"""A cache of the olereprs made by MakeOleRepr, shared by all dynamic
+	objects with the same type information.
+
+	Building a DispatchItem walks every function and variable of the typeinfo,
+	so wrapping each item of a big collection would otherwise build the same
+	olerepr again for every item.  Items are keyed by the typeinfo's IID and
+	version, and the GUID, version and LCID of its type library - typeinfos
+	not in a type library (eg, those of script objects) are never shared.
+
+	Shared olereprs have their 'shared' flag set.  A CDispatch copies one
+	before changing it for itself (eg, _FlagAsMethod), but members bound lazily
+	from the typecomp describe the type, so are added to the shared olerepr
+	for all objects to use.
+	"""
+	sizeName = "oleReprCacheSize"
+
+	def _MakeKey(self, typeinfo, bLazy):
+		try:
+			attr = typeinfo.GetTypeAttr()
+			if attr.iid == pythoncom.IID_NULL:
+				return None
+			typelib = typeinfo.GetContainingTypeLib()[0]
+			libattr = typelib.GetLibAttr()
+		except pythoncom.ole_error:
+			return None
+		return (attr.iid, attr.wMajorVerNum, attr.wMinorVerNum,
+		        libattr[0], libattr[1], libattr[3], libattr[4], bLazy)
+
+	def GetOleRepr(self, IDispatch, typeinfo, typecomp):
+		"As for MakeOleRepr, but the result may be shared with other objects."
+		key = None
+		if typeinfo is not None and self.GetMaxSize() > 0:
+			key = self._MakeKey(typeinfo, typecomp is not None)
+		olerepr = self._Get(key)
+		if olerepr is None:
+			# Build it without the lock, as that may take a while.
+			olerepr = MakeOleRepr(IDispatch, typeinfo, typecomp)
+			if key is not None:
+				olerepr.shared = 1
+				self._Add(key, olerepr)
+		return olerepr
+
+oleReprCache = OleReprCache()
+
+class MethodCache(SharedCache):
+	"""A cache of the functions compiled by CDispatch._make_method_.
+
+	The source of a method depends only on its MapEntry, so once compiled,
+	the function is shared by every object with the same method - it is keyed
+	by the IID of the olerepr, the method name, its dispid and its FUNCDESC
+	(or VARDESC) and names, which together describe its arguments.
+	"""
+	sizeName = "methodCacheSize"
+
+	def _MakeKey(self, olerepr, name, entry):
+		if self.GetMaxSize() <= 0:
+			return None
+		if entry.desc is None:
+			signature = None
+		else:
+			signature = tuple(entry.desc)
+		key = (olerepr.clsid, name, entry.dispid, signature, entry.names, entry.doc, entry.resultCLSID)
+		try:
+			hash(key)
+		except TypeError: # eg, a default value we can't hash.
+			return None
+		return key
+
+	def GetMethod(self, olerepr, name, entry, userName):
+		"Return the function for the method 'name' described by entry."
+		key = self._MakeKey(olerepr, name, entry)
+		fn = self._Get(key)
+		if fn is None:
+			fn = _CompileMethod(olerepr, name, entry, userName)
+			if key is not None:
+				self._Add(key, fn)
+		return fn
+
+methodCache = MethodCache()
+
+def _GetIDOfName(IDispatch, name):
+	# Returns a MapEntry for name, or the com_error if the object doesn't know it.
+	debug_attr_print("Calling GetIDsOfNames for property %s" % (name,))
+	try:
+		return build.MapEntry(IDispatch.GetIDsOfNames(0, name), (name,))
+	except pythoncom.com_error as details:
+		return details
+
+# CDispatch._dispidkey_ for objects whose lookups are kept by the object itself.
+_UnknownClass = 0 # we can't tell the class - lookups are remembered.
+_DynamicClass = 1 # an IDispatchEx - names may come and go, so only dispids found are remembered.
+
+def _GetClassIdentity(IDispatch):
+	# Returns something naming the class of the object, for DispIDCache,
+	# or one of the constants above.
+	# (Not the IID of the type info - objects of many classes may share
+	# one dispinterface, eg, WMI's SWbemObjects, but have different names.
+	# Nor the user name - for an object returned by a property, that is just
+	# the name of the property, eg "Item", whatever the object's class.)
+	try:
+		IDispatch.QueryInterface(pythoncom.IID_IDispatchEx)
+		return _DynamicClass
+	except pythoncom.com_error:
+		pass
+	try:
+		pci = IDispatch.QueryInterface(pythoncom.IID_IProvideClassInfo)
+		clsid = pci.GetClassInfo().GetTypeAttr().iid
+	except pythoncom.com_error:
+		return _UnknownClass
+	if clsid == pythoncom.IID_NULL:
+		return _UnknownClass
+	return "clsid", clsid
+
+class DispIDCache(SharedCache):
+	"""A cache of the names looked up with GetIDsOfNames - both the dispids
+	found and the names the object said it didn't have.
+
+	Names missing from an object's type info (or all names, when it has none)
+	are looked up with GetIDsOfNames every time they are used.  Lookups are
+	shared by all objects of the same class - identified by the CLSID from
+	IProvideClassInfo.  Objects without one keep their own lookups, and IDispatchEx
+	objects (which may add names as they go) keep only the names found
+	(see CDispatch._LookupID_).  Objects which add names some other way may
+	need Invalidate() or CDispatch._InvalidateDispIDs_().
+	"""
+	sizeName = "dispIDCacheSize"
+
+	def Lookup(self, IDispatch, identity, name):
+		"Return the MapEntry for name, or the com_error from looking it up."
+		key = None
+		if self.GetMaxSize() > 0:
+			key = identity, name
+		found = self._Get(key)
+		if found is None:
+			found = _GetIDOfName(IDispatch, name)
+			if key is not None:
+				self._Add(key, found)
+		return found
+
+	def Invalidate(self, identity = None, name = None):
+		"Forget the lookups of name (or all names) for identity (or all objects)."
+		with self.lock:
+			for key in list(self.items.keys()):
+				if (identity is None or key[0] == identity) and (name is None or key[1] == name):
+					del self.items[key]
+
+dispIDCache = DispIDCache()
+
+class _MethodGlobals(dict):
+	# The globals of compiled methods.  "Dispatch" is win32com.client.Dispatch,
+	# not ours, and anything else is looked up in this module as the method
+	# runs, so a change to (eg) LCID is seen by methods already compiled.
+	def __missing__(self, key):
+		return globals()[key]
+
+_methodGlobals = None
+
+def _CompileMethod(olerepr, name, entry, userName):
+	# Returns the function, as named by build.MakePublicAttributeName(name)
+	global _methodGlobals
+	methodName = build.MakePublicAttributeName(name) # translate keywords etc.
+	methodCodeList = olerepr.MakeFuncMethod(entry, methodName, 0)
+	methodCode = "\n".join(methodCodeList)
+	if _methodGlobals is None:
+		_methodGlobals = _MethodGlobals(Dispatch = win32com.client.Dispatch)
+	try:
+		codeObject = compile(methodCode, "<COMObject %s>" % userName, "exec")
+		tempNameSpace = {}
+		exec(codeObject, _methodGlobals, tempNameSpace)
+		return tempNameSpace[methodName]
+	except:
+		debug_print("Error building OLE definition for code ", methodCode)
+		raise
+
 def DumbDispatch(IDispatch, userName = None, createClass = None,UnicodeToString=None, clsctx=pythoncom.CLSCTX_SERVER):
 	"Dispatch with no type info"
 	assert UnicodeToString is None, "this is deprecated and will go away"
@@ -187,6 +428,8 @@ class CDispatch:
 		self.__dict__['_enum_'] = None
 		self.__dict__['_unicode_to_string_'] = None
 		self.__dict__['_lazydata_'] = lazydata
+		self.__dict__['_dispidkey_'] = None # See _LookupID_
+		self.__dict__['_dispids_'] = {}
 
 	def __call__(self, *args):
 		"Provide 'default dispatch' COM functionality - allow instance to be called"
@@ -287,8 +530,11 @@ class CDispatch:
 		# Must check _NewEnum before Item, to ensure b/w compat.
 		if isinstance(index, int):
 			if self.__dict__['_enum_'] is None:
-				self.__dict__['_enum_'] = self._NewEnum()
-			if self.__dict__['_enum_'] is not None:
+				enum = self._NewEnum()
+				if enum is None: # Don't ask again.
+					enum = _NoEnumerator
+				self.__dict__['_enum_'] = enum
+			if self.__dict__['_enum_'] is not _NoEnumerator:
 				return self._get_good_object_(self._enum_.__getitem__(index))
 		# See if we have an "Item" method/property we can use (goes hand in hand with Count() above!)
 		invkind, dispid = self._find_dispatch_type_("Item")
@@ -318,7 +564,7 @@ class CDispatch:
 			return item.desc[4], item.dispid
 
 		try:
-			dispid = self._oleobj_.GetIDsOfNames(0,methodName)
+			dispid = self._LookupID_(methodName).dispid
 		except:	### what error?
 			return None, None
 		return pythoncom.DISPATCH_METHOD | pythoncom.DISPATCH_PROPERTYGET, dispid
@@ -358,26 +604,12 @@ class CDispatch:
 
 	def _make_method_(self, name):
 		"Make a method object - Assumes in olerepr funcmap"
-		methodName = build.MakePublicAttributeName(name) # translate keywords etc.
-		methodCodeList = self._olerepr_.MakeFuncMethod(self._olerepr_.mapFuncs[name], methodName,0)
-		methodCode = "\n".join(methodCodeList)
 		try:
-#			print "Method code for %s is:\n" % self._username_, methodCode
-#			self._print_details_()
-			codeObject = compile(methodCode, "<COMObject %s>" % self._username_,"exec")
-			# Exec the code object
-			tempNameSpace = {}
-			# "Dispatch" in the exec'd code is win32com.client.Dispatch, not ours.
-			globNameSpace = globals().copy()
-			globNameSpace["Dispatch"] = win32com.client.Dispatch
-			exec(codeObject, globNameSpace, tempNameSpace) # self.__dict__, self.__dict__
-			name = methodName
+			fn = methodCache.GetMethod(self._olerepr_, name, self._olerepr_.mapFuncs[name], self._username_)
 			# Save the function in map.
-			fn = self._builtMethods_[name] = tempNameSpace[name]
-			newMeth = MakeMethod(fn, self, self.__class__)
-			return newMeth
+			self._builtMethods_[build.MakePublicAttributeName(name)] = fn
+			return MakeMethod(fn, self, self.__class__)
 		except:
-			debug_print("Error building OLE definition for code ", methodCode)
 			traceback.print_exc()
 		return None
 
@@ -466,6 +698,13 @@ class CDispatch:
 				pass
 		return res
 
+	def _GetOwnOleRepr_(self):
+		"Return our olerepr, first copying it if it is shared with other objects."
+		olerepr = self._olerepr_
+		if getattr(olerepr, "shared", 0):
+			olerepr = self.__dict__['_olerepr_'] = olerepr.Copy()
+		return olerepr
+
 	def _FlagAsMethod(self, *methodNames):
 		"""Flag these attribute names as being methods.
 		Some objects do not correctly differentiate methods and
@@ -479,12 +718,43 @@ class CDispatch:
 		should then allow this to work.
 		"""
 		for name in methodNames:
-			details = build.MapEntry(self.__AttrToID__(name), (name,))
-			self._olerepr_.mapFuncs[name] = details
+			details = self._LookupID_(name)
+			self._GetOwnOleRepr_().mapFuncs[name] = details
 
 	def __AttrToID__(self,attr):
-			debug_attr_print("Calling GetIDsOfNames for property %s in Dispatch container %s" % (attr, self._username_))
-			return self._oleobj_.GetIDsOfNames(0,attr)
+			return self._LookupID_(attr).dispid
+
+	def _LookupID_(self, name):
+		"""Return a MapEntry for name from GetIDsOfNames, raising com_error if
+		there is no such name.  The answer is remembered - see DispIDCache."""
+		identity = self._dispidkey_
+		if identity is None:
+			identity = self.__dict__['_dispidkey_'] = _GetClassIdentity(self._oleobj_)
+		if isinstance(identity, tuple):
+			found = dispIDCache.Lookup(self._oleobj_, identity, name)
+		else:
+			found = self._dispids_.get(name)
+			if found is None:
+				found = _GetIDOfName(self._oleobj_, name)
+				if identity != _DynamicClass or not isinstance(found, pythoncom.com_error):
+					self._dispids_[name] = found
+		if isinstance(found, pythoncom.com_error):
+			raise pythoncom.com_error(*found.args)
+		return found
+
+	def _InvalidateDispIDs_(self, *names):
+		"""Forget the names looked up for this object, and all of its class
+		(or just those in names) - eg, after a dynamic object adds new names."""
+		identity = self._dispidkey_
+		if names:
+			for name in names:
+				self._dispids_.pop(name, None)
+				if isinstance(identity, tuple):
+					dispIDCache.Invalidate(identity, name)
+		else:
+			self._dispids_.clear()
+			if isinstance(identity, tuple):
+				dispIDCache.Invalidate(identity)
 
 	def __getattr__(self, attr):
 		if attr=='__iter__':
@@ -536,7 +806,7 @@ class CDispatch:
 						if retEntry is None:
 							retEntry = self._olerepr_.propMapGet.get(attr)
 					if retEntry is None:
-						retEntry = build.MapEntry(self.__AttrToID__(attr), (attr,))
+						retEntry = self._LookupID_(attr)
 				except pythoncom.ole_error:
 					pass # No prop by that name - retEntry remains None.
 
@@ -557,7 +827,7 @@ class CDispatch:
 			except pythoncom.com_error as details:
 				if details.hresult in ERRORS_BAD_CONTEXT:
 					# May be a method.
-					self._olerepr_.mapFuncs[attr] = retEntry
+					self._GetOwnOleRepr_().mapFuncs[attr] = retEntry
 					return self._make_method_(attr)
 				raise
 			debug_attr_print("OLE returned ", ret)
@@ -605,7 +875,7 @@ class CDispatch:
 					self._oleobj_.Invoke(entry.dispid, 0, invoke_type, 0, value)
 					return
 			try:
-				entry = build.MapEntry(self.__AttrToID__(attr),(attr,))
+				entry = self._LookupID_(attr)
 			except pythoncom.com_error:
 				# No attribute of that name
 				entry = None
@@ -613,7 +883,7 @@ class CDispatch:
 				try:
 					invoke_type = _GetDescInvokeType(entry, pythoncom.INVOKE_PROPERTYPUT)
 					self._oleobj_.Invoke(entry.dispid, 0, invoke_type, 0, value)
-					self._olerepr_.propMap[attr] = entry
+					self._GetOwnOleRepr_().propMap[attr] = entry
 					debug_attr_print("__setattr__ property %s (id=0x%x) in Dispatch container %s" % (attr, entry.dispid, self._username_))
 					return
 				except pythoncom.com_error:
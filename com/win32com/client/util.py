@@ -4,20 +4,37 @@ This module contains utility functions, used primarily by advanced COM
 programmers, or other COM modules.
 """
 import pythoncom
-from win32com.client import Dispatch, _get_good_object_
+from win32com.client import Dispatch, _get_good_object_, dynamic, build
 
 PyIDispatchType = pythoncom.TypeIIDs[pythoncom.IID_IDispatch]
 
-def WrapEnum(ob, resultCLSID = None):
+# The number of items an Iterator first asks its enumerator for, and the most
+# it will ask for at once - it doubles each time it gets all it asked for.
+# (Set iteratorMaxChunk to 1 to get items one at a time.)
+iteratorFirstChunk = 16
+iteratorMaxChunk = 1024
+
+def WrapEnum(ob, resultCLSID = None, cacheItems = 0):
 	"""Wrap an object in a VARIANT enumerator.
 
 	All VT_DISPATCHs returned by the enumerator are converted to wrapper objects
 	(which may be either a class instance, or a dynamic.Dispatch type object).
 
+	If cacheItems is true, the items are kept as they are read - see Enumerator.
 	"""
 	if type(ob) != pythoncom.TypeIIDs[pythoncom.IID_IEnumVARIANT]:
 		ob = ob.QueryInterface(pythoncom.IID_IEnumVARIANT)
-	return EnumVARIANT(ob, resultCLSID)
+	return EnumVARIANT(ob, resultCLSID, cacheItems)
+
+def _NextChunk(enum, count):
+	# Returns (items, count to use next time) from enum.Next(count)
+	try:
+		return enum.Next(count), count
+	except pythoncom.com_error:
+		if count == 1:
+			raise
+		# Some enumerators only support getting one item at a time.
+		return enum.Next(1), 1
 
 class Enumerator:
 	"""A class that provides indexed access into an Enumerator
@@ -29,17 +46,57 @@ class Enumerator:
 	access is supported, the underlying object is still an enumerator, so
 	this will force many reset-and-seek operations to find the requested index.
 
+	Unless cacheItems is true - then items are kept as they are read (in chunks,
+	as for Iterator), and indexing reads only as far as the highest index asked
+	for.  Next() returns the kept items in order (reading more as needed), and
+	Reset() forgets them.
+
 	"""
-	def __init__(self, enum):
+	def __init__(self, enum, cacheItems = 0):
 		self._oleobj_ = enum # a PyIEnumVARIANT
 		self.index = -1
+		if cacheItems:
+			self._items_ = []
+		else:
+			self._items_ = None
+		self._next_ = 0 # the index of the item Next() returns, when items are kept
+		self._chunk_ = iteratorFirstChunk
+		self._exhausted_ = 0
 	def __getitem__(self, index):
 		return self.__GetIndex(index)
 	def __call__(self, index):
 		return self.__GetIndex(index)
 
+	def __ReadTo(self, index):
+		# Read items into the cache until we have index (None for all of them)
+		items = self._items_
+		while not self._exhausted_ and (index is None or index >= len(items)):
+			count = self._chunk_
+			if index is not None:
+				count = max(count, index + 1 - len(items))
+			got, used = _NextChunk(self._oleobj_, count)
+			if not got:
+				self._exhausted_ = 1
+			items.extend(got)
+			if used == count:
+				self._chunk_ = min(count * 2, max(iteratorMaxChunk, 1))
+			else: # Only one at a time from now on.
+				self._chunk_ = 1
+
+	def __GetCachedIndex(self, index):
+		if index < 0:
+			self.__ReadTo(None)
+		else:
+			self.__ReadTo(index)
+		try:
+			return self._make_retval_(self._items_[index])
+		except IndexError:
+			raise IndexError("list index out of range")
+
 	def __GetIndex(self, index):
 		if type(index)!=type(0): raise TypeError("Only integer indexes are supported for enumerators")
+		if self._items_ is not None:
+			return self.__GetCachedIndex(index)
 		# NOTE
 		# In this context, self.index is users purely as a flag to say
 		# "am I still in sequence".  The user may call Next() or Reset() if they
@@ -55,30 +112,187 @@ class Enumerator:
 			return self._make_retval_(result[0])
 		raise IndexError("list index out of range")
 	def Next(self, count=1):
-		ret = self._oleobj_.Next(count)
+		if self._items_ is not None:
+			# The enumerator may have been read past this by indexing.
+			start = self._next_
+			self.__ReadTo(start + count - 1)
+			ret = self._items_[start:start + count]
+			self._next_ = start + len(ret)
+		else:
+			ret = self._oleobj_.Next(count)
 		realRets = []
 		for r in ret:
 			realRets.append(self._make_retval_(r))
 		return tuple(realRets) # Convert back to tuple.
 	def Reset(self):
+		if self._items_ is not None:
+			self._items_ = []
+			self._exhausted_ = 0
+			self._next_ = 0
 		return self._oleobj_.Reset()
 	def Clone(self):
-		return self.__class__( self._oleobj_.Clone(), self.resultCLSID)
+		return self.__class__( self._oleobj_.Clone(), self.resultCLSID, self._items_ is not None)
 	def _make_retval_(self, result):
 		return result
 
 class EnumVARIANT(Enumerator):
-	def __init__(self, enum, resultCLSID = None):
+	def __init__(self, enum, resultCLSID = None, cacheItems = 0):
 		self.resultCLSID = resultCLSID
-		Enumerator.__init__(self, enum)
+		Enumerator.__init__(self, enum, cacheItems)
 	def _make_retval_(self, result):
 		return _get_good_object_(result, resultCLSID = self.resultCLSID)
 
 class Iterator:
-	def __init__(self, enum, resultCLSID = None):
+	"""An iterator over the items of a VARIANT enumerator.
+
+	Items are read from the enumerator in chunks, so each round trip gets
+	many of them - the chunk starts at iteratorFirstChunk items and doubles
+	up to iteratorMaxChunk, or is always chunkSize if that is given.  Each item
+	is only wrapped (eg, in a Dispatch object) when it is returned.
+	"""
+	def __init__(self, enum, resultCLSID = None, chunkSize = None):
 		self.resultCLSID = resultCLSID
-		self._iter_ = iter(enum.QueryInterface(pythoncom.IID_IEnumVARIANT))
+		self.chunkSize = chunkSize
+		self._iter_ = enum.QueryInterface(pythoncom.IID_IEnumVARIANT) # a PyIEnumVARIANT
+		self._done_ = 0
+		if chunkSize is None:
+			self._chunk_ = max(min(iteratorFirstChunk, iteratorMaxChunk), 1)
+		else:
+			self._chunk_ = chunkSize
+		self._buffer_ = ()
+		self._pos_ = 0
 	def __iter__(self):
 		return self
 	def __next__(self):
-		return _get_good_object_(next(self._iter_), resultCLSID = self.resultCLSID)
+		if self._pos_ >= len(self._buffer_):
+			self._Fill()
+		ob = self._buffer_[self._pos_]
+		self._pos_ = self._pos_ + 1
+		return _get_good_object_(ob, resultCLSID = self.resultCLSID)
+	def _Fill(self):
+		if self._done_:
+			raise StopIteration
+		count = self._chunk_
+		self._buffer_, used = _NextChunk(self._iter_, count)
+		self._pos_ = 0
+		if used != count: # Only one at a time from now on.
+			self._chunk_ = self.chunkSize = 1
+		if not self._buffer_:
+			self._done_ = 1 # Don't ask again.
+			raise StopIteration
+		elif self.chunkSize is None and len(self._buffer_) == count:
+			self._chunk_ = min(count * 2, max(iteratorMaxChunk, 1))
+
+def _GetTypeIID(ob):
+	# The IID of ob's type info, if known without asking the object.
+	if isinstance(ob, dynamic.CDispatch):
+		olerepr = ob._olerepr_
+		if olerepr is None:
+			return None
+		return olerepr.clsid
+	return getattr(ob, "CLSID", None) # makepy generated classes.
+
+def _LookupPropertyID(ob, name, invkind):
+	# Returns ((dispid, invoke type, result CLSID), fromTypeInfo)
+	if isinstance(ob, dynamic.CDispatch):
+		olerepr = ob._olerepr_
+		if olerepr is not None:
+			if invkind == pythoncom.INVOKE_PROPERTYGET:
+				maps = olerepr.propMap, olerepr.propMapGet
+			else:
+				maps = olerepr.propMap, olerepr.propMapPut
+			for bound in (0, 1):
+				for map in maps:
+					entry = map.get(name)
+					if entry is not None:
+						ids = entry.dispid, dynamic._GetDescInvokeType(entry, invkind), entry.GetResultCLSID()
+						return ids, 1
+				# Not yet bound from the typecomp?
+				if bound or not ob._LazyAddAttr_(name):
+					break
+		lookup = ob._LookupID_ # remembered by dynamic.dispIDCache
+	else:
+		if invkind == pythoncom.INVOKE_PROPERTYGET:
+			details = getattr(ob, "_prop_map_get_", {}).get(name) # makepy generated classes.
+			if details is not None:
+				return (details[0], details[1], details[5]), 1
+		else:
+			details = getattr(ob, "_prop_map_put_", {}).get(name)
+			if details is not None:
+				return (details[0][0], details[0][2], None), 1
+		oleobj = getattr(ob, "_oleobj_", ob)
+		lookup = lambda name: build.MapEntry(oleobj.GetIDsOfNames(0, name), (name,))
+	try:
+		return (lookup(name).dispid, invkind, None), 0
+	except pythoncom.com_error:
+		raise AttributeError("%s.%s" % (getattr(ob, "_username_", repr(ob)), name))
+
+def _GetPropertyIDs(ob, names, invkind):
+	# Returns (list of (dispid, invoke type, result CLSID), fromTypeInfo) -
+	# fromTypeInfo is true when they all came from the type info, so may be
+	# used for other objects of the same type.
+	ret = []
+	fromTypeInfo = 1
+	for name in names:
+		ids, typed = _LookupPropertyID(ob, name, invkind)
+		ret.append(ids)
+		fromTypeInfo = fromTypeInfo and typed
+	return ret, fromTypeInfo
+
+def _GetValues(ob, ids):
+	invoke = getattr(ob, "_oleobj_", ob).Invoke
+	return tuple([_get_good_object_(invoke(dispid, 0, invkind, 1), None, resultCLSID)
+	              for dispid, invkind, resultCLSID in ids])
+
+def _SetValues(ob, ids, values):
+	invoke = getattr(ob, "_oleobj_", ob).Invoke
+	for (dispid, invkind, resultCLSID), value in zip(ids, values):
+		invoke(dispid, 0, invkind, 0, value)
+
+def GetProperties(ob, names):
+	"""Return a tuple of the values of the properties 'names' of a COM object.
+
+	The dispid of each name comes from the object's type info when it has
+	some, or from GetIDsOfNames (remembered, for dynamic objects - see
+	dynamic.DispIDCache), and the properties are then fetched with one Invoke
+	each - much cheaper than getattr() on each name, especially for objects
+	in another process.  'ob' may be a Dispatch object or a PyIDispatch.
+	"""
+	return _GetValues(ob, _GetPropertyIDs(ob, names, pythoncom.INVOKE_PROPERTYGET)[0])
+
+def SetProperties(ob, mapping):
+	"""Set the properties of a COM object from a dictionary of {name: value}.
+
+	See GetProperties().
+	"""
+	names = list(mapping.keys())
+	_SetValues(ob, _GetPropertyIDs(ob, names, pythoncom.INVOKE_PROPERTYPUT)[0], [mapping[name] for name in names])
+
+def GetPropertiesOfItems(collection, names):
+	"""Return a list holding GetProperties(item, names) for each item in a collection.
+
+	The dispids are looked up once for each run of items of the same type,
+	when they all come from its type info.
+	"""
+	names = tuple(names)
+	ret = []
+	lastIID = ids = None
+	for item in collection:
+		iid = _GetTypeIID(item)
+		if ids is None or iid is None or iid != lastIID:
+			ids, typed = _GetPropertyIDs(item, names, pythoncom.INVOKE_PROPERTYGET)
+			lastIID = typed and iid or None
+		ret.append(_GetValues(item, ids))
+	return ret
+
+def SetPropertiesOfItems(collection, mapping):
+	"Call SetProperties(item, mapping) for each item in a collection."
+	names = list(mapping.keys())
+	values = [mapping[name] for name in names]
+	lastIID = ids = None
+	for item in collection:
+		iid = _GetTypeIID(item)
+		if ids is None or iid is None or iid != lastIID:
+			ids, typed = _GetPropertyIDs(item, names, pythoncom.INVOKE_PROPERTYPUT)
+			lastIID = typed and iid or None
+		_SetValues(item, ids, values)
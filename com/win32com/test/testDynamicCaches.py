@@ -0,0 +1,129 @@
+# Tests for the caches used by dynamic (late-bound) objects.
+import unittest
+
+import pythoncom
+import win32com.client.dynamic
+import win32com.client.util
+import win32com.test.util
+
+class OleReprCacheTestCase(win32com.test.util.TestCase):
+    def setUp(self):
+        self.cache = win32com.client.dynamic.OleReprCache(maxSize=2)
+        self.old_cache = win32com.client.dynamic.oleReprCache
+        win32com.client.dynamic.oleReprCache = self.cache
+
+    def tearDown(self):
+        win32com.client.dynamic.oleReprCache = self.old_cache
+
+    def _make(self):
+        return win32com.client.dynamic.Dispatch("Scripting.Dictionary")
+
+    def testShared(self):
+        d1 = self._make()
+        d2 = self._make()
+        self.failUnless(d1._olerepr_ is d2._olerepr_)
+        stats = self.cache.GetStats()
+        self.assertEquals(stats['misses'], 1)
+        self.assertEquals(stats['hits'], 1)
+        d1.Add("key", "value")
+        self.assertEquals(d2.Count, 0)
+        self.assertEquals(d1.Count, 1)
+
+    def testCopyOnWrite(self):
+        d1 = self._make()
+        d2 = self._make()
+        d1._FlagAsMethod("Count")
+        self.failIf(d1._olerepr_ is d2._olerepr_)
+        self.failUnless("Count" in d1._olerepr_.mapFuncs)
+        self.failIf("Count" in d2._olerepr_.mapFuncs)
+        self.assertEquals(d2.Count, 0)
+
+    def testDisabled(self):
+        self._make()
+        self.cache.Clear()
+        self.cache.maxSize = 0
+        d1 = self._make()
+        d2 = self._make()
+        self.failIf(d1._olerepr_ is d2._olerepr_)
+        self.assertEquals(self.cache.GetStats()['size'], 0)
+
+class MethodCacheTestCase(win32com.test.util.TestCase):
+    def setUp(self):
+        self.cache = win32com.client.dynamic.MethodCache(maxSize=10)
+        self.old_cache = win32com.client.dynamic.methodCache
+        win32com.client.dynamic.methodCache = self.cache
+
+    def tearDown(self):
+        win32com.client.dynamic.methodCache = self.old_cache
+
+    def testShared(self):
+        d1 = win32com.client.dynamic.Dispatch("Scripting.Dictionary")
+        d2 = win32com.client.dynamic.Dispatch("Scripting.Dictionary")
+        d1.Add("key", "value")
+        d2.Add("key", "other")
+        self.assertEquals(d1.Item("key"), "value")
+        self.assertEquals(d2.Item("key"), "other")
+        self.failUnless(d1._builtMethods_["Add"] is d2._builtMethods_["Add"])
+        # Add and Item were each compiled once, for d1.
+        stats = self.cache.GetStats()
+        self.assertEquals(stats['misses'], 2)
+        self.assertEquals(stats['hits'], 2)
+
+class PropertiesTestCase(win32com.test.util.TestCase):
+    def _make(self):
+        return win32com.client.dynamic.Dispatch("Scripting.Dictionary")
+
+    def testGetSet(self):
+        d = self._make()
+        win32com.client.util.SetProperties(d, {"CompareMode": 1})
+        d.Add("key", "value")
+        self.assertEquals(win32com.client.util.GetProperties(d, ["Count", "CompareMode"]), (1, 1))
+
+    def testItems(self):
+        items = [self._make() for i in range(3)]
+        win32com.client.util.SetPropertiesOfItems(items, {"CompareMode": 1})
+        items[0].Add("key", "value")
+        got = win32com.client.util.GetPropertiesOfItems(items, ("Count", "CompareMode"))
+        self.assertEquals(got, [(1, 1), (0, 1), (0, 1)])
+
+    def testMissing(self):
+        self.assertRaises(AttributeError, win32com.client.util.GetProperties,
+                          self._make(), ["NoSuchProperty"])
+
+class Expando:
+    _public_methods_ = []
+    def _dynamic_(self, name, lcid, wFlags, args):
+        if wFlags & pythoncom.DISPATCH_PROPERTYGET:
+            return self.__dict__[name]
+        self.__dict__[name] = args[0]
+
+class DispIDCacheTestCase(win32com.test.util.TestCase):
+    def _make(self):
+        import win32com.server.util, win32com.server.policy
+        ob = win32com.server.util.wrap(Expando(), usePolicy=win32com.server.policy.DynamicPolicy)
+        return win32com.client.dynamic.Dispatch(ob)
+
+    def testPerObject(self):
+        client = self._make()
+        client.Value = 1
+        self.assertEquals(client.Value, 1)
+        # Python COM objects support IDispatchEx, so keep their own lookups.
+        self.assertEquals(client._dispidkey_, win32com.client.dynamic._DynamicClass)
+        self.failUnless("Value" in client._dispids_)
+        client._InvalidateDispIDs_("Value")
+        self.failIf("Value" in client._dispids_)
+        self.assertEquals(client.Value, 1)
+
+    def testNotSharedByName(self):
+        # Objects from a property get are named after the property, whatever their class.
+        cache = win32com.client.dynamic.dispIDCache
+        clients = [win32com.client.dynamic.Dispatch(self._make()._oleobj_, "Item") for i in range(2)]
+        for i, client in enumerate(clients):
+            client.Value = i
+        self.assertEquals([client.Value for client in clients], [0, 1])
+        for client in clients:
+            self.failIf(isinstance(client._dispidkey_, tuple))
+        self.failIf([key for key in cache.items if key[0][0] == "name"])
+
+if __name__=='__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ import unittest
 from win32com.client.gencache import EnsureDispatch
 from win32com.client import Dispatch
 import win32com.server.util
+import win32com.client.util
 import win32com.test.util
 import pythoncom
 
@@ -27,6 +28,36 @@ class _BaseTestCase(win32com.test.util.TestCase):
             got.append(v)
         self.assertEquals(got, self.expected_data)
 
+    def test_chunked(self):
+        for chunkSize in (1, 2, 100):
+            ob, i = self.iter_factory()
+            got = list(win32com.client.util.Iterator(i, chunkSize=chunkSize))
+            self.assertEquals(got, self.expected_data)
+    def test_cached_index(self):
+        ob, i = self.iter_factory()
+        enum = win32com.client.util.WrapEnum(i, cacheItems=1)
+        expected = self.expected_data
+        self.assertEquals(enum[len(expected)-1], expected[-1])
+        self.assertEquals(enum[0], expected[0])
+        self.assertEquals(enum[-1], expected[-1])
+        self.assertRaises(IndexError, enum.__getitem__, len(expected))
+    def test_cached_index_and_next(self):
+        ob, i = self.iter_factory()
+        enum = win32com.client.util.WrapEnum(i, cacheItems=1)
+        expected = self.expected_data
+        self.assertEquals(enum[0], expected[0]) # reads a chunk ahead
+        got = []
+        while 1:
+            item = enum.Next()
+            if not item:
+                break
+            got.extend(item)
+        self.assertEquals(got, expected)
+        enum.Reset()
+        self.assertEquals(list(enum.Next(2)), expected[:2])
+        self.assertEquals(enum[len(expected)-1], expected[-1])
+        self.assertEquals(list(enum.Next(len(expected))), expected[2:])
+
     def _do_test_nonenum(self, object):
         try:
             for i in object: